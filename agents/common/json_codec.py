@@ -0,0 +1,60 @@
+"""Fast JSON encode/decode — orjson when installed, stdlib json otherwise.
+
+orjson is an optional speedup (``pip install orjson``). Every function here
+falls back to the stdlib so callers never need to care which backend is live.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep
+# catching the stdlib type regardless of backend.
+JSONDecodeError = json.JSONDecodeError
+
+_ORJSON_OPTS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse JSON from str or bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any, *, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """Serialize *obj* to UTF-8 JSON bytes. Unknown types are stringified."""
+    if orjson is not None:
+        opts = (
+            _ORJSON_OPTS
+            | (orjson.OPT_INDENT_2 if indent else 0)
+            | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        )
+        try:
+            return orjson.dumps(obj, default=str, option=opts)
+        except TypeError:
+            # orjson rejects a few inputs the stdlib accepts (e.g. >64-bit ints)
+            pass
+    try:
+        return json.dumps(
+            obj, default=str, indent=2 if indent else None, sort_keys=sort_keys
+        ).encode()
+    except TypeError:
+        if not sort_keys:
+            raise
+        # The stdlib can't order mixed-type keys (e.g. {1: .., "b": ..}); emit
+        # them unsorted rather than fail
+        return json.dumps(obj, default=str, indent=2 if indent else None).encode()
+
+
+def dumps(obj: Any, *, indent: bool = False) -> str:
+    """Serialize *obj* to a JSON string. Unknown types are stringified."""
+    if orjson is not None:
+        return dumps_bytes(obj, indent=indent).decode()
+    return json.dumps(obj, default=str, indent=2 if indent else None)
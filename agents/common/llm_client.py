@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import os
 import re
 import logging
@@ -13,6 +12,7 @@ from typing import Any
 
 import httpx
 
+from agents.common import json_codec
 from agents.common.retry import retry_with_backoff
 from agents.common.errors import LLMError, ConfigError
 from agents.common.usage_tracker import UsageTracker
@@ -132,13 +132,34 @@ class LLMClient:
         temperature: float = 0.7,
         max_tokens: int = 4096,
         is_code: bool = False,
+        cache_prefix: str | None = None,
+        json_schema: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
-        """Generate a text response. Returns {"content": str, ...} or error dict."""
+        """Generate a text response. Returns {"content": str, ...} or error dict.
+
+        ``cache_prefix`` marks the leading part of ``prompt`` that sibling
+        calls share. Anthropic gets an explicit cache breakpoint after it;
+        OpenAI-compatible providers cache identical prefixes automatically.
+
+        ``json_schema`` switches providers with a native JSON mode to
+        constrained decoding (Gemini response schema, OpenAI-compatible
+        ``json_object``). Anthropic has none and relies on the prompt.
+        """
         model = model or self.default_model
         provider = _detect_provider(model)
 
         if prompt and not messages:
-            messages = [{"role": "user", "content": prompt}]
+            if (
+                cache_prefix and provider == "anthropic"
+                and len(prompt) > len(cache_prefix) and prompt.startswith(cache_prefix)
+            ):
+                content: Any = [
+                    {"type": "text", "text": cache_prefix, "cache_control": {"type": "ephemeral"}},
+                    {"type": "text", "text": prompt[len(cache_prefix):]},
+                ]
+            else:
+                content = prompt
+            messages = [{"role": "user", "content": content}]
 
         start_ms = time.monotonic_ns() // 1_000_000
         try:
@@ -152,13 +173,13 @@ class LLMClient:
                 result = await self._call_with_resilience(
                     self._call_google, provider,
                     model, system, messages or [], temperature, max_tokens,
-                    is_code=is_code,
+                    is_code=is_code, json_schema=json_schema,
                 )
             else:
                 result = await self._call_with_resilience(
                     self._call_openai_compat, provider,
                     provider, model, system, messages or [], temperature, max_tokens,
-                    is_code=is_code,
+                    is_code=is_code, json_schema=json_schema,
                 )
             duration_ms = int(time.monotonic_ns() // 1_000_000 - start_ms)
             self._track_usage(result, model, provider, duration_ms)
@@ -184,6 +205,8 @@ class LLMClient:
         temperature: float = 0.3,
         model: str | None = None,
         max_tokens: int = 4096,
+        json_schema: dict[str, Any] | None = None,
+        cache_prefix: str | None = None,
     ) -> dict[str, Any]:
         """Generate and parse a JSON response. Returns {"content": <parsed dict>, ...} or error dict."""
         result = await self.generate(
@@ -192,6 +215,8 @@ class LLMClient:
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
+            json_schema=json_schema,
+            cache_prefix=cache_prefix,
         )
 
         if result.get("error"):
@@ -200,20 +225,20 @@ class LLMClient:
         text = result["content"]
 
         try:
-            parsed = json.loads(text)
-        except json.JSONDecodeError:
+            parsed = json_codec.loads(text)
+        except json_codec.JSONDecodeError:
             match = re.search(r"```(?:json)?\s*([\s\S]*?)```", text)
             if match:
                 try:
-                    parsed = json.loads(match.group(1).strip())
-                except json.JSONDecodeError:
+                    parsed = json_codec.loads(match.group(1).strip())
+                except json_codec.JSONDecodeError:
                     return _error_result(f"Could not parse JSON from response: {text[:200]}", result.get("provider", ""))
             else:
                 match = re.search(r"\{[\s\S]*\}", text)
                 if match:
                     try:
-                        parsed = json.loads(match.group(0))
-                    except json.JSONDecodeError:
+                        parsed = json_codec.loads(match.group(0))
+                    except json_codec.JSONDecodeError:
                         return _error_result(f"Could not parse JSON from response: {text[:200]}", result.get("provider", ""))
                 else:
                     return _error_result(f"No JSON found in response: {text[:200]}", result.get("provider", ""))
@@ -356,6 +381,7 @@ class LLMClient:
         messages: list[dict],
         temperature: float,
         max_tokens: int,
+        json_schema: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
         api_key = os.environ.get("GOOGLE_API_KEY", "")
         if not api_key:
@@ -376,6 +402,9 @@ class LLMClient:
         }
         if system:
             body["systemInstruction"] = {"parts": [{"text": system}]}
+        if json_schema:
+            body["generationConfig"]["responseMimeType"] = "application/json"
+            body["generationConfig"]["responseSchema"] = json_schema
 
         resp = await self._http.post(
             f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}",
@@ -412,6 +441,7 @@ class LLMClient:
         messages: list[dict],
         temperature: float,
         max_tokens: int,
+        json_schema: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
         env_var, base_url, _ = PROVIDERS[provider]
         api_key = os.environ.get(env_var, "")
@@ -448,6 +478,11 @@ class LLMClient:
             body["top_p"] = 0.95
             logger.info("Kimi K2.5 thinking mode: enforcing temperature=1.0, top_p=0.95")
 
+        # JSON mode; these providers accept json_object but not full schemas.
+        # DeepSeek's reasoner rejects response_format altogether.
+        if json_schema and "reasoner" not in model:
+            body["response_format"] = {"type": "json_object"}
+
         resp = await self._http.post(
             f"{base_url}/chat/completions",
             headers={
@@ -6,7 +6,8 @@ Not used for primary delegation — see session_manager.py for that.
 
 from __future__ import annotations
 
-import json
+import asyncio
+import logging
 import sqlite3
 import uuid
 from dataclasses import dataclass, field, asdict
@@ -15,6 +16,10 @@ from enum import Enum
 from pathlib import Path
 from typing import Any, Optional
 
+from agents.common import json_codec
+
+logger = logging.getLogger(__name__)
+
 
 # ─── Enums ────────────────────────────────────────────────────────────────────
 
@@ -115,11 +120,11 @@ class AgentMessage:
         d = asdict(self)
         d["from_agent"] = self.from_agent.value if isinstance(self.from_agent, AgentRole) else self.from_agent
         d["to_agent"] = self.to_agent.value if isinstance(self.to_agent, AgentRole) else self.to_agent
-        return json.dumps(d, default=str)
+        return json_codec.dumps(d)
 
     @classmethod
     def from_json(cls, raw: str) -> "AgentMessage":
-        d = json.loads(raw)
+        d = json_codec.loads(raw)
         d["from_agent"] = AgentRole(d["from_agent"])
         d["to_agent"] = AgentRole(d["to_agent"])
         return cls(**d)
@@ -150,6 +155,18 @@ CREATE INDEX IF NOT EXISTS idx_mq_task_id ON message_queue(task_id);
 """
 
 
+# Connection tuning: WAL lets polling readers run alongside other agents'
+# writers; NORMAL sync is durable in WAL mode short of power loss; the cache
+# (64 MB cap), mmap (256 MB) and in-memory temp store keep polls off disk.
+MESSAGE_BUS_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
 class MessageBus:
     """SQLite-backed message bus for inter-agent communication."""
 
@@ -157,9 +174,13 @@ class MessageBus:
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         self._db = sqlite3.connect(str(db_path))
         self._db.row_factory = sqlite3.Row
-        self._db.execute("PRAGMA journal_mode=WAL")
+        for pragma in MESSAGE_BUS_PRAGMAS:
+            self._db.execute(pragma)
         self._db.executescript(MESSAGE_BUS_SCHEMA)
         self._db.commit()
+        # Change notification for wait_for_change (see _committed)
+        self._local_writes = 0
+        self._waiters: set[asyncio.Event] = set()
 
     def send(self, message: AgentMessage) -> None:
         """Enqueue a message."""
@@ -172,16 +193,17 @@ class MessageBus:
                 message.from_agent.value,
                 message.to_agent.value,
                 message.action,
-                json.dumps(message.payload, default=str),
-                json.dumps(message.context, default=str),
-                json.dumps(message.constraints, default=str),
+                json_codec.dumps(message.payload),
+                json_codec.dumps(message.context),
+                json_codec.dumps(message.constraints),
                 message.status,
-                json.dumps(message.result, default=str) if message.result else None,
+                json_codec.dumps(message.result) if message.result else None,
                 message.error,
                 message.created_at,
             ),
         )
         self._db.commit()
+        self._committed()
 
     def receive(self, agent: AgentRole, limit: int = 10) -> list[AgentMessage]:
         """Poll for pending messages addressed to *agent*."""
@@ -193,20 +215,7 @@ class MessageBus:
 
         messages: list[AgentMessage] = []
         for row in rows:
-            msg = AgentMessage(
-                task_id=row["task_id"],
-                from_agent=AgentRole(row["from_agent"]),
-                to_agent=AgentRole(row["to_agent"]),
-                action=row["action"],
-                payload=json.loads(row["payload"] or "{}"),
-                context=json.loads(row["context"] or "{}"),
-                constraints=json.loads(row["constraints"] or "{}"),
-                status=row["status"],
-                result=json.loads(row["result"]) if row["result"] else None,
-                error=row["error"],
-                created_at=row["created_at"],
-            )
-            messages.append(msg)
+            messages.append(self._row_to_message(row))
 
             # Mark as in_progress
             self._db.execute(
@@ -214,6 +223,8 @@ class MessageBus:
                 (datetime.now(timezone.utc).isoformat(), row["id"]),
             )
         self._db.commit()
+        if rows:
+            self._committed()
         return messages
 
     def update_status(
@@ -225,13 +236,14 @@ class MessageBus:
             "WHERE task_id = ?",
             (
                 status.value,
-                json.dumps(result, default=str) if result else None,
+                json_codec.dumps(result) if result else None,
                 error,
                 datetime.now(timezone.utc).isoformat(),
                 task_id,
             ),
         )
         self._db.commit()
+        self._committed()
 
     def get_task(self, task_id: str) -> AgentMessage | None:
         """Fetch the latest message for a task_id."""
@@ -241,19 +253,95 @@ class MessageBus:
         ).fetchone()
         if not row:
             return None
+        return self._row_to_message(row)
+
+    def get_tasks_since(self, last_id: int, limit: int = 20) -> list[tuple[int, AgentMessage | None]]:
+        """Fetch non-Guardian rows with id > *last_id*, each resolved to its task's latest state.
+
+        Returns ``(row_id, message)`` pairs in row order. One query replaces a
+        scan of new rows followed by a ``get_task`` per row. A row that cannot
+        be decoded is logged and returned with ``None`` so callers can still
+        advance past it.
+        """
+        rows = self._db.execute(
+            "SELECT m.id AS scan_id, latest.* FROM message_queue m "
+            "JOIN message_queue latest ON latest.id = ("
+            "    SELECT MAX(id) FROM message_queue WHERE task_id = m.task_id"
+            ") "
+            "WHERE m.id > ? AND m.from_agent != 'guardian' "
+            "ORDER BY m.id ASC LIMIT ?",
+            (last_id, limit),
+        ).fetchall()
+        batch: list[tuple[int, AgentMessage | None]] = []
+        for row in rows:
+            try:
+                msg = self._row_to_message(row)
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Skipping undecodable bus row {row['scan_id']}: {e}")
+                msg = None
+            batch.append((row["scan_id"], msg))
+        return batch
+
+    @staticmethod
+    def _row_to_message(row: sqlite3.Row) -> AgentMessage:
         return AgentMessage(
             task_id=row["task_id"],
             from_agent=AgentRole(row["from_agent"]),
             to_agent=AgentRole(row["to_agent"]),
             action=row["action"],
-            payload=json.loads(row["payload"] or "{}"),
-            context=json.loads(row["context"] or "{}"),
-            constraints=json.loads(row["constraints"] or "{}"),
+            payload=json_codec.loads(row["payload"] or "{}"),
+            context=json_codec.loads(row["context"] or "{}"),
+            constraints=json_codec.loads(row["constraints"] or "{}"),
             status=row["status"],
-            result=json.loads(row["result"]) if row["result"] else None,
+            result=json_codec.loads(row["result"]) if row["result"] else None,
             error=row["error"],
             created_at=row["created_at"],
         )
 
+    # ─── Change notification ──────────────────────────────────────────
+
+    def _committed(self) -> None:
+        """Record a write through this connection and wake any waiters."""
+        self._local_writes += 1
+        for event in self._waiters:
+            event.set()
+
+    def change_token(self) -> tuple[int, int]:
+        """Opaque snapshot of the bus state, to pass to ``wait_for_change``.
+
+        Combines this connection's write counter with SQLite's
+        ``PRAGMA data_version``, which changes when *other* connections
+        (other agent processes) commit and costs no table I/O to read.
+        """
+        data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        return self._local_writes, data_version
+
+    async def wait_for_change(
+        self, token: tuple[int, int], timeout: float = 5.0, poll_interval: float = 0.25
+    ) -> tuple[int, int]:
+        """Wait until the bus differs from *token* or *timeout* elapses.
+
+        Writes through this bus wake the waiter immediately; writes from
+        other connections are picked up within *poll_interval*. Returns the
+        current token either way.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        event = asyncio.Event()
+        self._waiters.add(event)
+        try:
+            while True:
+                current = self.change_token()
+                remaining = deadline - loop.time()
+                if current != token or remaining <= 0:
+                    return current
+                try:
+                    await asyncio.wait_for(event.wait(), min(poll_interval, remaining))
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+        finally:
+            self._waiters.discard(event)
+
     def close(self) -> None:
         self._db.close()
@@ -6,6 +6,7 @@ import asyncio
 import logging
 import time
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
 from typing import Any, Optional
 
@@ -13,6 +14,9 @@ from agents.common.llm_client import LLMClient
 
 logger = logging.getLogger(__name__)
 
+# Recent task durations kept for the latency percentile in get_metrics()
+LATENCY_WINDOW = 200
+
 
 @dataclass
 class SubTask:
@@ -21,6 +25,8 @@ class SubTask:
     description: str = ""
     context: dict[str, Any] = field(default_factory=dict)
     constraints: dict[str, Any] = field(default_factory=dict)
+    # Leading part of ``description`` shared with sibling tasks (prefix-cache hint)
+    shared_prefix: str = ""
 
 
 @dataclass
@@ -55,6 +61,8 @@ class SubAgentPool:
         self.default_model = default_model
         self.max_concurrency = max_concurrency
         self.task_timeout = task_timeout
+        # Created on first use so max_concurrency can still be tuned after init
+        self._sem: Optional[asyncio.Semaphore] = None
 
         # Metrics
         self._total_tasks = 0
@@ -62,6 +70,7 @@ class SubAgentPool:
         self._total_failures = 0
         self._total_tokens = 0
         self._total_duration_ms = 0.0
+        self._recent_durations: deque[float] = deque(maxlen=LATENCY_WINDOW)
 
     async def execute_parallel(
         self,
@@ -70,19 +79,32 @@ class SubAgentPool:
     ) -> list[SubResult]:
         """Run multiple sub-agent LLM calls concurrently.
 
-        Respects max_concurrency via a semaphore.
+        Respects max_concurrency via a semaphore shared by every call on this
+        pool, so overlapping requests cannot together exceed the cap. Tasks
+        sharing a ``shared_prefix`` are dispatched back to back so the backend
+        can serve the group from one prefix cache entry.
         Returns results in the same order as tasks.
         """
-        sem = asyncio.Semaphore(self.max_concurrency)
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        sem = self._sem
 
         async def _run_with_sem(task: SubTask) -> SubResult:
             async with sem:
                 return await self.execute_single(task, model=model)
 
-        results = await asyncio.gather(
-            *[_run_with_sem(t) for t in tasks],
+        groups: dict[str, list[int]] = {}
+        for i, task in enumerate(tasks):
+            groups.setdefault(task.shared_prefix, []).append(i)
+        order = [i for group in groups.values() for i in group]
+
+        dispatched = await asyncio.gather(
+            *[_run_with_sem(tasks[i]) for i in order],
             return_exceptions=True,
         )
+        results: list[Any] = [None] * len(tasks)
+        for i, result in zip(order, dispatched):
+            results[i] = result
 
         # Convert exceptions to SubResults — partial results on failure
         final: list[SubResult] = []
@@ -115,12 +137,15 @@ class SubAgentPool:
                 prompt=task.description,
                 model=model or self.default_model,
                 temperature=0.3,
+                max_tokens=task.constraints.get("max_tokens", 4096),
+                cache_prefix=task.shared_prefix or None,
             ), timeout=self.task_timeout)
 
             # Handle LLM error dicts
             if result.get("error"):
                 duration_ms = (time.monotonic() - start) * 1000
                 self._total_failures += 1
+                self._recent_durations.append(duration_ms)
                 return SubResult(
                     task_id=task.id,
                     success=False,
@@ -134,6 +159,7 @@ class SubAgentPool:
             self._total_successes += 1
             self._total_tokens += tokens
             self._total_duration_ms += duration_ms
+            self._recent_durations.append(duration_ms)
 
             return SubResult(
                 task_id=task.id,
@@ -148,6 +174,7 @@ class SubAgentPool:
             duration_ms = (time.monotonic() - start) * 1000
             self._total_failures += 1
             self._total_duration_ms += duration_ms
+            self._recent_durations.append(duration_ms)
 
             logger.warning(f"Sub-agent task {task.id} failed: {e}")
             return SubResult(
@@ -158,7 +185,8 @@ class SubAgentPool:
             )
 
     def get_metrics(self) -> dict:
-        """Return pool metrics."""
+        """Return pool metrics (p95_ms covers the last LATENCY_WINDOW tasks)."""
+        recent = sorted(self._recent_durations)
         return {
             "total_tasks": self._total_tasks,
             "successes": self._total_successes,
@@ -167,4 +195,5 @@ class SubAgentPool:
             "avg_duration_ms": (
                 self._total_duration_ms / max(self._total_tasks, 1)
             ),
+            "p95_ms": recent[int(0.95 * (len(recent) - 1))] if recent else 0.0,
         }
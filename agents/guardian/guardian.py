@@ -29,22 +29,45 @@ Verdicts:
 """
 
 import asyncio
-import json
+import hashlib
 import logging
 import os
 import re
 import time
-from collections import defaultdict
+from collections import Counter, OrderedDict, defaultdict, deque
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional
 
+from agents.common import json_codec
 from agents.common.base_agent import BaseAgent
 from agents.common.protocol import AgentRole, AgentMessage, TaskStatus
 from agents.common.usage_tracker import UsageTracker
 from agents.common.secret_scanner import SECRET_PATTERNS as CENTRAL_SECRET_PATTERNS, scan_for_secrets
 from agents.common.content_tags import quick_scan as _quick_scan_patterns, tag_untrusted, strip_role_markers, INJECTION_PATTERNS as CONTENT_TAG_INJECTION_PATTERNS
 
+try:
+    import re2
+except ImportError:  # optional: pip install google-re2
+    re2 = None
+
+try:
+    import hyperscan
+except ImportError:  # optional: pip install hyperscan
+    hyperscan = None
+
+try:
+    import ahocorasick
+except ImportError:  # optional: pip install pyahocorasick
+    ahocorasick = None
+
+try:
+    import xxhash
+except ImportError:  # optional: pip install xxhash (hashlib.blake2b otherwise)
+    xxhash = None
+
 logger = logging.getLogger(__name__)
 
 # ─── Constants ────────────────────────────────────────────────────────────────
@@ -54,6 +77,24 @@ WARN_THRESHOLD_PCT = 50
 ALERT_THRESHOLD_PCT = 80
 BLOCK_THRESHOLD_PCT = 100
 
+# Bus polling: rows per intercept batch, and the longest the loops sleep
+# without a change notification before re-polling anyway
+INTERCEPT_BATCH_SIZE = 20
+POLL_WATCHDOG_SECONDS = 5.0
+
+# Background LLM security review: worker count and max queued messages
+LLM_REVIEW_WORKERS = 4
+LLM_REVIEW_QUEUE_SIZE = 64
+
+# Per-text scan memoization (see GuardianAgent._cached_scan)
+SCAN_CACHE_SIZE = 4096
+SCAN_CACHE_MIN_CHARS = 256
+SCANNED_TASKS_MAX = 4096
+
+# Role string values compared on every intercepted message
+_GUARDIAN_VAL = AgentRole.GUARDIAN.value
+_BUILDER_VAL = AgentRole.BUILDER.value
+
 # Secret patterns (compiled once at import)
 SECRET_PATTERNS = [
     # API keys
@@ -80,6 +121,9 @@ SECRET_PATTERNS = [
     (re.compile(r'(?:secret|token|key)\s*[=:]\s*["\'][a-zA-Z0-9+/=]{16,}["\']', re.IGNORECASE), "Hardcoded secret"),
 ]
 
+# Secret-pattern matches that are never real secrets
+_SECRET_FALSE_POSITIVES = frozenset(("true", "false", "null"))
+
 # Prompt injection indicators
 INJECTION_PATTERNS = [
     re.compile(r'ignore\s+(?:all\s+)?(?:previous|above|prior)\s+instructions', re.IGNORECASE),
@@ -100,6 +144,266 @@ SQL_INJECTION_PATTERNS = [
     re.compile(r'execute\s*\(\s*f["\']', re.IGNORECASE),
 ]
 
+# File-access sinks that make a "../" in the same text suspicious
+_PATH_TRAVERSAL_SINK = re.compile(r'open\(|Path\(|read')
+
+# Lowercase literals each pattern cannot match without, index-aligned with the
+# pattern lists above (None = no mandatory literal, always run the regex).
+_SECRET_LITERALS = [
+    ("sk-",),
+    ("sk-or-",),
+    ("sk-ant-",),
+    ("ghp_",),
+    ("gho_",),
+    ("github_pat_",),
+    ("glpat-",),
+    ("xox",),
+    ("akia",),
+    None,
+    ("-----begin ",),
+    ("-----begin pgp",),
+    ("postgres://", "mysql://", "mongodb://"),
+    ("password", "passwd", "pwd"),
+    ("secret", "token", "key"),
+]
+
+_INJECTION_LITERALS = [
+    ("ignore",),
+    ("you",),
+    ("prompt",),
+    ("override",),
+    ("forget",),
+    ("disregard",),
+    ("system:",),
+    ("[inst]", "[/inst]", "<|im_start|>", "<|im_end|>"),
+]
+
+_SQL_KEYWORDS = ("select", "insert", "update", "delete", "drop")
+_SQL_INJECTION_LITERALS = [
+    _SQL_KEYWORDS,
+    _SQL_KEYWORDS,
+    (".format(",),
+    ("execute",),
+]
+
+
+def _build_hyperscan_matcher(patterns: list[re.Pattern]) -> Optional[Callable[[str], set[int]]]:
+    """Compile *patterns* into one Hyperscan block-mode database (SIMD, one pass).
+
+    Returns a ``text -> matching pattern indexes`` callable, or None when
+    Hyperscan is not installed or rejects a pattern.
+    """
+    if hyperscan is None:
+        return None
+    flags = [
+        hyperscan.HS_FLAG_SINGLEMATCH
+        | (hyperscan.HS_FLAG_CASELESS if p.flags & re.IGNORECASE else 0)
+        for p in patterns
+    ]
+    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    try:
+        db.compile(
+            expressions=[p.pattern.encode() for p in patterns],
+            ids=list(range(len(patterns))),
+            flags=flags,
+        )
+    except Exception as e:
+        logger.debug(f"Hyperscan database unavailable: {e}")
+        return None
+
+    def match(text: str) -> set[int]:
+        hits: set[int] = set()
+        db.scan(text.encode(), match_event_handler=lambda idx, *_: hits.add(idx))
+        return hits
+
+    return match
+
+
+def _build_re2_matcher(patterns: list[re.Pattern]) -> Optional[Callable[[str], set[int]]]:
+    """Compile *patterns* into a single RE2 search set (one linear-time pass).
+
+    Returns a ``text -> matching pattern indexes`` callable, or None when RE2
+    is not installed or a pattern is not RE2-compatible.
+    """
+    if re2 is None:
+        return None
+    pattern_set = re2.Set.SearchSet(re2.Options())
+    try:
+        for pattern in patterns:
+            src = pattern.pattern
+            if pattern.flags & re.IGNORECASE:
+                src = "(?i)" + src
+            pattern_set.Add(src)
+        pattern_set.Compile()
+    except Exception as e:
+        logger.debug(f"RE2 pattern set unavailable, using stdlib re: {e}")
+        return None
+    return lambda text: set(pattern_set.Match(text) or ())
+
+
+class _PatternPrefilter:
+    """Narrows which patterns of a list can possibly match a given text.
+
+    Stage 1 is a literal prescreen (one Aho-Corasick pass when pyahocorasick
+    is installed): texts containing none of the patterns' mandatory literals
+    skip regex work entirely, which is the common case on clean traffic.
+    Stage 2 runs every pattern in a single pass — a Hyperscan database when
+    hyperscan is installed, else an RE2 set when google-re2 is — so only real
+    hits are re-run with the stdlib ``re``.
+
+    Non-ASCII text always gets every pattern: the prescreen lowercases, and
+    Hyperscan/RE2's ``\\w``/``\\s``/case folding are ASCII-only, where the
+    stdlib's are Unicode-aware.
+    """
+
+    def __init__(self, patterns: list[re.Pattern], literals: list[Optional[tuple[str, ...]]]):
+        if len(patterns) != len(literals):
+            raise ValueError("pattern and literal tables are out of sync")
+        self._all = range(len(patterns))
+        self._always = frozenset(i for i, lits in enumerate(literals) if lits is None)
+        self._by_literal: dict[str, list[int]] = defaultdict(list)
+        for idx, lits in enumerate(literals):
+            for lit in lits or ():
+                self._by_literal[lit].append(idx)
+        self._automaton = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for lit, idxs in self._by_literal.items():
+                self._automaton.add_word(lit, idxs)
+            self._automaton.make_automaton()
+        # Hyperscan if installed, else RE2; None leaves the literal prescreen alone
+        self._matcher = _build_hyperscan_matcher(patterns) or _build_re2_matcher(patterns)
+
+    def _literal_hits(self, lowered: str) -> set[int]:
+        hits = set(self._always)
+        if self._automaton is not None:
+            for _, idxs in self._automaton.iter(lowered):
+                hits.update(idxs)
+        else:
+            for lit, idxs in self._by_literal.items():
+                if lit in lowered:
+                    hits.update(idxs)
+        return hits
+
+    def candidates(self, text: str):
+        """Indexes of the patterns worth running against *text*, in order."""
+        if not text.isascii():
+            return self._all
+        # An always-run pattern makes the prescreen moot once RE2 is available
+        if self._matcher is None or not self._always:
+            hits = self._literal_hits(text.lower())
+            if not hits:
+                return ()
+            if self._matcher is None:
+                return sorted(hits)
+        return sorted(self._matcher(text))
+
+
+@dataclass(frozen=True)
+class _SecretTable:
+    """Struct-of-arrays view of SECRET_PATTERNS.
+
+    The scan loop only walks ``patterns``; ``descriptions`` is read on a hit.
+    """
+
+    patterns: tuple[re.Pattern, ...]
+    descriptions: tuple[str, ...]
+
+
+_SECRETS = _SecretTable(
+    patterns=tuple(p for p, _ in SECRET_PATTERNS),
+    descriptions=tuple(d for _, d in SECRET_PATTERNS),
+)
+
+_SECRET_PREFILTER = _PatternPrefilter(list(_SECRETS.patterns), _SECRET_LITERALS)
+_SQL_INJECTION_PREFILTER = _PatternPrefilter(SQL_INJECTION_PATTERNS, _SQL_INJECTION_LITERALS)
+_INJECTION_PREFILTER = _PatternPrefilter(INJECTION_PATTERNS, _INJECTION_LITERALS)
+
+
+def _combine_patterns(patterns: list[re.Pattern]) -> re.Pattern:
+    """Join *patterns* into one alternation, scoping each one's IGNORECASE flag."""
+    return re.compile("|".join(
+        f"(?i:{p.pattern})" if p.flags & re.IGNORECASE else f"(?:{p.pattern})"
+        for p in patterns
+    ))
+
+
+# Whole INJECTION_PATTERNS list as one regex: a single stdlib search per text
+# instead of one per surviving candidate
+_INJECTION_COMBINED = _combine_patterns(INJECTION_PATTERNS)
+
+
+def _has_injection(text: str) -> bool:
+    """True if any prompt injection pattern matches *text*."""
+    if not _INJECTION_PREFILTER.candidates(text):
+        return False
+    return _INJECTION_COMBINED.search(text) is not None
+
+
+def _content_key(data: str | bytes):
+    """128-bit content hash used to key the scan caches."""
+    if isinstance(data, str):
+        data = data.encode("utf-8", "surrogatepass")
+    if xxhash is not None:
+        return xxhash.xxh3_128_intdigest(data)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _iter_strings(obj, path: str, skip: tuple[str, ...] = ()) -> Iterator[tuple[str, str]]:
+    """Yield ``(text, json_path)`` for every string leaf and string dict key under *obj*.
+
+    Top-level keys in *skip* are not descended into. Non-container, non-string
+    leaves other than numbers/bools/None are stringified, like ``default=str``.
+    """
+    if isinstance(obj, str):
+        if obj:
+            yield obj, path
+    elif isinstance(obj, dict):
+        for key, value in obj.items():
+            if key in skip:
+                continue
+            # Keys were part of the serialized text too; payloads can hide content there
+            if isinstance(key, str) and key:
+                yield key, f"{path}.{key}"
+            yield from _iter_strings(value, f"{path}.{key}")
+    elif isinstance(obj, (list, tuple)):
+        for i, value in enumerate(obj):
+            yield from _iter_strings(value, f"{path}[{i}]")
+    elif obj is not None and not isinstance(obj, (int, float, bool)):
+        yield str(obj), path
+
+
+class _SecurityEvent(NamedTuple):
+    """Raw security log entry; formatted only when an audit report is built."""
+
+    ts_ns: int
+    task_id: str
+    from_agent: str
+    to_agent: str
+    action: str
+    verdict: str
+    issues: tuple[dict, ...]
+
+
+def _render_event(event: _SecurityEvent) -> dict:
+    """Format a raw security log entry for the audit report."""
+    secs, ns = divmod(event.ts_ns, 1_000_000_000)
+    ts = datetime.fromtimestamp(secs, tz=timezone.utc).replace(microsecond=ns // 1_000)
+    issues = event.issues
+    return {
+        "timestamp": ts.isoformat(),
+        "task_id": event.task_id,
+        "from_agent": event.from_agent,
+        "to_agent": event.to_agent,
+        "action": event.action,
+        "verdict": event.verdict,
+        "issue_count": len(issues),
+        "severities": [i.get("severity") for i in issues],
+        "categories": [i.get("category") for i in issues],
+        "summary": issues[0]["description"] if issues else "",
+    }
+
+
 # ─── Review Prompt ────────────────────────────────────────────────────────────
 
 BREAKING_CHANGE_PROMPT = """\
@@ -249,14 +553,26 @@ class GuardianAgent(BaseAgent):
         self._daily_token_budget = int(
             os.environ.get("COST_BUDGET_DAILY_TOKENS", "1000000")
         )
-        self._token_counts: dict[str, int] = defaultdict(int)  # agent -> tokens today
-        self._hourly_counts: dict[str, int] = defaultdict(int)  # agent -> tokens this hour
+        self._token_counts: Counter[str] = Counter()  # agent -> tokens today
+        self._hourly_counts: Counter[str] = Counter()  # agent -> tokens this hour
+        self._total_today = 0  # running sums of the two dicts above
+        self._total_hour = 0
         self._cost_reset_date: str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
         self._hour_reset: int = datetime.now(timezone.utc).hour
+        self._next_rollover: float = 0.0  # epoch of the next UTC hour boundary
+
+        # Deep LLM reviews queued off the intercept hot path
+        self._llm_queue: asyncio.Queue = asyncio.Queue(maxsize=LLM_REVIEW_QUEUE_SIZE)
+
+        # task_id -> hash of the last result reviewed for it (LRU)
+        self._scanned_results: OrderedDict[str, Any] = OrderedDict()
+
+        # Content-hash LRU of per-text scan results
+        self._scan_cache: OrderedDict[tuple, Any] = OrderedDict()
 
         # Security event log (in-memory ring buffer)
-        self._security_log: list[dict] = []
         self._max_log_entries = 1000
+        self._security_log: deque[_SecurityEvent] = deque(maxlen=self._max_log_entries)
 
         # Stats
         self._messages_scanned = 0
@@ -282,10 +598,11 @@ class GuardianAgent(BaseAgent):
         """
         Override the standard run loop.
 
-        The Guardian runs TWO tasks concurrently:
+        The Guardian runs these tasks concurrently:
         1. Intercept polling — polls SQLite bus for completed messages to review
         2. Direct polling — receives queries like cost reports, audit requests
         3. Cost reset — periodic counter resets
+        4. LLM review workers — deep reviews queued by the intercept loop
         """
         await self.on_startup()
 
@@ -294,6 +611,7 @@ class GuardianAgent(BaseAgent):
                 self._run_intercept_loop(),
                 self._run_direct_loop(),
                 self._run_cost_reset_loop(),
+                *(self._run_llm_review_worker() for _ in range(LLM_REVIEW_WORKERS)),
             )
         except asyncio.CancelledError:
             logger.info("Guardian shutting down")
@@ -305,26 +623,31 @@ class GuardianAgent(BaseAgent):
         logger.info("Guardian intercept loop started — polling all traffic")
         self._last_scanned_id = 0
         while True:
+            batch = []
             try:
-                rows = self.bus._db.execute(
-                    "SELECT * FROM message_queue WHERE id > ? AND from_agent != 'guardian' "
-                    "ORDER BY id ASC LIMIT 20",
-                    (self._last_scanned_id,),
-                ).fetchall()
-                for row in rows:
-                    self._last_scanned_id = row["id"]
-                    msg = self.bus.get_task(row["task_id"])
-                    if msg:
+                token = self.bus.change_token()
+                batch = self.bus.get_tasks_since(self._last_scanned_id, INTERCEPT_BATCH_SIZE)
+                # Token usage is tallied for the whole poll tick in one pass
+                self._rotate_cost_counters()
+                self._track_tokens(msg for _, msg in batch if msg is not None)
+                for row_id, msg in batch:
+                    self._last_scanned_id = row_id
+                    if msg is not None:
                         await self._handle_intercept(msg)
             except Exception as e:
                 logger.warning(f"Intercept poll error: {e}")
-            await asyncio.sleep(1.0)
+                await asyncio.sleep(1.0)
+                continue
+            # A full batch means more rows are likely waiting — poll again now
+            if len(batch) < INTERCEPT_BATCH_SIZE:
+                await self.bus.wait_for_change(token, timeout=POLL_WATCHDOG_SECONDS)
 
     async def _run_direct_loop(self):
         """Poll for direct queries addressed to the Guardian."""
         logger.info("Guardian direct query loop started")
         while True:
             try:
+                token = self.bus.change_token()
                 messages = self.bus.receive(AgentRole.GUARDIAN, limit=5)
                 for msg in messages:
                     result = await self.handle_task(msg)
@@ -334,7 +657,9 @@ class GuardianAgent(BaseAgent):
                         )
             except Exception as e:
                 logger.warning(f"Direct poll error: {e}")
-            await asyncio.sleep(1.0)
+                await asyncio.sleep(1.0)
+                continue
+            await self.bus.wait_for_change(token, timeout=POLL_WATCHDOG_SECONDS)
 
     async def _run_cost_reset_loop(self):
         """Periodically reset hourly counters and check daily rollover."""
@@ -345,6 +670,7 @@ class GuardianAgent(BaseAgent):
             # Hourly reset
             if now.hour != self._hour_reset:
                 self._hourly_counts.clear()
+                self._total_hour = 0
                 self._hour_reset = now.hour
 
             # Daily reset
@@ -352,9 +678,11 @@ class GuardianAgent(BaseAgent):
             if today != self._cost_reset_date:
                 logger.info(
                     f"Daily cost reset. Yesterday's total: "
-                    f"{sum(self._token_counts.values())} tokens"
+                    f"{self._total_today} tokens"
                 )
                 self._token_counts.clear()
+                self._total_today = 0
+                self._scan_cache.clear()
                 self._cost_reset_date = today
 
     async def handle_task(self, msg: AgentMessage) -> Optional[dict]:
@@ -381,23 +709,31 @@ class GuardianAgent(BaseAgent):
         Called for EVERY message on the bus. This is the core security loop.
 
         For most messages: quick regex scan (fast, no LLM call).
-        For Builder outputs with artifacts: full LLM security review.
+        For Builder outputs with artifacts: also queued for a background
+        LLM security review, which can escalate the verdict afterwards.
         """
         self._messages_scanned += 1
         self._rotate_cost_counters()
 
-        # Track token usage from message metadata
-        self._track_tokens(msg)
+        # Normalize roles once; everything below works on the string values
+        from_val = msg.from_agent.value if isinstance(msg.from_agent, AgentRole) else msg.from_agent
+        to_val = msg.to_agent.value if isinstance(msg.to_agent, AgentRole) else msg.to_agent
 
         # Skip scanning our own messages to avoid infinite loops
-        from_val = msg.from_agent.value if isinstance(msg.from_agent, AgentRole) else msg.from_agent
-        if from_val == AgentRole.GUARDIAN.value:
+        if from_val == _GUARDIAN_VAL:
             return
 
         # Skip pending/in-progress messages (scan results, not requests)
         if msg.status in (TaskStatus.PENDING.value, TaskStatus.IN_PROGRESS.value):
             return
 
+        # Skip tasks whose content we already reviewed (rows re-surface on
+        # every status change, each resolving to the same latest state)
+        scan_key = _content_key(json_codec.dumps_bytes([msg.payload, msg.context, msg.result]))
+        if self._scanned_results.get(msg.task_id) == scan_key:
+            self._scanned_results.move_to_end(msg.task_id)
+            return
+
         # Determine scan depth based on message content
         has_artifacts = bool(
             msg.result and msg.result.get("artifacts")
@@ -408,7 +744,7 @@ class GuardianAgent(BaseAgent):
                 or msg.result.get("artifacts")
             )
         )
-        from_builder = from_val == AgentRole.BUILDER.value
+        from_builder = from_val == _BUILDER_VAL
 
         # Phase 1: Fast regex scan (always)
         regex_issues = self._fast_scan(msg)
@@ -422,20 +758,52 @@ class GuardianAgent(BaseAgent):
         # Combine fast-scan issues
         all_issues = regex_issues + cost_issues + injection_issues
 
-        # Phase 4: Deep LLM scan (only for Builder outputs with code/artifacts)
-        if from_builder and has_code:
+        # Phase 4: Deep LLM scan (only for Builder outputs with code/artifacts).
+        # Queued for the background reviewers so a slow LLM never stalls the
+        # intercept loop; skipped when the fast scan already blocks.
+        if from_builder and has_code and self._determine_verdict(all_issues) != "block":
+            try:
+                self._llm_queue.put_nowait((msg, all_issues, from_val, to_val))
+            except asyncio.QueueFull:
+                # Backpressure: review inline rather than drop it
+                logger.warning("LLM review queue full — reviewing inline")
+                try:
+                    llm_issues = await self._llm_security_review(msg)
+                    all_issues.extend(llm_issues)
+                except Exception as e:
+                    logger.warning(f"LLM security review failed: {e}")
+
+        self._apply_verdict(msg, all_issues, all_issues, from_val, to_val)
+
+        # Only a completed scan counts; a failure above leaves the task to be retried
+        self._scanned_results[msg.task_id] = scan_key
+        self._scanned_results.move_to_end(msg.task_id)
+        if len(self._scanned_results) > SCANNED_TASKS_MAX:
+            self._scanned_results.popitem(last=False)
+
+    async def _run_llm_review_worker(self):
+        """Drain the deep-review queue, re-issuing the verdict if the LLM finds more."""
+        while True:
+            msg, fast_issues, from_val, to_val = await self._llm_queue.get()
             try:
                 llm_issues = await self._llm_security_review(msg)
-                all_issues.extend(llm_issues)
+                if llm_issues:
+                    self._apply_verdict(msg, fast_issues + llm_issues, llm_issues, from_val, to_val)
             except Exception as e:
                 logger.warning(f"LLM security review failed: {e}")
-
-        # Determine verdict
+            finally:
+                self._llm_queue.task_done()
+
+    def _apply_verdict(
+        self, msg: AgentMessage, all_issues: list[dict], new_issues: list[dict],
+        from_val: str, to_val: str,
+    ) -> str:
+        """Record *new_issues* and act on the verdict for *all_issues* (block or flag)."""
         verdict = self._determine_verdict(all_issues)
 
-        if all_issues:
-            self._issues_found += len(all_issues)
-            self._log_security_event(msg, verdict, all_issues)
+        if new_issues:
+            self._issues_found += len(new_issues)
+            self._log_security_event(msg, verdict, all_issues, from_val, to_val)
 
         if verdict == "block":
             self._blocks_issued += 1
@@ -461,6 +829,8 @@ class GuardianAgent(BaseAgent):
             # Attach warnings to the message metadata
             msg.metadata["guardian_flags"] = all_issues
 
+        return verdict
+
     # ─── Fast Regex Scanning ──────────────────────────────────────────
 
     def _fast_scan(self, msg: AgentMessage) -> list[dict]:
@@ -474,63 +844,84 @@ class GuardianAgent(BaseAgent):
         texts_to_scan = self._extract_scannable_text(msg)
 
         for text, location in texts_to_scan:
-            # Secret detection
-            for pattern, description in SECRET_PATTERNS:
-                matches = pattern.findall(text)
-                if matches:
-                    # Filter out false positives (short matches, common strings)
-                    real_matches = [
-                        m for m in matches
-                        if len(m) > 10 and m not in ("true", "false", "null")
-                    ]
-                    if real_matches:
-                        issues.append({
-                            "severity": "critical",
-                            "category": "secret_leak",
-                            "description": f"Possible {description} detected",
-                            "location": location,
-                            "recommendation": "Use environment variables instead of hardcoding secrets",
-                        })
-
-            # SQL injection in code
-            for pattern in SQL_INJECTION_PATTERNS:
-                if pattern.search(text):
-                    issues.append({
-                        "severity": "high",
-                        "category": "injection",
-                        "description": "Possible SQL injection: string formatting in SQL query",
-                        "location": location,
-                        "recommendation": "Use parameterized queries instead of string formatting",
+            for finding in self._cached_scan("fast", text, self._scan_text):
+                issues.append({**finding, "location": location})
+
+        return issues
+
+    def _scan_text(self, text: str) -> tuple[dict, ...]:
+        """Secret / SQL injection / path traversal findings for one text, minus location."""
+        findings = []
+
+        # Secret detection — only run the patterns the prefilter kept, and
+        # stop at the first match that survives the false-positive filter
+        patterns = _SECRETS.patterns
+        for idx in _SECRET_PREFILTER.candidates(text):
+            for match in patterns[idx].finditer(text):
+                value = match.group(0)
+                # Filter out false positives (short matches, common strings)
+                if len(value) > 10 and value not in _SECRET_FALSE_POSITIVES:
+                    findings.append({
+                        "severity": "critical",
+                        "category": "secret_leak",
+                        "description": f"Possible {_SECRETS.descriptions[idx]} detected",
+                        "recommendation": "Use environment variables instead of hardcoding secrets",
                     })
+                    break
 
-            # Path traversal
-            if "../" in text and ("open(" in text or "Path(" in text or "read" in text):
-                issues.append({
+        # SQL injection in code
+        for idx in _SQL_INJECTION_PREFILTER.candidates(text):
+            if SQL_INJECTION_PATTERNS[idx].search(text):
+                findings.append({
                     "severity": "high",
-                    "category": "vulnerability",
-                    "description": "Possible path traversal vulnerability",
-                    "location": location,
-                    "recommendation": "Resolve paths and validate they stay within allowed directories",
+                    "category": "injection",
+                    "description": "Possible SQL injection: string formatting in SQL query",
+                    "recommendation": "Use parameterized queries instead of string formatting",
                 })
 
-        return issues
+        # Path traversal
+        if "../" in text and _PATH_TRAVERSAL_SINK.search(text):
+            findings.append({
+                "severity": "high",
+                "category": "vulnerability",
+                "description": "Possible path traversal vulnerability",
+                "recommendation": "Resolve paths and validate they stay within allowed directories",
+            })
 
-    def _extract_scannable_text(self, msg: AgentMessage) -> list[tuple[str, str]]:
-        """Extract all text content from a message for scanning."""
-        texts = []
+        return tuple(findings)
 
-        # Scan payload
-        payload_str = json.dumps(msg.payload, default=str)
-        texts.append((payload_str, "payload"))
+    def _cached_scan(self, kind: str, text: str, scan: Callable[[str], Any]) -> Any:
+        """Run ``scan(text)``, memoized by content hash in a bounded LRU.
 
-        # Scan context
-        context_str = json.dumps(msg.context, default=str)
-        texts.append((context_str, "context"))
+        The same result/payload is re-seen across status transitions, so
+        identical bytes only pay for regex work once. Short texts bypass the
+        cache since hashing them costs about as much as scanning.
+        """
+        if len(text) < SCAN_CACHE_MIN_CHARS:
+            return scan(text)
+        key = (kind, _content_key(text))
+        cache = self._scan_cache
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        result = scan(text)
+        cache[key] = result
+        if len(cache) > SCAN_CACHE_SIZE:
+            cache.popitem(last=False)
+        return result
+
+    def _extract_scannable_text(self, msg: AgentMessage) -> list[tuple[str, str]]:
+        """Extract all text content from a message for scanning.
+
+        Yields string leaves with their JSON path as location rather than
+        serializing whole payload/context/result dicts just to regex them.
+        """
+        texts = list(_iter_strings(msg.payload, "payload"))
+        texts.extend(_iter_strings(msg.context, "context"))
 
         # Scan result (most important — this is the output)
         if msg.result:
-            result_str = json.dumps(msg.result, default=str)
-            texts.append((result_str, "result"))
+            texts.extend(_iter_strings(msg.result, "result", skip=("artifacts", "code_output")))
 
             # Scan individual artifacts more carefully
             for i, artifact in enumerate(msg.result.get("artifacts", [])):
@@ -545,6 +936,8 @@ class GuardianAgent(BaseAgent):
                     texts.append((stdout["stdout"], "stdout"))
                 if stdout.get("stderr"):
                     texts.append((stdout["stderr"], "stderr"))
+            elif stdout:
+                texts.extend(_iter_strings(stdout, "result.code_output"))
 
         return texts
 
@@ -555,14 +948,9 @@ class GuardianAgent(BaseAgent):
         issues = []
 
         # Scan payload and context for injection patterns
-        scan_texts = [
-            (json.dumps(msg.payload, default=str), "payload"),
-            (json.dumps(msg.context, default=str), "context"),
-        ]
-
-        for text, location in scan_texts:
-            for pattern in INJECTION_PATTERNS:
-                if pattern.search(text):
+        for block, root in ((msg.payload, "payload"), (msg.context, "context")):
+            for text, location in _iter_strings(block, root):
+                if self._cached_scan("injection", text, _has_injection):
                     issues.append({
                         "severity": "high",
                         "category": "injection",
@@ -570,7 +958,7 @@ class GuardianAgent(BaseAgent):
                         "location": location,
                         "recommendation": "Sanitize user input before passing to agents",
                     })
-                    break  # One injection finding per text block is enough
+                    break  # One injection finding per payload/context is enough
 
         return issues
 
@@ -579,7 +967,9 @@ class GuardianAgent(BaseAgent):
     def _check_budget(self) -> list[dict]:
         """Check current token usage against budget thresholds."""
         issues = []
-        total_today = sum(self._token_counts.values())
+        total_today = self._total_today
+        if total_today * 100 < WARN_THRESHOLD_PCT * self._daily_token_budget:
+            return issues  # well under budget — nothing to report
         pct = (total_today / self._daily_token_budget * 100) if self._daily_token_budget else 0
 
         if pct >= BLOCK_THRESHOLD_PCT:
@@ -618,27 +1008,45 @@ class GuardianAgent(BaseAgent):
 
         return issues
 
-    def _track_tokens(self, msg: AgentMessage):
-        """Extract and track token usage from a message."""
-        usage = msg.metadata.get("usage", {})
-        tokens = usage.get("total_tokens", 0)
-
-        if tokens > 0:
-            agent = msg.from_agent.value if isinstance(msg.from_agent, AgentRole) else msg.from_agent
-            self._token_counts[agent] += tokens
-            self._hourly_counts[agent] += tokens
+    def _track_tokens(self, msgs: Iterable[AgentMessage]):
+        """Extract and track token usage from a batch of messages."""
+        delta: Counter[str] = Counter()
+        for msg in msgs:
+            tokens = msg.metadata.get("usage", {}).get("total_tokens", 0)
+            if tokens > 0:
+                agent = msg.from_agent.value if isinstance(msg.from_agent, AgentRole) else msg.from_agent
+                delta[agent] += tokens
+
+        if delta:
+            self._token_counts.update(delta)
+            self._hourly_counts.update(delta)
+            total = delta.total()
+            self._total_today += total
+            self._total_hour += total
 
     def _rotate_cost_counters(self):
-        """Check if we need to reset counters (called on each intercept)."""
-        now = datetime.now(timezone.utc)
+        """Check if we need to reset counters (called on each intercept).
+
+        Day and hour rollovers both land on a UTC hour boundary, so until
+        the next one this is a single float compare.
+        """
+        now_ts = time.time()
+        if now_ts < self._next_rollover:
+            return
+        self._next_rollover = (now_ts // 3600 + 1) * 3600
+
+        now = datetime.fromtimestamp(now_ts, tz=timezone.utc)
         today = now.strftime("%Y-%m-%d")
 
         if today != self._cost_reset_date:
             self._token_counts.clear()
+            self._total_today = 0
+            self._scan_cache.clear()
             self._cost_reset_date = today
 
         if now.hour != self._hour_reset:
             self._hourly_counts.clear()
+            self._total_hour = 0
             self._hour_reset = now.hour
 
     # ─── LLM Security Review ─────────────────────────────────────────
@@ -648,12 +1056,11 @@ class GuardianAgent(BaseAgent):
         Deep security review using the LLM for Builder outputs.
         Only called for messages with code artifacts.
         """
-        # Format the output for review
-        output_text = json.dumps(msg.result, indent=2, default=str)
-
-        # Truncate if too long
-        if len(output_text) > 8000:
-            output_text = output_text[:8000] + "\n... (truncated)"
+        # Format the output for review, truncating the encoded bytes
+        raw = json_codec.dumps_bytes(msg.result, indent=True)
+        output_text = raw[:8000].decode("utf-8", "ignore")
+        if len(raw) > 8000:
+            output_text += "\n... (truncated)"
 
         prompt = SECURITY_REVIEW_PROMPT.format(
             from_agent=msg.from_agent,
@@ -978,16 +1385,15 @@ class GuardianAgent(BaseAgent):
                     ),
                     temperature=0.1,
                 )
-                import json as _json
                 try:
-                    parsed = _json.loads(llm_result["content"])
+                    parsed = json_codec.loads(llm_result["content"])
                     llm_explanation = parsed.get("explanation")
                     llm_severity = parsed.get("severity", severity)
                     # Only escalate, never downgrade from pattern-based
                     _order = {"none": 0, "low": 1, "medium": 2, "high": 3}
                     if _order.get(llm_severity, 0) > _order.get(severity, 0):
                         severity = llm_severity
-                except (_json.JSONDecodeError, TypeError):
+                except (json_codec.JSONDecodeError, TypeError):
                     llm_explanation = llm_result.get("content")
             except Exception as e:
                 logger.warning(f"LLM injection analysis failed: {e}")
@@ -1049,7 +1455,7 @@ class GuardianAgent(BaseAgent):
         external_content = msg.context.get("external_content") or msg.payload.get("external_content")
         if external_content:
             injection_result = await self.detect_prompt_injection(
-                external_content if isinstance(external_content, str) else json.dumps(external_content, default=str)
+                external_content if isinstance(external_content, str) else json_codec.dumps(external_content)
             )
             if injection_result["severity"] in ("medium", "high"):
                 all_issues.append({
@@ -1069,7 +1475,7 @@ class GuardianAgent(BaseAgent):
         # 4. LLM security review for code artifacts
         from_val = msg.from_agent.value if isinstance(msg.from_agent, AgentRole) else msg.from_agent
         has_code = bool(msg.result and (msg.result.get("code_output") or msg.result.get("artifacts")))
-        if from_val == AgentRole.BUILDER.value and has_code:
+        if from_val == _BUILDER_VAL and has_code:
             try:
                 llm_issues = await self._llm_security_review(msg)
                 all_issues.extend(llm_issues)
@@ -1149,8 +1555,8 @@ class GuardianAgent(BaseAgent):
 
     def _build_cost_report(self) -> dict:
         """Build the cost report dict."""
-        total_today = sum(self._token_counts.values())
-        total_hour = sum(self._hourly_counts.values())
+        total_today = self._total_today
+        total_hour = self._total_hour
         budget_remaining = max(0, self._daily_token_budget - total_today)
         pct_remaining = (
             (budget_remaining / self._daily_token_budget * 100)
@@ -1174,16 +1580,23 @@ class GuardianAgent(BaseAgent):
     def _generate_audit_report(
         self, task_id: Optional[str] = None, last_n: int = 50
     ) -> dict:
-        """Generate an audit report of recent security events."""
-        events = self._security_log[-last_n:]
+        """Generate an audit report of recent security events (``last_n`` 0 means all)."""
+        try:
+            last_n = max(int(last_n), 0)
+        except (TypeError, ValueError):
+            last_n = 50
+        if last_n:
+            events = list(islice(reversed(self._security_log), last_n))[::-1]
+        else:
+            events = list(self._security_log)
 
         if task_id:
-            events = [e for e in events if e.get("task_id", "").startswith(task_id)]
+            events = [e for e in events if e.task_id.startswith(task_id)]
 
         return {
             "verdict": "pass",
             "issues": [],
-            "audit_log": events,
+            "audit_log": [_render_event(e) for e in events],
             "stats": {
                 "messages_scanned": self._messages_scanned,
                 "issues_found": self._issues_found,
@@ -1197,24 +1610,16 @@ class GuardianAgent(BaseAgent):
     # ─── Security Event Log ───────────────────────────────────────────
 
     def _log_security_event(
-        self, msg: AgentMessage, verdict: str, issues: list[dict]
+        self, msg: AgentMessage, verdict: str, issues: list[dict],
+        from_val: str, to_val: str,
     ):
-        """Record a security event in the in-memory ring buffer."""
-        event = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "task_id": msg.task_id,
-            "from_agent": msg.from_agent.value if isinstance(msg.from_agent, AgentRole) else msg.from_agent,
-            "to_agent": msg.to_agent.value if isinstance(msg.to_agent, AgentRole) else msg.to_agent,
-            "action": msg.action,
-            "verdict": verdict,
-            "issue_count": len(issues),
-            "severities": [i.get("severity") for i in issues],
-            "categories": [i.get("category") for i in issues],
-            "summary": issues[0]["description"] if issues else "",
-        }
+        """Record a security event in the in-memory ring buffer.
 
-        self._security_log.append(event)
+        Stored raw — formatting is deferred to _generate_audit_report.
+        """
+        event = _SecurityEvent(
+            time.time_ns(), msg.task_id, from_val, to_val, msg.action, verdict, tuple(issues),
+        )
 
-        # Ring buffer: trim if over limit
-        if len(self._security_log) > self._max_log_entries:
-            self._security_log = self._security_log[-self._max_log_entries:]
+        # Ring buffer: the deque's maxlen drops the oldest entry
+        self._security_log.append(event)
@@ -16,16 +16,38 @@ Pipeline:
 5. Cache high-confidence findings in the knowledge cache
 """
 
-import json
+import functools
+import hashlib
+import heapq
+import io
+import itertools
 import logging
 import os
+import re
+import string
+import time
+import zlib
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
+import numpy as np
+
+from agents.common import json_codec
 from agents.common.base_agent import BaseAgent
 from agents.common.protocol import AgentRole, AgentMessage, TaskStatus
 from agents.common.sub_agent import SubAgentPool, SubTask, SubResult
 
+try:
+    import xxhash
+except ImportError:  # optional: pip install xxhash (hashlib.blake2b otherwise)
+    xxhash = None
+
+try:
+    import fastjsonschema
+except ImportError:  # optional: pip install fastjsonschema (outputs go unchecked otherwise)
+    fastjsonschema = None
+
 logger = logging.getLogger(__name__)
 
 # ─── Constants ────────────────────────────────────────────────────────────────
@@ -34,16 +56,135 @@ MIN_THREADS = 3
 MAX_THREADS = 6
 DEFAULT_THREADS = 4
 
+# Threads packed into one sub-agent prompt, and the output budget per thread
+INVESTIGATE_BATCH_SIZE = 3
+INVESTIGATE_TOKENS_PER_THREAD = 2048
+
+# Facts below this confidence are not written to the knowledge cache, and each
+# thread keeps only its most confident cacheable facts
+CACHE_MIN_CONFIDENCE = 0.75
+CACHE_FACTS_PER_THREAD = 5
+
+# Each full step of sub-agent p95 latency drops one investigation thread
+THREAD_LATENCY_STEP_MS = 5000
+
+# Planned threads whose focus sketches are this similar are treated as one
+THREAD_DUP_SIMILARITY = 0.9
+SKETCH_DIM = 256
+
+# Character budget for the thread results embedded in the synthesis prompt
+SYNTHESIS_INPUT_CHARS = 12000
+
+# Finished reports are reused for identical (query, context) pairs. Reports
+# where risk threads make up at least half the plan age out sooner.
+REPORT_CACHE_TTL_S = 86400
+REPORT_CACHE_RISK_TTL_S = 6 * 3600
+REPORT_CACHE_MAX_FILES = 512
+
+# Quality assumed for source types outside SOURCE_QUALITY
+UNKNOWN_SOURCE_QUALITY = 0.3
+
+
+class _SourceQualityTable(dict):
+    """Source type -> quality; unlisted types score UNKNOWN_SOURCE_QUALITY.
+
+    ``__missing__`` keeps lookups a plain subscript without inserting keys,
+    so arbitrary LLM-supplied source types never grow the table.
+    """
+
+    def __missing__(self, key):
+        return UNKNOWN_SOURCE_QUALITY
+
+
 # Source quality tiers (used in scoring)
-SOURCE_QUALITY = {
+SOURCE_QUALITY = _SourceQualityTable({
     "official_docs": 1.0,
     "peer_reviewed": 0.95,
     "official_blog": 0.85,
     "news_reputable": 0.75,
     "community_docs": 0.6,
     "forum_social": 0.4,
-    "unknown": 0.3,
-}
+    "unknown": UNKNOWN_SOURCE_QUALITY,
+})
+
+_PUNCT_TBL = str.maketrans("", "", string.punctuation)
+
+# Comparison queries get an extra thread (one per option being compared)
+_COMPARE_RE = re.compile(r"\b(?:vs|versus|compare|comparison|difference|better)\b", re.IGNORECASE)
+
+
+def _dedup_key(text: Any) -> int:
+    """64-bit key for near-verbatim dedup: case- and punctuation-insensitive."""
+    if not isinstance(text, str):
+        text = str(text)
+    data = text[:200].lower().translate(_PUNCT_TBL).strip().encode("utf-8", "surrogatepass")
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+@functools.lru_cache(maxsize=1024)
+def _thread_count_for(query: str) -> int:
+    """Heuristic thread count for *query* (pure, so memoized)."""
+    if _COMPARE_RE.search(query):
+        return min(MAX_THREADS, DEFAULT_THREADS + 1)
+    words = len(query.split())
+    if words > 50:
+        return MAX_THREADS
+    elif words > 20:
+        return DEFAULT_THREADS
+    else:
+        return MIN_THREADS
+
+
+_WORD_RE = re.compile(r"\w+")
+
+# Outermost {...} of a reply that wraps its JSON in prose or code fences
+_BRACE_RE = re.compile(r"\{.*\}", re.S)
+
+
+def _sketch(text: str) -> np.ndarray:
+    """Unit-length hashed bag of word unigrams + bigrams (SKETCH_DIM buckets)."""
+    words = _WORD_RE.findall(text.lower())
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    vec = np.zeros(SKETCH_DIM, dtype=np.float32)
+    for feature in features:
+        vec[zlib.crc32(feature.encode()) % SKETCH_DIM] += 1.0
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+@functools.lru_cache(maxsize=256)
+def _fallback_threads_cached(query_key: str) -> tuple[dict, ...]:
+    """Fallback thread templates for *query_key* (the query's first 200 chars).
+
+    Shared between callers — copy before handing out (see _fallback_threads).
+    """
+    q200, q100, q80 = query_key, query_key[:100], query_key[:80]
+    return (
+        {
+            "id": "main",
+            "focus": f"Core answer to: {q200}",
+            "search_queries": (q100,),
+            "expected_source_types": ("official_docs", "peer_reviewed"),
+            "is_risk_thread": False,
+        },
+        {
+            "id": "context",
+            "focus": f"Background context and related information for: {q100}",
+            "search_queries": (f"{q80} overview",),
+            "expected_source_types": ("official_blog", "news_reputable"),
+            "is_risk_thread": False,
+        },
+        {
+            "id": "risks",
+            "focus": f"Risks, limitations, and counterarguments for: {q100}",
+            "search_queries": (f"{q80} risks problems",),
+            "expected_source_types": ("community_docs", "news_reputable"),
+            "is_risk_thread": True,
+        },
+    )
+
 
 # ─── Prompts ──────────────────────────────────────────────────────────────────
 
@@ -80,11 +221,16 @@ Respond with ONLY a JSON object:
 }}
 """
 
-INVESTIGATE_PROMPT = """\
+# Investigation prompts are split into a prefix shared by every thread of a
+# query and a per-thread suffix, so the backend can reuse the prefix's cache.
+INVESTIGATE_PROMPT_PREFIX = """\
 You are a research sub-agent investigating one specific thread of a larger query.
 
 Original query: {original_query}
 
+"""
+
+INVESTIGATE_PROMPT_SUFFIX = """\
 Your investigation focus: {focus}
 
 Suggested search queries: {search_queries}
@@ -127,6 +273,62 @@ Respond with ONLY a JSON object:
 }}
 """
 
+INVESTIGATE_PROMPT = INVESTIGATE_PROMPT_PREFIX + INVESTIGATE_PROMPT_SUFFIX
+
+INVESTIGATE_BATCH_PROMPT_PREFIX = """\
+You are a research sub-agent investigating several threads of a larger query.
+Investigate each thread independently of the others.
+
+Original query: {original_query}
+
+"""
+
+INVESTIGATE_BATCH_PROMPT_SUFFIX = """\
+Threads:
+{threads}
+
+Investigate thoroughly using your knowledge. For each finding:
+- Note the source type and reliability
+- Distinguish facts from opinions
+- Flag anything time-sensitive or potentially outdated
+
+Respond with ONLY a JSON object with one entry per thread, using the exact
+thread_id given above:
+{{
+  "results": [
+    {{
+      "thread_id": "<thread_id>",
+      "findings": [
+        {{
+          "finding": "<specific finding>",
+          "confidence": <0.0-1.0>,
+          "source": "<source URL or description>",
+          "source_type": "<official_docs|peer_reviewed|official_blog|news_reputable|community_docs|forum_social|training_knowledge>",
+          "is_time_sensitive": false,
+          "relevance": "high|medium|low"
+        }}
+      ],
+      "risks_found": [
+        "<any risks, caveats, or counterarguments discovered>"
+      ],
+      "knowledge_gaps": [
+        "<what you couldn't find or verify>"
+      ],
+      "facts_worth_caching": [
+        {{
+          "fact": "<verified factual statement>",
+          "category": "<technical|financial|general|scientific|market>",
+          "confidence": <0.0-1.0>,
+          "source": "<source>"
+        }}
+      ]
+    }}
+  ]
+}}
+"""
+
+INVESTIGATE_BATCH_PROMPT = INVESTIGATE_BATCH_PROMPT_PREFIX + INVESTIGATE_BATCH_PROMPT_SUFFIX
+
 SYNTHESIZE_PROMPT = """\
 Synthesize these parallel research results into a coherent research brief.
 
@@ -189,6 +391,140 @@ Respond with ONLY a JSON object:
 """
 
 
+# ─── Output Schemas ───────────────────────────────────────────────────────────
+# JSON Schemas mirroring the prompt shapes above, passed as ``json_schema`` so
+# providers with a native JSON mode decode straight into them.
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+_CACHE_FACT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "fact": {"type": "string"},
+        "category": {"type": "string"},
+        "confidence": {"type": "number"},
+        "source": {"type": "string"},
+    },
+    "required": ["fact", "confidence"],
+}
+
+DECOMPOSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "threads": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string"},
+                    "focus": {"type": "string"},
+                    "search_queries": _STRING_LIST,
+                    "expected_source_types": _STRING_LIST,
+                    "is_risk_thread": {"type": "boolean"},
+                },
+                "required": ["id", "focus"],
+            },
+        },
+        "thread_count": {"type": "integer"},
+        "reasoning": {"type": "string"},
+    },
+    "required": ["threads"],
+}
+
+_FINDING_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "finding": {"type": "string"},
+        "confidence": {"type": "number"},
+        "source_type": {"type": "string"},
+    },
+    "required": ["finding"],
+}
+
+# One thread's output; batched replies carry a list of these under "results"
+INVESTIGATE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "findings": {"type": "array", "items": _FINDING_SCHEMA},
+        "risks_found": _STRING_LIST,
+        "knowledge_gaps": _STRING_LIST,
+        "facts_worth_caching": {"type": "array"},
+    },
+}
+
+SYNTHESIZE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "key_findings": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "finding": {"type": "string"},
+                    "confidence": {"type": "number"},
+                    "sources": _STRING_LIST,
+                    "relevance": {"type": "string"},
+                },
+                "required": ["finding"],
+            },
+        },
+        "comparisons": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "subject": {"type": "string"},
+                    "criteria": _STRING_LIST,
+                    "winner": {"type": "string"},
+                    "details": {"type": "string"},
+                },
+            },
+        },
+        "risks_and_caveats": _STRING_LIST,
+        "knowledge_gaps": _STRING_LIST,
+        "contradictions": _STRING_LIST,
+        "recommended_next_steps": _STRING_LIST,
+        "facts_for_cache": {"type": "array", "items": _CACHE_FACT_SCHEMA},
+        "overall_confidence": {"type": "number"},
+        "source_quality_summary": {"type": "string"},
+    },
+    "required": ["summary"],
+}
+
+
+def _compile_validator(schema: dict):
+    """Compiled validator for *schema* (raises ValueError on a mismatch).
+
+    Without fastjsonschema installed every output is accepted as-is.
+    """
+    if fastjsonschema is None:
+        return lambda data: data
+    return fastjsonschema.compile(schema)
+
+
+_validate_decompose = _compile_validator(DECOMPOSE_SCHEMA)
+_validate_investigate = _compile_validator(INVESTIGATE_SCHEMA)
+_validate_synthesize = _compile_validator(SYNTHESIZE_SCHEMA)
+
+
+# ─── Thread Results ──────────────────────────────────────────────────────────
+
+@dataclass(slots=True)
+class ThreadResult:
+    """Outcome of one investigation thread."""
+    thread_id: Optional[str]
+    focus: Optional[str]
+    is_risk_thread: bool = False
+    success: bool = False
+    findings: list[dict] = field(default_factory=list)
+    risks_found: list = field(default_factory=list)
+    knowledge_gaps: list = field(default_factory=list)
+    facts_worth_caching: list[dict] = field(default_factory=list)
+    duration_ms: float = 0.0
+    tokens_used: int = 0
+
+
 # ─── Researcher Agent ─────────────────────────────────────────────────────────
 
 class ResearcherAgent(BaseAgent):
@@ -217,6 +553,10 @@ class ResearcherAgent(BaseAgent):
             "RESEARCHER_INSTANT_MODEL", "kimi-k2.5-instant"
         )
 
+        # Cap on in-flight sub-agent calls across all concurrent research requests
+        if self.sub_pool is not None:
+            self.sub_pool.max_concurrency = int(os.getenv("RESEARCHER_CONCURRENCY", "6"))
+
     # ─── BaseAgent interface ──────────────────────────────────────────
 
     @property
@@ -274,8 +614,17 @@ class ResearcherAgent(BaseAgent):
         2. Run threads in parallel via sub-agents
         3. Evaluate and score source quality
         4. Synthesize into research brief
-        5. Cache high-confidence findings
+        5. Cache high-confidence findings from the threads and the synthesis
         """
+        cache_key = self._report_cache_key(query, context)
+        cached = self._load_cached_report(cache_key)
+        if cached is not None:
+            logger.info(f"Research report cache hit for {cache_key}")
+            cached["research_metadata"] = {
+                **cached.get("research_metadata", {}), "cache_hit": True,
+            }
+            return cached
+
         # Step 1: Decompose
         threads = await self._decompose(query, context)
 
@@ -296,12 +645,12 @@ class ResearcherAgent(BaseAgent):
         # Step 4: Synthesize
         report = await self._synthesize(query, scored_results)
 
-        # Step 5: Cache high-confidence findings
-        facts_to_cache = report.get("facts_for_cache", [])
-        cached_count = 0
-        for fact_entry in facts_to_cache:
-            if self._cache_fact(fact_entry):
-                cached_count += 1
+        # Step 5: Cache the threads' and the synthesis' high-confidence
+        # findings in one bulk write, repeats across the two dropped
+        cached_count = self._cache_facts(self._unique_facts(itertools.chain(
+            (fact for thread in scored_results for fact in thread.facts_worth_caching),
+            report.get("facts_for_cache", []),
+        )))
 
         if cached_count:
             logger.info(f"Cached {cached_count} new facts from research")
@@ -310,7 +659,7 @@ class ResearcherAgent(BaseAgent):
         report["research_metadata"] = {
             "threads_planned": len(threads),
             "threads_succeeded": sum(
-                1 for r in thread_results if r.get("success", False)
+                1 for r in thread_results if r.success
             ),
             "facts_cached": cached_count,
             "sub_agent_metrics": (
@@ -318,8 +667,75 @@ class ResearcherAgent(BaseAgent):
             ),
         }
 
+        if report["research_metadata"]["threads_succeeded"]:
+            risk_share = sum(1 for t in threads if t.get("is_risk_thread")) / len(threads)
+            self._store_cached_report(
+                cache_key, report,
+                REPORT_CACHE_RISK_TTL_S if risk_share >= 0.5 else REPORT_CACHE_TTL_S,
+            )
+
         return report
 
+    # ─── Report Cache ─────────────────────────────────────────────────
+
+    @staticmethod
+    def _report_cache_key(query: str, context: dict) -> str:
+        """Stable key for a (query, context) pair; context key order is ignored."""
+        canonical = json_codec.dumps_bytes(context, sort_keys=True)
+        return hashlib.blake2b(
+            query.encode("utf-8", "surrogatepass") + b"\0" + canonical, digest_size=16
+        ).hexdigest()
+
+    def _report_cache_file(self, key: str) -> Path:
+        return self._knowledge_cache_path / "reports" / f"{key}.json.z"
+
+    def _load_cached_report(self, key: str) -> Optional[dict]:
+        """Return the unexpired cached report for *key*, or None."""
+        path = self._report_cache_file(key)
+        try:
+            entry = json_codec.loads(zlib.decompress(path.read_bytes()))
+            if (
+                not isinstance(entry, dict)
+                or not isinstance(entry.get("expires", 0), (int, float))
+                or not isinstance(entry.get("report"), dict)
+            ):
+                raise ValueError("not a report cache entry")
+        except FileNotFoundError:
+            return None
+        except (OSError, zlib.error, ValueError) as e:
+            logger.debug(f"Discarding unreadable report cache entry {key}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        if entry.get("expires", 0) < time.time():
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)  # mtime doubles as the LRU clock
+        except OSError:
+            pass  # evicted by another run since the read; the report is still good
+        return entry["report"]
+
+    def _store_cached_report(self, key: str, report: dict, ttl_s: float) -> None:
+        """Persist *report* under *key*, evicting least recently used entries."""
+        path = self._report_cache_file(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            blob = zlib.compress(json_codec.dumps_bytes(
+                {"expires": time.time() + ttl_s, "report": report}
+            ))
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(blob)
+            tmp.replace(path)
+
+            entries = list(path.parent.glob("*.json.z"))
+            if len(entries) > REPORT_CACHE_MAX_FILES:
+                entries.sort(key=lambda p: p.stat().st_mtime)
+                for stale in entries[:len(entries) - REPORT_CACHE_MAX_FILES]:
+                    stale.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Failed to cache research report: {e}")
+
     # ─── Decomposition ────────────────────────────────────────────────
 
     async def _decompose(self, query: str, context: dict) -> list[dict]:
@@ -355,9 +771,10 @@ class ResearcherAgent(BaseAgent):
                 ),
                 temperature=0.4,
                 model=self.thinking_model,
+                json_schema=DECOMPOSE_SCHEMA,
             )
-            decomposition = result["content"]
-            threads = decomposition.get("threads", [])
+            decomposition = _validate_decompose(result["content"])
+            threads = self._dedup_threads(decomposition.get("threads", []))
 
             # Validate: ensure at least MIN_THREADS and at most MAX_THREADS
             if len(threads) < MIN_THREADS:
@@ -383,46 +800,44 @@ class ResearcherAgent(BaseAgent):
             return []
 
     def _estimate_thread_count(self, query: str) -> int:
-        """Heuristic: estimate how many threads this query needs."""
-        words = len(query.split())
-
-        # Comparison queries get more threads
-        comparison_keywords = ["vs", "versus", "compare", "comparison", "difference", "better"]
-        is_comparison = any(kw in query.lower() for kw in comparison_keywords)
-
-        if is_comparison:
-            return min(MAX_THREADS, DEFAULT_THREADS + 1)
-        elif words > 50:
-            return MAX_THREADS
-        elif words > 20:
-            return DEFAULT_THREADS
-        else:
-            return MIN_THREADS
+        """Heuristic: estimate how many threads this query needs.
+
+        Wall-clock time is bounded by the slowest thread, so when recent
+        sub-agent p95 latency is high, fewer (wider) threads are planned.
+        """
+        n = _thread_count_for(query)
+        p95_ms = self.sub_pool.get_metrics()["p95_ms"] if self.sub_pool else 0.0
+        if p95_ms >= THREAD_LATENCY_STEP_MS:
+            n = max(MIN_THREADS, n - int(p95_ms // THREAD_LATENCY_STEP_MS))
+            logger.info(f"Sub-agent p95 {p95_ms:.0f}ms — planning {n} research threads")
+        return n
+
+    def _dedup_threads(self, threads: list[dict]) -> list[dict]:
+        """Drop planned threads that restate an earlier one (risk threads always stay)."""
+        kept: list[dict] = []
+        sketches: list[np.ndarray] = []
+        for thread in threads:
+            vec = _sketch(
+                f"{thread.get('focus', '')} {' '.join(map(str, thread.get('search_queries', [])))}"
+            )
+            if not thread.get("is_risk_thread") and any(
+                float(vec @ prev) > THREAD_DUP_SIMILARITY for prev in sketches
+            ):
+                logger.info(f"Dropping near-duplicate research thread '{thread.get('id')}'")
+                continue
+            kept.append(thread)
+            sketches.append(vec)
+        return kept
 
     def _fallback_threads(self, query: str) -> list[dict]:
         """Generate basic threads when LLM decomposition fails."""
         return [
             {
-                "id": "main",
-                "focus": f"Core answer to: {query[:200]}",
-                "search_queries": [query[:100]],
-                "expected_source_types": ["official_docs", "peer_reviewed"],
-                "is_risk_thread": False,
-            },
-            {
-                "id": "context",
-                "focus": f"Background context and related information for: {query[:100]}",
-                "search_queries": [f"{query[:80]} overview"],
-                "expected_source_types": ["official_blog", "news_reputable"],
-                "is_risk_thread": False,
-            },
-            {
-                "id": "risks",
-                "focus": f"Risks, limitations, and counterarguments for: {query[:100]}",
-                "search_queries": [f"{query[:80]} risks problems"],
-                "expected_source_types": ["community_docs", "news_reputable"],
-                "is_risk_thread": True,
-            },
+                **t,
+                "search_queries": list(t["search_queries"]),
+                "expected_source_types": list(t["expected_source_types"]),
+            }
+            for t in _fallback_threads_cached(query[:200])
         ]
 
     def _pad_threads(self, query: str, threads: list[dict]) -> list[dict]:
@@ -443,141 +858,255 @@ class ResearcherAgent(BaseAgent):
 
     async def _investigate_parallel(
         self, query: str, threads: list[dict]
-    ) -> list[dict]:
+    ) -> list[ThreadResult]:
         """
         Run all investigation threads in parallel via sub-agents.
+
+        Threads are packed INVESTIGATE_BATCH_SIZE to a prompt so the shared
+        query and schema are sent once per batch; any thread a batch does not
+        answer is re-run on its own with INVESTIGATE_PROMPT.
         Returns a list of thread results (success or failure per thread).
         """
-        subtasks = []
-        for thread in threads:
-            prompt = INVESTIGATE_PROMPT.format(
-                original_query=query[:300],
-                focus=thread.get("focus", ""),
-                search_queries=json.dumps(thread.get("search_queries", [])),
-                expected_source_types=json.dumps(
-                    thread.get("expected_source_types", [])
-                ),
-                thread_id=thread.get("id", "unknown"),
-            )
-
-            subtasks.append(SubTask(
-                id=thread.get("id", f"thread_{len(subtasks)}"),
-                description=prompt,
-                context={"thread": thread},
-                constraints={"max_findings": 10},
-            ))
-
-        logger.info(f"Launching {len(subtasks)} research threads in parallel")
-        sub_results = await self.sub_pool.execute_parallel(subtasks, model=self.instant_model)
+        thread_ids = [t.get("id") or f"thread_{i}" for i, t in enumerate(threads)]
+        if len(set(thread_ids)) != len(thread_ids):
+            thread_ids = [f"thread_{i}" for i in range(len(threads))]
+
+        outcomes = await self._investigate_batched(query, threads, thread_ids)
+
+        missing = [i for i, tid in enumerate(thread_ids) if tid not in outcomes]
+        if missing:
+            logger.info(f"Running {len(missing)} research thread(s) individually")
+            prefix = INVESTIGATE_PROMPT_PREFIX.format(original_query=query[:300])
+            subtasks = []
+            for i in missing:
+                thread = threads[i]
+                prompt = prefix + INVESTIGATE_PROMPT_SUFFIX.format(
+                    focus=thread.get("focus", ""),
+                    search_queries=json_codec.dumps(thread.get("search_queries", [])),
+                    expected_source_types=json_codec.dumps(
+                        thread.get("expected_source_types", [])
+                    ),
+                    thread_id=thread_ids[i],
+                )
+                subtasks.append(SubTask(
+                    id=thread_ids[i],
+                    description=prompt,
+                    context={"thread": thread},
+                    constraints={"max_findings": 10},
+                    shared_prefix=prefix,
+                ))
+            sub_results = await self.sub_pool.execute_parallel(subtasks, model=self.instant_model)
+            for i, result in zip(missing, sub_results):
+                outcomes[thread_ids[i]] = result
 
         # Parse results
-        thread_results = []
-        for thread, result in zip(threads, sub_results):
+        thread_results: list[ThreadResult] = []
+        for thread, tid in zip(threads, thread_ids):
+            result = outcomes[tid]
             if result.success:
-                output = result.output
-                if isinstance(output, str):
-                    try:
-                        output = json.loads(output)
-                    except json.JSONDecodeError:
-                        output = {"findings": [], "error": "Invalid JSON from sub-agent"}
-
-                thread_results.append({
-                    "thread_id": thread.get("id"),
-                    "focus": thread.get("focus"),
-                    "is_risk_thread": thread.get("is_risk_thread", False),
-                    "success": True,
-                    "findings": output.get("findings", []),
-                    "risks_found": output.get("risks_found", []),
-                    "knowledge_gaps": output.get("knowledge_gaps", []),
-                    "facts_worth_caching": output.get("facts_worth_caching", []),
-                    "duration_ms": result.duration_ms,
-                    "tokens_used": result.tokens_used,
-                })
+                output = self._parse_sub_output(result.output)
+                try:
+                    _validate_investigate(output)
+                except ValueError as e:
+                    result = SubResult(
+                        task_id=tid,
+                        error=f"malformed output: {e}",
+                        duration_ms=result.duration_ms,
+                    )
+            if result.success:
+                thread_results.append(ThreadResult(
+                    thread_id=thread.get("id"),
+                    focus=thread.get("focus"),
+                    is_risk_thread=thread.get("is_risk_thread", False),
+                    success=True,
+                    findings=output.get("findings") or [],
+                    risks_found=output.get("risks_found") or [],
+                    knowledge_gaps=output.get("knowledge_gaps") or [],
+                    facts_worth_caching=heapq.nlargest(
+                        CACHE_FACTS_PER_THREAD,
+                        self._filter_cacheable(output.get("facts_worth_caching") or []),
+                        key=lambda f: f["confidence"],
+                    ),
+                    duration_ms=result.duration_ms,
+                    tokens_used=result.tokens_used,
+                ))
             else:
                 logger.warning(
                     f"Thread '{thread.get('id')}' failed: {result.error}"
                 )
-                thread_results.append({
-                    "thread_id": thread.get("id"),
-                    "focus": thread.get("focus"),
-                    "is_risk_thread": thread.get("is_risk_thread", False),
-                    "success": False,
-                    "findings": [],
-                    "risks_found": [],
-                    "knowledge_gaps": [f"Investigation failed: {result.error}"],
-                    "facts_worth_caching": [],
-                    "duration_ms": result.duration_ms,
-                    "tokens_used": 0,
-                })
-
-        succeeded = sum(1 for r in thread_results if r["success"])
+                thread_results.append(ThreadResult(
+                    thread_id=thread.get("id"),
+                    focus=thread.get("focus"),
+                    is_risk_thread=thread.get("is_risk_thread", False),
+                    knowledge_gaps=[f"Investigation failed: {result.error}"],
+                    duration_ms=result.duration_ms,
+                ))
+
+        succeeded = sum(1 for r in thread_results if r.success)
         logger.info(
             f"Research threads: {succeeded}/{len(thread_results)} succeeded"
         )
 
         return thread_results
 
+    async def _investigate_batched(
+        self, query: str, threads: list[dict], thread_ids: list[str]
+    ) -> dict[str, SubResult]:
+        """
+        Investigate threads INVESTIGATE_BATCH_SIZE per sub-agent call.
+
+        Returns a per-thread SubResult keyed by thread id for every thread a
+        batch answered; threads missing from the output are left out.
+        """
+        prefix = INVESTIGATE_BATCH_PROMPT_PREFIX.format(original_query=query[:300])
+        subtasks = []
+        for start in range(0, len(threads), INVESTIGATE_BATCH_SIZE):
+            shard = [
+                {
+                    "thread_id": thread_ids[i],
+                    "focus": threads[i].get("focus", ""),
+                    "search_queries": threads[i].get("search_queries", []),
+                    "expected_source_types": threads[i].get("expected_source_types", []),
+                }
+                for i in range(start, min(start + INVESTIGATE_BATCH_SIZE, len(threads)))
+            ]
+            subtasks.append(SubTask(
+                id=f"batch_{start // INVESTIGATE_BATCH_SIZE}",
+                description=prefix + INVESTIGATE_BATCH_PROMPT_SUFFIX.format(
+                    threads=json_codec.dumps(shard, indent=True),
+                ),
+                context={"thread_ids": [t["thread_id"] for t in shard]},
+                constraints={
+                    "max_findings": 10,
+                    "max_tokens": INVESTIGATE_TOKENS_PER_THREAD * len(shard),
+                },
+                shared_prefix=prefix,
+            ))
+
+        logger.info(
+            f"Launching {len(threads)} research threads in {len(subtasks)} batched call(s)"
+        )
+        batch_results = await self.sub_pool.execute_parallel(subtasks, model=self.instant_model)
+
+        outcomes: dict[str, SubResult] = {}
+        for task, result in zip(subtasks, batch_results):
+            if not result.success:
+                logger.warning(f"Research batch {task.id} failed: {result.error}")
+                continue
+            wanted = set(task.context["thread_ids"])
+            entries = self._parse_sub_output(result.output).get("results")
+            for entry in entries if isinstance(entries, list) else ():
+                if not isinstance(entry, dict):
+                    continue
+                tid = str(entry.get("thread_id"))
+                if tid in wanted and tid not in outcomes:
+                    outcomes[tid] = SubResult(
+                        task_id=tid,
+                        success=True,
+                        output=entry,
+                        duration_ms=result.duration_ms,
+                        tokens_used=result.tokens_used // len(wanted),
+                    )
+
+        return outcomes
+
+    @staticmethod
+    def _parse_sub_output(output) -> dict:
+        """Decode a sub-agent's JSON output; malformed output yields no findings."""
+        if isinstance(output, str):
+            try:
+                output = json_codec.loads(output)
+            except json_codec.JSONDecodeError:
+                # Salvage JSON wrapped in prose or ``` fences
+                match = _BRACE_RE.search(output)
+                try:
+                    output = json_codec.loads(match.group(0)) if match else None
+                except json_codec.JSONDecodeError:
+                    output = None
+        if not isinstance(output, dict):
+            return {"findings": [], "error": "Invalid JSON from sub-agent"}
+        return output
+
     # ─── Source Quality Scoring ────────────────────────────────────────
 
-    def _score_sources(self, thread_results: list[dict]) -> list[dict]:
+    def _score_sources(self, thread_results: list[ThreadResult]) -> list[ThreadResult]:
         """
         Score each finding's source quality and add a quality_score field.
         Also deduplicates findings that appear across threads.
         """
-        seen_findings = set()
+        seen_findings: set[int] = set()
+        kept: list[dict] = []
 
         for thread in thread_results:
             scored_findings = []
-            for finding in thread.get("findings", []):
-                # Deduplicate by finding text (rough)
-                finding_key = finding.get("finding", "")[:100].lower().strip()
+            for finding in thread.findings:
+                # Deduplicate by normalized finding text (rough)
+                finding_key = _dedup_key(finding.get("finding", ""))
                 if finding_key in seen_findings:
                     continue
                 seen_findings.add(finding_key)
+                scored_findings.append(finding)
 
-                # Score source quality
-                source_type = finding.get("source_type", "unknown")
-                quality = SOURCE_QUALITY.get(source_type, 0.3)
-                finding["source_quality"] = quality
-
-                # Adjust confidence based on source quality
-                raw_confidence = finding.get("confidence", 0.5)
-                finding["adjusted_confidence"] = round(
-                    raw_confidence * 0.6 + quality * 0.4, 3
-                )
+            thread.findings = scored_findings
+            kept.extend(scored_findings)
 
-                scored_findings.append(finding)
+        if not kept:
+            return thread_results
 
-            thread["findings"] = scored_findings
+        # Score source quality and adjust confidence for all kept findings in
+        # one vectorized pass (parallel arrays over the findings)
+        quality = np.fromiter(
+            (SOURCE_QUALITY[f.get("source_type", "unknown")] for f in kept),
+            dtype=np.float64, count=len(kept),
+        )
+        raw_confidence = np.fromiter(
+            (f.get("confidence", 0.5) for f in kept), dtype=np.float64, count=len(kept),
+        )
+        adjusted = np.round(raw_confidence * 0.6 + quality * 0.4, 3)
+        for finding, q, adj in zip(kept, quality.tolist(), adjusted.tolist()):
+            finding["source_quality"] = q
+            finding["adjusted_confidence"] = adj
 
         return thread_results
 
     # ─── Synthesis ────────────────────────────────────────────────────
 
     async def _synthesize(
-        self, query: str, thread_results: list[dict]
+        self, query: str, thread_results: list[ThreadResult]
     ) -> dict:
         """
         Synthesize parallel thread results into one coherent research brief.
         """
-        # Format thread results for the synthesis prompt
-        formatted_threads = []
-        for thread in thread_results:
-            status = "✅" if thread["success"] else "❌"
-            risk_tag = " [RISK THREAD]" if thread.get("is_risk_thread") else ""
+        # Format thread results for the synthesis prompt, strongest evidence
+        # first so the budget cut drops the weakest threads
+        ordered = sorted(
+            thread_results,
+            key=lambda t: max(
+                (f.get("adjusted_confidence", 0.0) for f in t.findings),
+                default=0.0,
+            ),
+            reverse=True,
+        )
+        buf = io.StringIO()
+        remaining = SYNTHESIS_INPUT_CHARS
+        for thread in ordered:
+            status = "✅" if thread.success else "❌"
+            risk_tag = " [RISK THREAD]" if thread.is_risk_thread else ""
             block = (
-                f"--- {status} Thread: {thread['focus']}{risk_tag} ---\n"
-                f"Findings: {json.dumps(thread.get('findings', []), indent=2, default=str)}\n"
-                f"Risks: {json.dumps(thread.get('risks_found', []))}\n"
-                f"Gaps: {json.dumps(thread.get('knowledge_gaps', []))}\n"
+                ("\n\n" if buf.tell() else "")
+                + f"--- {status} Thread: {thread.focus}{risk_tag} ---\n"
+                f"Findings: {json_codec.dumps(thread.findings, indent=True)}\n"
+                f"Risks: {json_codec.dumps(thread.risks_found)}\n"
+                f"Gaps: {json_codec.dumps(thread.knowledge_gaps)}\n"
             )
-            formatted_threads.append(block)
-
-        thread_results_str = "\n\n".join(formatted_threads)
+            buf.write(block[:remaining])
+            remaining -= len(block)
+            if remaining < 0:
+                # Truncate if too long for context window
+                buf.write("\n... (truncated)")
+                break
 
-        # Truncate if too long for context window
-        if len(thread_results_str) > 12000:
-            thread_results_str = thread_results_str[:12000] + "\n... (truncated)"
+        thread_results_str = buf.getvalue()
 
         prompt = SYNTHESIZE_PROMPT.format(
             query=query,
@@ -590,38 +1119,35 @@ class ResearcherAgent(BaseAgent):
                 system=self.system_prompt,
                 temperature=0.5,
                 model=self.thinking_model,
+                json_schema=SYNTHESIZE_SCHEMA,
             )
-            report = result["content"]
+            report = _validate_synthesize(result["content"])
 
-            # Merge in facts from threads that the synthesis might have missed
-            all_thread_facts = []
-            for thread in thread_results:
-                all_thread_facts.extend(thread.get("facts_worth_caching", []))
+            # Merge in thread facts, risks and gaps the synthesis might have
+            # missed — one pass over the threads, deduped as we go
+            facts_out = report.setdefault("facts_for_cache", [])
+            risks_out = report.setdefault("risks_and_caveats", [])
+            gaps_out = report.setdefault("knowledge_gaps", [])
+            existing_facts = {_dedup_key(f.get("fact", "")) for f in facts_out}
+            existing_risks = {_dedup_key(r) for r in risks_out}
+            existing_gaps = {_dedup_key(g) for g in gaps_out}
 
-            existing_facts = {
-                f.get("fact", "")[:80] for f in report.get("facts_for_cache", [])
-            }
-            for fact in all_thread_facts:
-                if fact.get("fact", "")[:80] not in existing_facts:
-                    report.setdefault("facts_for_cache", []).append(fact)
-
-            # Merge risks from all threads
-            all_risks = []
-            for thread in thread_results:
-                all_risks.extend(thread.get("risks_found", []))
-            existing_risks = set(report.get("risks_and_caveats", []))
-            for risk in all_risks:
-                if risk not in existing_risks:
-                    report.setdefault("risks_and_caveats", []).append(risk)
-
-            # Merge knowledge gaps
-            all_gaps = []
             for thread in thread_results:
-                all_gaps.extend(thread.get("knowledge_gaps", []))
-            existing_gaps = set(report.get("knowledge_gaps", []))
-            for gap in all_gaps:
-                if gap not in existing_gaps:
-                    report.setdefault("knowledge_gaps", []).append(gap)
+                for fact in thread.facts_worth_caching:
+                    key = _dedup_key(fact.get("fact", ""))
+                    if key not in existing_facts:
+                        existing_facts.add(key)
+                        facts_out.append(fact)
+                for risk in thread.risks_found:
+                    key = _dedup_key(risk)
+                    if key not in existing_risks:
+                        existing_risks.add(key)
+                        risks_out.append(risk)
+                for gap in thread.knowledge_gaps:
+                    key = _dedup_key(gap)
+                    if key not in existing_gaps:
+                        existing_gaps.add(key)
+                        gaps_out.append(gap)
 
             return report
 
@@ -630,7 +1156,7 @@ class ResearcherAgent(BaseAgent):
             return self._fallback_synthesis(query, thread_results)
 
     def _fallback_synthesis(
-        self, query: str, thread_results: list[dict]
+        self, query: str, thread_results: list[ThreadResult]
     ) -> dict:
         """
         Direct synthesis without LLM — used when the synthesis call fails.
@@ -642,22 +1168,22 @@ class ResearcherAgent(BaseAgent):
         all_facts = []
 
         for thread in thread_results:
-            for finding in thread.get("findings", []):
+            for finding in thread.findings:
                 all_findings.append({
                     "finding": finding.get("finding", ""),
                     "confidence": finding.get("adjusted_confidence", finding.get("confidence", 0.5)),
                     "sources": [finding.get("source", "unknown")],
                     "relevance": finding.get("relevance", "medium"),
                 })
-            all_risks.extend(thread.get("risks_found", []))
-            all_gaps.extend(thread.get("knowledge_gaps", []))
-            all_facts.extend(thread.get("facts_worth_caching", []))
+            all_risks.extend(thread.risks_found)
+            all_gaps.extend(thread.knowledge_gaps)
+            all_facts.extend(thread.facts_worth_caching)
 
-        # Sort findings by confidence
-        all_findings.sort(key=lambda f: f["confidence"], reverse=True)
+        # Only the ten most confident findings are reported
+        key_findings = heapq.nlargest(10, all_findings, key=lambda f: f["confidence"])
 
         # Build a mechanical summary
-        top_findings = all_findings[:5]
+        top_findings = key_findings[:5]
         summary_parts = [f.get("finding", "") for f in top_findings if f.get("finding")]
         summary = " ".join(summary_parts) if summary_parts else (
             f"Research on '{query[:100]}' completed with mixed results."
@@ -668,10 +1194,10 @@ class ResearcherAgent(BaseAgent):
 
         return {
             "summary": summary,
-            "key_findings": all_findings[:10],
+            "key_findings": key_findings,
             "comparisons": [],
-            "risks_and_caveats": list(set(all_risks)),
-            "knowledge_gaps": list(set(all_gaps)),
+            "risks_and_caveats": list(dict.fromkeys(all_risks)),
+            "knowledge_gaps": list(dict.fromkeys(all_gaps)),
             "contradictions": [],
             "recommended_next_steps": [],
             "facts_for_cache": all_facts,
@@ -681,6 +1207,40 @@ class ResearcherAgent(BaseAgent):
 
     # ─── Knowledge Cache ──────────────────────────────────────────────
 
+    @staticmethod
+    def _unique_facts(facts) -> list[dict]:
+        """*facts* with near-verbatim repeats removed, first occurrence kept."""
+        unique: dict[int, dict] = {}
+        for fact in facts:
+            unique.setdefault(_dedup_key(fact.get("fact", "")), fact)
+        return list(unique.values())
+
+    @staticmethod
+    def _filter_cacheable(facts: list[dict]) -> list[dict]:
+        """Facts with text and at least CACHE_MIN_CONFIDENCE numeric confidence."""
+        return [
+            f for f in facts
+            if isinstance(f, dict) and f.get("fact")
+            and isinstance(f.get("confidence"), (int, float))
+            and f["confidence"] >= CACHE_MIN_CONFIDENCE
+        ]
+
+    def _cache_facts(self, facts: list[dict]) -> int:
+        """Cache high-confidence facts in one bulk write. Returns the number cached."""
+        if not self.memory:
+            return 0
+        entries = self._filter_cacheable(facts)
+        if not entries:
+            return 0
+        if not hasattr(self.memory, "store_facts_bulk"):
+            return sum(1 for entry in entries if self._cache_fact(entry))
+        try:
+            self.memory.store_facts_bulk(entries, source_agent="researcher")
+            return len(entries)
+        except Exception as e:
+            logger.warning(f"Failed to cache facts: {e}")
+            return 0
+
     def _cache_fact(self, fact_entry: dict) -> bool:
         """Cache a high-confidence fact. Returns True if cached."""
         if not self.memory:
@@ -689,7 +1249,7 @@ class ResearcherAgent(BaseAgent):
         fact_text = fact_entry.get("fact", "")
         confidence = fact_entry.get("confidence", 0.0)
 
-        if not fact_text or confidence < 0.75:
+        if not fact_text or confidence < CACHE_MIN_CONFIDENCE:
             return False
 
         try:
@@ -698,7 +1258,7 @@ class ResearcherAgent(BaseAgent):
                 category=fact_entry.get("category", "general"),
                 source=fact_entry.get("source"),
                 confidence=confidence,
-                verified_by="researcher",
+                source_agent="researcher",
                 tags=fact_entry.get("tags", []),
             )
             return True
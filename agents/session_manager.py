@@ -14,14 +14,31 @@ internal status updates and Guardian monitoring). Each session gets:
 from __future__ import annotations
 
 import asyncio
+import codecs
+import functools
+import itertools
 import logging
 import os
+import re
 import subprocess
-import json
 import uuid
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+
+from agents.common import json_codec
+
+try:
+    import yaml
+except ImportError:  # optional: pip install pyyaml (per-agent config.yaml is ignored otherwise)
+    yaml = None
+
+try:
+    from openclaw import sdk as openclaw_sdk
+except ImportError:  # optional: in-process sessions (the openclaw CLI is spawned otherwise)
+    openclaw_sdk = None
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +60,110 @@ AGENT_SOUL_PATHS: dict[str, str] = {
     "guardian": "agents/guardian/SOUL.md",
 }
 
+# Default timeouts per agent type for parallel fan-outs
+PARALLEL_TIMEOUTS: dict[str, float] = {
+    "builder": 120.0,
+    "verifier": 90.0,
+    "researcher": 90.0,
+}
+
+# Sessions delegate_parallel runs at once unless the caller says otherwise
+MAX_PARALLEL_DELEGATIONS = 8
+# Cap on delegations in flight per manager, across delegate() and every fan-out.
+# Sessions mostly wait on the model, so the default never drops below one fan-out.
+MAX_CONCURRENT_DELEGATES = int(os.environ.get(
+    "OPENCLAW_MAX_DELEGATES", max(MAX_PARALLEL_DELEGATIONS, os.cpu_count() or 4)
+))
+
+# Finished sessions remembered for get_completed_sessions()
+COMPLETED_SESSIONS_KEPT = 1024
+
+# Read size for streaming CLI session output; only the tail of stderr is kept
+# for error messages
+STREAM_CHUNK_BYTES = 64 * 1024
+STDERR_TAIL_BYTES = 4096
+
+
+# CLI errors meaning the subcommand itself was rejected (an older openclaw
+# without `sessions spawn_batch`), as opposed to a batch that ran and failed
+_UNKNOWN_SUBCOMMAND = re.compile(
+    r"unknown command|no such command|invalid choice|unrecognized (?:command|arguments?)|usage:",
+    re.IGNORECASE,
+)
+
+
+class _CLIFailure(RuntimeError):
+    """Nonzero exit from the openclaw CLI; keeps whatever it wrote to stdout."""
+
+    def __init__(self, message: str, stdout: str = ""):
+        super().__init__(message)
+        self.stdout = stdout
+
+
+class _BatchUnsupported(Exception):
+    """The installed openclaw CLI has no `sessions spawn_batch`."""
+
+
+# (workspace, agent name) -> (config.yaml mtime, parsed config), shared by all managers
+_CONFIG_CACHE: dict[tuple[str, str], tuple[int | None, "AgentConfig"]] = {}
+
+
+def _mtime_ns(path: Path) -> int | None:
+    """Modification time of *path* in ns, or None if it does not exist."""
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _prefetch(path: Path) -> None:
+    """Ask the kernel to start reading *path* into the page cache (best effort)."""
+    if not hasattr(os, "posix_fadvise"):  # not available on macOS/Windows
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+async def _tail_reader(stream: asyncio.StreamReader, maxbytes: int) -> bytes:
+    """Drain *stream* to EOF, keeping only its last *maxbytes* bytes."""
+    tail = bytearray()
+    while data := await stream.read(STREAM_CHUNK_BYTES):
+        tail += data
+        if len(tail) > maxbytes:
+            del tail[:-maxbytes]
+    return bytes(tail)
+
+
+@functools.lru_cache(maxsize=256)
+def _render_context(serialized: bytes) -> str:
+    """Fenced "Task Context" section around an already-encoded JSON context."""
+    return f"\n## Task Context\n```json\n{serialized.decode()}\n```"
+
+
+def _spawn_argv_prefix(model: str, tools: Iterable[str]) -> tuple[str, ...]:
+    """``openclaw sessions spawn`` argv up to the per-call flags."""
+    argv = ["openclaw", "sessions", "spawn"]
+    if model:
+        argv.extend(["--model", model])
+    for tool in tools:
+        argv.extend(["--tool", tool])
+    return tuple(argv)
+
+
+def _emit(text: str, on_chunk: Callable[[str], Any] | None) -> str:
+    """Hand a whole (non-streamed) reply to *on_chunk*, then return it."""
+    if on_chunk and text:
+        on_chunk(text)
+    return text
+
 
 @dataclass
 class AgentConfig:
@@ -51,20 +172,38 @@ class AgentConfig:
     model: str
     soul_path: str
     tools: list[str]
+    # One-shot agent with no session state: answered by a direct SDK chat call
+    stateless: bool = False
+
+    @functools.cached_property
+    def argv_prefix(self) -> tuple[str, ...]:
+        """The invariant part of this agent's ``openclaw sessions spawn`` argv."""
+        return _spawn_argv_prefix(self.model, self.tools)
 
     @classmethod
     def from_config_file(cls, name: str, workspace: str | Path) -> "AgentConfig":
-        """Load agent config from agents/{name}/config.yaml, with fallbacks."""
+        """Load agent config from agents/{name}/config.yaml, with fallbacks.
+
+        Parsed configs are cached per (workspace, name) until config.yaml changes.
+        """
         workspace = Path(workspace)
         config_path = workspace / "agents" / name / "config.yaml"
+        mtime = _mtime_ns(config_path)
+
+        key = (str(workspace), name)
+        cached = _CONFIG_CACHE.get(key)
+        if cached and cached[0] == mtime:
+            return replace(cached[1], tools=list(cached[1].tools))
 
         model = ""
         soul_path = AGENT_SOUL_PATHS.get(name, f"agents/{name}/SOUL.md")
         tools = AGENT_TOOL_SETS.get(name, ["read"])
+        stateless = False
 
-        if config_path.exists():
+        if mtime is not None:
             try:
-                import yaml
+                if yaml is None:
+                    raise ImportError("PyYAML is not installed")
                 with open(config_path) as f:
                     cfg = yaml.safe_load(f) or {}
                 model = cfg.get("model", "")
@@ -72,10 +211,15 @@ class AgentConfig:
                     tools = cfg["tools"]
                 if cfg.get("soul_path"):
                     soul_path = cfg["soul_path"]
+                stateless = bool(cfg.get("stateless", False))
             except Exception as e:
                 logger.warning(f"Failed to load config for {name}: {e}")
 
-        return cls(name=name, model=model, soul_path=soul_path, tools=tools)
+        config = cls(
+            name=name, model=model, soul_path=soul_path, tools=list(tools), stateless=stateless,
+        )
+        _CONFIG_CACHE[key] = (mtime, config)
+        return replace(config, tools=list(config.tools))
 
 
 @dataclass
@@ -104,13 +248,59 @@ class AgentSessionManager:
     Each session runs with its own model, system prompt (SOUL.md), and tool set.
     """
 
-    def __init__(self, workspace: str | Path | None = None):
+    def __init__(
+        self,
+        workspace: str | Path | None = None,
+        warm_sessions: int | None = None,
+    ):
         self.workspace = Path(workspace or os.environ.get(
             "OPENCLAW_WORKSPACE",
             os.path.expanduser("~/.openclaw/workspace")
         ))
-        self._agent_configs: dict[str, AgentConfig] = {}
-        self._active_sessions: dict[str, str] = {}  # session_key -> agent_name
+        # Subprocess cwd, stringified once rather than per spawn
+        self._workspace_str = str(self.workspace)
+        # Known agents are resolved up front (config.yaml parses run in parallel)
+        # so the first delegation doesn't pay for them
+        with ThreadPoolExecutor(max_workers=len(AGENT_TOOL_SETS)) as pool:
+            self._agent_configs: dict[str, AgentConfig] = {
+                config.name: config
+                for config in pool.map(
+                    lambda name: AgentConfig.from_config_file(name, self.workspace),
+                    AGENT_TOOL_SETS,
+                )
+            }
+        # Start the prompt files' page-cache fill now; it overlaps with
+        # whatever runs before the first delegation reads them
+        for config in self._agent_configs.values():
+            _prefetch(self.workspace / config.soul_path)
+        _prefetch(self.workspace / "TEAM.md")
+        # In-flight (and pooled warm) sessions: session_key -> agent_name.
+        # Finished ones move to a bounded history for introspection.
+        self._active_sessions: dict[str, str] = {}
+        self._completed_sessions: deque[tuple[str, str]] = deque(maxlen=COMPLETED_SESSIONS_KEPT)
+        # agent_name -> (SOUL.md mtime, TEAM.md mtime, prompt prefix); None = file missing
+        self._prompt_cache: dict[str, tuple[int | None, int | None, str]] = {}
+        self._team_text: tuple[int, str] | None = None
+
+        # Idle sessions kept per agent for reuse (0 = fresh session per task).
+        # A reused session keeps its earlier turns, so this is opt-in.
+        if warm_sessions is None:
+            warm_sessions = int(os.environ.get("OPENCLAW_WARM_SESSIONS", "0"))
+        self._warm_sessions = warm_sessions
+        self._pools: dict[str, asyncio.Queue[str]] = {}
+        # Session labels: random per-manager seed + counter, unique without
+        # drawing fresh randomness for every delegation
+        self._session_seed = uuid.uuid4().hex[:6]
+        self._session_counter = itertools.count()
+        # Cleared the first time the CLI rejects `sessions spawn_batch`
+        self._batch_supported = True
+        # Shared by every delegation entry point; created on first use so it
+        # binds to the loop the manager actually runs on
+        self._delegate_sem: asyncio.Semaphore | None = None
+
+    def _new_session_key(self, agent_name: str) -> str:
+        """Unique session label for a new *agent_name* session."""
+        return f"{agent_name}_{self._session_seed}{next(self._session_counter):04x}"
 
     def _get_config(self, agent_name: str) -> AgentConfig:
         """Get or load the configuration for an agent."""
@@ -124,31 +314,53 @@ class AgentSessionManager:
         """
         Build the full system prompt for an agent session.
 
+        May read files, so async callers run it via asyncio.to_thread.
+
         Includes:
         1. The agent's SOUL.md content
         2. TEAM.md shared context
         3. Scoped task context from Brain
         """
+        prefix = self._prompt_prefix(agent_name)
+        if context:
+            return f"{prefix}\n\n{self._context_block(context)}"
+        return prefix
+
+    def _prompt_prefix(self, agent_name: str) -> str:
+        """SOUL.md + TEAM.md part of the system prompt, rebuilt only when either file changes."""
         config = self._get_config(agent_name)
+        soul_path = self.workspace / config.soul_path
+        team_path = self.workspace / "TEAM.md"
+        soul_mtime, team_mtime = _mtime_ns(soul_path), _mtime_ns(team_path)
+
+        cached = self._prompt_cache.get(agent_name)
+        if cached and cached[:2] == (soul_mtime, team_mtime):
+            return cached[2]
+
         parts: list[str] = []
 
         # Load SOUL.md
-        soul_path = self.workspace / config.soul_path
-        if soul_path.exists():
+        if soul_mtime is not None:
             parts.append(soul_path.read_text().strip())
         else:
             parts.append(f"You are the {agent_name} agent. Complete the assigned task.")
 
-        # Load TEAM.md
-        team_path = self.workspace / "TEAM.md"
-        if team_path.exists():
-            parts.append(f"\n## Team Context\n{team_path.read_text().strip()}")
+        # Load TEAM.md (shared by every agent, so read once per change)
+        if team_mtime is not None:
+            if self._team_text is None or self._team_text[0] != team_mtime:
+                self._team_text = (team_mtime, team_path.read_text().strip())
+            parts.append(f"\n## Team Context\n{self._team_text[1]}")
 
-        # Add scoped context
-        if context:
-            parts.append(f"\n## Task Context\n```json\n{json.dumps(context, indent=2, default=str)}\n```")
+        prefix = "\n\n".join(parts)
+        self._prompt_cache[agent_name] = (soul_mtime, team_mtime, prefix)
+        return prefix
 
-        return "\n\n".join(parts)
+    @staticmethod
+    def _context_block(context: dict[str, Any]) -> str:
+        """Render Brain's scoped task context as a fenced JSON section."""
+        # Sorted keys: equal contexts give byte-identical prompts, whatever
+        # order Brain built them in, and hit the render cache
+        return _render_context(json_codec.dumps_bytes(context, indent=True, sort_keys=True))
 
     async def delegate(
         self,
@@ -156,6 +368,8 @@ class AgentSessionManager:
         task: str,
         context: dict[str, Any] | None = None,
         timeout: float = 120.0,
+        on_chunk: Callable[[str], Any] | None = None,
+        system_prompt: str | None = None,
     ) -> DelegationResult:
         """
         Spawn an isolated OpenClaw session for a specialist agent and send it a task.
@@ -166,11 +380,47 @@ class AgentSessionManager:
         - Only the tools the agent is permitted to use
         - The scoped task as the initial message
 
-        Returns the agent's response when the session completes.
+        Returns the agent's response when the session completes. With warm
+        sessions enabled, an idle session for the agent is reused instead and
+        the scoped context travels with the task message.
+
+        Agents configured as ``stateless`` skip the session layer entirely
+        when the SDK offers ``chat``: the task is one in-process model call.
+
+        ``on_chunk`` receives the reply text as it streams in (in one piece
+        when the SDK is used). ``system_prompt`` skips building the prompt
+        when the caller already has it.
+
+        At most MAX_CONCURRENT_DELEGATES delegations run at once per manager;
+        further calls wait for a slot.
         """
+        async with self._delegation_slot():
+            return await self._delegate(agent_name, task, context, timeout, on_chunk, system_prompt)
+
+    def _delegation_slot(self) -> asyncio.Semaphore:
+        """The manager-wide semaphore bounding delegations in flight."""
+        if self._delegate_sem is None:
+            self._delegate_sem = asyncio.Semaphore(MAX_CONCURRENT_DELEGATES)
+        return self._delegate_sem
+
+    async def _delegate(
+        self,
+        agent_name: str,
+        task: str,
+        context: dict[str, Any] | None,
+        timeout: float,
+        on_chunk: Callable[[str], Any] | None,
+        system_prompt: str | None,
+    ) -> DelegationResult:
+        """delegate() body, run while holding a delegation slot."""
         config = self._get_config(agent_name)
-        session_key = f"{agent_name}_{uuid.uuid4().hex[:8]}"
-        system_prompt = self._build_system_prompt(agent_name, context)
+        one_shot = config.stateless and openclaw_sdk is not None and hasattr(openclaw_sdk, "chat")
+        if self._warm_sessions > 0 and not one_shot:
+            return await self._delegate_warm(agent_name, task, context, timeout, on_chunk)
+
+        session_key = self._new_session_key(agent_name)
+        if system_prompt is None:
+            system_prompt = await asyncio.to_thread(self._build_system_prompt, agent_name, context)
 
         logger.info(f"Delegating to {agent_name} (session={session_key}, model={config.model})")
 
@@ -183,13 +433,21 @@ class AgentSessionManager:
                 "system": system_prompt,
                 "tools": config.tools,
                 "message": task,
+                "argv_prefix": config.argv_prefix,
             }
 
-            # Use subprocess to call openclaw CLI for session spawning
-            # In production, this would use the OpenClaw Python SDK or API
-            result = await self._run_session(spawn_args, timeout=timeout)
-
-            self._active_sessions[session_key] = agent_name
+            if not one_shot:
+                self._session_started(session_key, agent_name)
+            if one_shot:
+                response = await asyncio.wait_for(openclaw_sdk.chat(
+                    model=config.model or None,
+                    system=system_prompt,
+                    tools=config.tools,
+                    message=task,
+                ), timeout=timeout)
+                result = _emit(self._session_output(response), on_chunk)
+            else:
+                result = await self._run_session(spawn_args, timeout=timeout, on_chunk=on_chunk)
 
             return DelegationResult(
                 agent_name=agent_name,
@@ -216,111 +474,454 @@ class AgentSessionManager:
                 session_key=session_key,
                 error=str(e),
             )
+        finally:
+            self._session_ended(session_key)
+
+    async def _delegate_warm(
+        self,
+        agent_name: str,
+        task: str,
+        context: dict[str, Any] | None,
+        timeout: float,
+        on_chunk: Callable[[str], Any] | None = None,
+    ) -> DelegationResult:
+        """Send *task* to a leased warm session, returning it to the pool after."""
+        message = f"{task}\n\n{self._context_block(context)}" if context else task
+        session_key = ""
+        try:
+            session_key = await self._acquire_session(agent_name, timeout)
+            result = await self._send_to_session(session_key, message, timeout, on_chunk)
+        except asyncio.TimeoutError:
+            logger.error(f"Warm session {session_key or agent_name} timed out after {timeout}s")
+            self._session_ended(session_key)
+            return DelegationResult(
+                agent_name=agent_name,
+                success=False,
+                result="",
+                session_key=session_key,
+                error=f"Timeout after {timeout}s",
+            )
+        except Exception as e:
+            # The session may be wedged mid-turn, so it is not returned to the pool
+            logger.error(f"Warm session {session_key or agent_name} failed: {e}")
+            self._session_ended(session_key)
+            return DelegationResult(
+                agent_name=agent_name,
+                success=False,
+                result="",
+                session_key=session_key,
+                error=str(e),
+            )
+
+        self._release_session(agent_name, session_key)
+        return DelegationResult(
+            agent_name=agent_name,
+            success=True,
+            result=result,
+            session_key=session_key,
+        )
+
+    async def _acquire_session(self, agent_name: str, timeout: float) -> str:
+        """Lease an idle warm session for *agent_name*, spawning one if none is idle."""
+        pool = self._pools.setdefault(agent_name, asyncio.Queue(self._warm_sessions))
+        try:
+            return pool.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+
+        config = self._get_config(agent_name)
+        label = self._new_session_key(agent_name)
+        logger.info(f"Spawning warm session for {agent_name} (session={label}, model={config.model})")
+        await self._run_session({
+            "label": label,
+            "model": config.model,
+            "system": await asyncio.to_thread(self._build_system_prompt, agent_name),
+            "tools": config.tools,
+            "argv_prefix": config.argv_prefix,
+        }, timeout=timeout)
+        self._session_started(label, agent_name)
+        return label
+
+    def _release_session(self, agent_name: str, label: str) -> None:
+        """Return a leased session to its agent's pool (dropped if the pool is full)."""
+        try:
+            self._pools[agent_name].put_nowait(label)
+        except asyncio.QueueFull:
+            self._session_ended(label)
+            logger.debug(f"Warm pool for {agent_name} full, dropping session {label}")
+
+    async def _send_to_session(
+        self,
+        label: str,
+        message: str,
+        timeout: float,
+        on_chunk: Callable[[str], Any] | None = None,
+    ) -> str:
+        """Send a message to an existing session and return its reply."""
+        if openclaw_sdk is not None:
+            response = await asyncio.wait_for(
+                openclaw_sdk.sessions_send(label=label, message=message),
+                timeout=timeout,
+            )
+            return _emit(self._session_output(response), on_chunk)
+        return await self._exec_openclaw(
+            ["openclaw", "sessions", "send", "--label", label, "--message", message],
+            timeout=timeout,
+            on_chunk=on_chunk,
+        )
 
     async def delegate_parallel(
         self,
         tasks: list[DelegationTask],
         timeout: float = 120.0,
+        max_concurrent: int | None = None,
     ) -> list[DelegationResult]:
         """
         Spawn multiple agent sessions concurrently and collect their results.
 
-        Independent tasks run in parallel. If one agent fails, others still
+        Independent tasks run in parallel, at most ``max_concurrent`` at a time
+        (default: MAX_PARALLEL_DELEGATIONS). If one agent fails, others still
         return their results (fail-partial, not fail-all).
         """
-        # Default timeouts per agent type
-        default_timeouts = {
-            "builder": 120.0,
-            "verifier": 90.0,
-            "researcher": 90.0,
-        }
-
-        coros = [
-            self.delegate(
-                agent_name=t.agent_name,
-                task=t.task,
-                context=t.context,
-                timeout=default_timeouts.get(t.agent_name, timeout),
-            )
-            for t in tasks
-        ]
-        raw_results = await asyncio.gather(*coros, return_exceptions=True)
+        timeouts = [self._parallel_timeout(t.agent_name, timeout) for t in tasks]
+
+        # Fresh CLI sessions can all be spawned by one `spawn_batch` call
+        if (
+            len(tasks) > 1 and self._batch_supported
+            and openclaw_sdk is None and self._warm_sessions == 0
+        ):
+            batched = await self._delegate_batch(tasks, max(timeouts))
+            if batched is not None:
+                return batched
+
+        results: list[DelegationResult | None] = [None] * len(tasks)
+        async for i, result in self.delegate_parallel_stream(tasks, timeout, max_concurrent):
+            results[i] = result
+        return results
+
+    async def delegate_parallel_stream(
+        self,
+        tasks: list[DelegationTask],
+        timeout: float = 120.0,
+        max_concurrent: int | None = None,
+    ) -> AsyncIterator[tuple[int, DelegationResult]]:
+        """
+        Like delegate_parallel, but yield ``(task_index, result)`` pairs as
+        each session finishes so callers can act on early results.
+        """
+        sem = asyncio.Semaphore(max_concurrent or min(len(tasks), MAX_PARALLEL_DELEGATIONS) or 1)
+        # Warm sessions already carry their system prompt
+        prompts = await self._fan_out_prompts(tasks) if self._warm_sessions == 0 else [None] * len(tasks)
+
+        async def _one(i: int, t: DelegationTask) -> tuple[int, DelegationResult]:
+            async with sem:
+                try:
+                    return i, await self.delegate(
+                        agent_name=t.agent_name,
+                        task=t.task,
+                        context=t.context,
+                        timeout=self._parallel_timeout(t.agent_name, timeout),
+                        system_prompt=prompts[i],
+                    )
+                except Exception as e:
+                    logger.error(f"Parallel delegation to {t.agent_name} raised: {e}")
+                    return i, DelegationResult(
+                        agent_name=t.agent_name,
+                        success=False,
+                        result="",
+                        session_key="",
+                        error=str(e),
+                    )
+
+        pending = [asyncio.ensure_future(_one(i, t)) for i, t in enumerate(tasks)]
+        try:
+            for next_done in asyncio.as_completed(pending):
+                yield await next_done
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+    async def _fan_out_prompts(self, tasks: list[DelegationTask]) -> list[str]:
+        """
+        System prompt per task, built once per distinct (agent, context object).
+
+        Builds run concurrently in worker threads, so cold SOUL.md/TEAM.md
+        reads overlap instead of stalling the event loop one after another.
+        """
+        distinct: dict[tuple[str, int], DelegationTask] = {}
+        for t in tasks:
+            distinct.setdefault((t.agent_name, id(t.context)), t)
+        built = dict(zip(distinct, await asyncio.gather(*(
+            asyncio.to_thread(self._build_system_prompt, t.agent_name, t.context)
+            for t in distinct.values()
+        ))))
+        return [built[(t.agent_name, id(t.context))] for t in tasks]
+
+    @staticmethod
+    def _parallel_timeout(agent_name: str, timeout: float) -> float:
+        """Per-agent default timeout for parallel fan-outs."""
+        return PARALLEL_TIMEOUTS.get(agent_name, timeout)
+
+    async def _delegate_batch(
+        self, tasks: list[DelegationTask], timeout: float
+    ) -> list[DelegationResult] | None:
+        """
+        Spawn every task's session through one `spawn_batch` CLI call.
+
+        Returns None, so the caller falls back to per-task spawns, only when
+        the installed CLI rejects the subcommand; any other failure becomes
+        an error result per task.
+        """
+        batch = []
+        for t, system_prompt in zip(tasks, await self._fan_out_prompts(tasks)):
+            config = self._get_config(t.agent_name)
+            batch.append({
+                "label": self._new_session_key(t.agent_name),
+                "model": config.model,
+                "system": system_prompt,
+                "tools": config.tools,
+                "message": t.task,
+            })
+        logger.info(f"Delegating {len(batch)} tasks in one batch spawn")
+
+        for t, spec in zip(tasks, batch):
+            self._session_started(spec["label"], t.agent_name)
+        try:
+            # The whole batch is one CLI process, so it holds one slot
+            async with self._delegation_slot():
+                outputs = await self._run_session_batch(batch, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Batch spawn timed out after {timeout}s")
+            outputs = {
+                spec["label"]: {"error": f"Timeout after {timeout}s"} for spec in batch
+            }
+        except _BatchUnsupported as e:
+            logger.warning(f"Batch spawn unavailable, spawning sessions individually: {e}")
+            self._batch_supported = False
+            return None
+        except Exception as e:
+            # Sessions may have started, so never rerun them one by one
+            logger.error(f"Batch spawn failed: {e}")
+            outputs = {spec["label"]: {"error": f"Batch spawn failed: {e}"} for spec in batch}
+        finally:
+            for spec in batch:
+                self._session_ended(spec["label"])
 
         results: list[DelegationResult] = []
-        for task, result in zip(tasks, raw_results):
-            if isinstance(result, Exception):
-                logger.error(f"Parallel delegation to {task.agent_name} raised: {result}")
+        for t, spec in zip(tasks, batch):
+            label = spec["label"]
+            output = outputs.get(label) or {"error": "No result returned by batch spawn"}
+            if output.get("error"):
+                logger.error(f"Session {label} failed: {output['error']}")
                 results.append(DelegationResult(
-                    agent_name=task.agent_name,
+                    agent_name=t.agent_name,
                     success=False,
                     result="",
-                    session_key="",
-                    error=str(result),
+                    session_key=label,
+                    error=str(output["error"]),
                 ))
             else:
-                results.append(result)
+                results.append(DelegationResult(
+                    agent_name=t.agent_name,
+                    success=True,
+                    result=self._session_output(output),
+                    session_key=label,
+                ))
         return results
 
-    async def _run_session(self, spawn_args: dict, timeout: float) -> str:
+    async def _run_session_batch(self, batch: list[dict], timeout: float) -> dict[str, dict]:
+        """
+        Run several sessions with `openclaw sessions spawn_batch`.
+
+        The CLI reads a JSON manifest of spawn args from stdin and prints one
+        JSON line (``{"label", "result"|"error"}``) per finished session.
+        Returns the parsed lines keyed by label; non-JSON lines are skipped.
+        If the CLI exits nonzero, sessions it reported keep their results and
+        the rest get its error. Raises _BatchUnsupported when the CLI is
+        missing or rejects the subcommand.
+        """
+        failure = None
+        try:
+            stdout = await self._exec_openclaw(
+                ["openclaw", "sessions", "spawn_batch", "--manifest", "-"],
+                timeout=timeout,
+                input=json_codec.dumps_bytes(batch),
+            )
+        except FileNotFoundError as e:
+            raise _BatchUnsupported(str(e)) from e
+        except RuntimeError as e:
+            stdout = getattr(e, "stdout", "")
+            if not stdout.strip() and _UNKNOWN_SUBCOMMAND.search(str(e)):
+                raise _BatchUnsupported(str(e)) from e
+            # Sessions may already have run: keep their results, fail the rest
+            failure = str(e)
+
+        outputs: dict[str, dict] = {}
+        for line in stdout.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json_codec.loads(line)
+            except json_codec.JSONDecodeError:
+                logger.warning(f"Skipping non-JSON batch spawn output: {line[:200]}")
+                continue
+            if isinstance(entry, dict) and entry.get("label"):
+                outputs[entry["label"]] = entry
+        if failure:
+            for spec in batch:
+                outputs.setdefault(spec["label"], {"label": spec["label"], "error": failure})
+        return outputs
+
+    async def _run_session(
+        self,
+        spawn_args: dict,
+        timeout: float,
+        on_chunk: Callable[[str], Any] | None = None,
+    ) -> str:
         """
         Execute an agent session via OpenClaw.
 
-        In the OpenClaw environment, this spawns a sub-session using the
-        sessions_spawn API. The session runs to completion and returns its
-        final response.
-
-        For now, this uses the CLI interface. A future version could use
-        the OpenClaw Python SDK directly.
+        Spawns a sub-session through the sessions_spawn API and returns its
+        final response once the session completes. The OpenClaw Python SDK is
+        used in-process when installed; otherwise the ``openclaw`` CLI is run
+        as a subprocess.
         """
-        # Build the openclaw session spawn command
-        cmd_parts = ["openclaw", "sessions", "spawn"]
+        if openclaw_sdk is not None:
+            result = await asyncio.wait_for(
+                self._run_session_sdk(spawn_args), timeout=timeout
+            )
+            return _emit(result, on_chunk)
+        return await self._run_session_cli(spawn_args, timeout, on_chunk)
+
+    async def _run_session_sdk(self, spawn_args: dict) -> str:
+        """Run a session in-process via the OpenClaw SDK."""
+        response = await openclaw_sdk.sessions_spawn(
+            label=spawn_args.get("label"),
+            model=spawn_args.get("model") or None,
+            system=spawn_args.get("system", ""),
+            tools=spawn_args.get("tools", []),
+            message=spawn_args.get("message", ""),
+        )
+        return self._session_output(response)
+
+    @staticmethod
+    def _session_output(response: Any) -> str:
+        """Final reply text from an SDK response (dict, result object, or str)."""
+        if isinstance(response, dict):
+            response = response.get("result", "")
+        else:
+            response = getattr(response, "result", response)
+        return str(response or "").strip()
+
+    async def _run_session_cli(
+        self,
+        spawn_args: dict,
+        timeout: float,
+        on_chunk: Callable[[str], Any] | None = None,
+    ) -> str:
+        """Run a session by spawning the ``openclaw`` CLI."""
+        # Build the openclaw session spawn command on the agent's fixed prefix
+        cmd_parts = list(spawn_args.get("argv_prefix") or _spawn_argv_prefix(
+            spawn_args.get("model", ""), spawn_args.get("tools") or ()
+        ))
 
         if spawn_args.get("label"):
             cmd_parts.extend(["--label", spawn_args["label"]])
-        if spawn_args.get("model"):
-            cmd_parts.extend(["--model", spawn_args["model"]])
 
-        # Write system prompt to a temp file to avoid shell escaping issues
-        import tempfile
-        system_file = None
-        try:
-            if spawn_args.get("system"):
-                system_file = tempfile.NamedTemporaryFile(
-                    mode="w", suffix=".md", delete=False
-                )
-                system_file.write(spawn_args["system"])
-                system_file.close()
-                cmd_parts.extend(["--system-file", system_file.name])
-
-            if spawn_args.get("tools"):
-                for tool in spawn_args["tools"]:
-                    cmd_parts.extend(["--tool", tool])
-
-            if spawn_args.get("message"):
-                cmd_parts.extend(["--message", spawn_args["message"]])
-
-            # Run with timeout
-            proc = await asyncio.create_subprocess_exec(
-                *cmd_parts,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=str(self.workspace),
-            )
+        if spawn_args.get("message"):
+            cmd_parts.extend(["--message", spawn_args["message"]])
+
+        # The system prompt goes over stdin: no temp file, no shell escaping
+        system_input = None
+        if spawn_args.get("system"):
+            cmd_parts.append("--system-stdin")
+            system_input = spawn_args["system"].encode()
+
+        return await self._exec_openclaw(
+            cmd_parts, timeout=timeout, input=system_input, on_chunk=on_chunk
+        )
 
-            stdout, stderr = await asyncio.wait_for(
-                proc.communicate(), timeout=timeout
+    async def _exec_openclaw(
+        self,
+        cmd_parts: list[str],
+        timeout: float,
+        input: bytes | None = None,
+        on_chunk: Callable[[str], Any] | None = None,
+    ) -> str:
+        """
+        Run an ``openclaw`` CLI command and return its stripped stdout.
+
+        *input* is fed to stdin. Stdout is read incrementally and each decoded
+        piece is handed to *on_chunk* as it arrives; the child is killed if it
+        overruns *timeout*.
+        """
+        proc = await asyncio.create_subprocess_exec(
+            *cmd_parts,
+            stdin=asyncio.subprocess.PIPE if input is not None else None,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self._workspace_str,
+        )
+
+        async def _feed_stdin() -> None:
+            try:
+                proc.stdin.write(input)
+                await proc.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # child exited early; its exit status tells the story
+            finally:
+                proc.stdin.close()
+
+        async def _read_stdout() -> str:
+            decoder = codecs.getincrementaldecoder("utf-8")("replace")
+            chunks: list[str] = []
+            while data := await proc.stdout.read(STREAM_CHUNK_BYTES):
+                text = decoder.decode(data)
+                if text:
+                    chunks.append(text)
+                    if on_chunk:
+                        on_chunk(text)
+            chunks.append(decoder.decode(b"", final=True))
+            await proc.wait()
+            return "".join(chunks)
+
+        stdin_task = asyncio.create_task(_feed_stdin()) if input is not None else None
+        stderr_task = asyncio.create_task(_tail_reader(proc.stderr, STDERR_TAIL_BYTES))
+        try:
+            stdout = await asyncio.wait_for(_read_stdout(), timeout=timeout)
+        except BaseException:
+            if proc.returncode is None:
+                proc.kill()
+            for task in (stdin_task, stderr_task):
+                if task:
+                    task.cancel()
+            raise
+        stderr = await stderr_task
+        if stdin_task:
+            await stdin_task
+
+        if proc.returncode != 0:
+            error_msg = (
+                stderr.decode(errors="replace").strip() if stderr
+                else f"Exit code {proc.returncode}"
             )
+            raise _CLIFailure(f"Session failed: {error_msg}", stdout)
 
-            if proc.returncode != 0:
-                error_msg = stderr.decode().strip() if stderr else f"Exit code {proc.returncode}"
-                raise RuntimeError(f"Session failed: {error_msg}")
+        return stdout.strip()
 
-            return stdout.decode().strip()
+    def _session_started(self, session_key: str, agent_name: str) -> None:
+        self._active_sessions[session_key] = agent_name
 
-        finally:
-            if system_file and os.path.exists(system_file.name):
-                os.unlink(system_file.name)
+    def _session_ended(self, session_key: str) -> None:
+        agent_name = self._active_sessions.pop(session_key, None)
+        if agent_name is not None:
+            self._completed_sessions.append((session_key, agent_name))
 
     def get_active_sessions(self) -> dict[str, str]:
-        """Return a copy of active session mappings."""
+        """Return a copy of in-flight (and pooled warm) session mappings."""
         return dict(self._active_sessions)
+
+    def get_completed_sessions(self) -> list[tuple[str, str]]:
+        """Return the most recent finished sessions as (session_key, agent_name), oldest first."""
+        return list(self._completed_sessions)
@@ -10,10 +10,13 @@ Verification pipeline per claim:
 3. Web verification — search authoritative sources (has external network access).
 4. Confidence scoring — 0.0–1.0 based on evidence quality.
 
-For batch verification (3+ claims), sub-agents verify claims in parallel,
-then the parent aggregates and cross-references results.
+For batch verification (3+ claims), one LLM call verifies up to BATCH_MAX
+claims at once (sub-agents pick up any it leaves unanswered), then the
+parent aggregates and cross-references results.
 """
 
+import asyncio
+import functools
 import json
 import logging
 import os
@@ -31,9 +34,20 @@ logger = logging.getLogger(__name__)
 # Use sub-agents when this many claims need verification
 BATCH_THRESHOLD = 3
 
+# Claims verified together in one batched LLM call
+BATCH_MAX = 20
+
 # Below this confidence from the cache we re-verify anyway
 CACHE_CONFIDENCE_THRESHOLD = 0.9
 
+# Up to this many verifications are aggregated directly, without an LLM call
+LLM_AGGREGATE_THRESHOLD = int(os.environ.get("VERIFIER_LLM_AGG_THRESHOLD", "5"))
+
+# A cached fact only answers a claim this cosine-similar to it (a paraphrase)
+CACHE_SIMILARITY_THRESHOLD = 0.92
+
+VERIFICATION_STATUSES = ("verified", "corrected", "unverified", "false")
+
 # ─── Prompts ──────────────────────────────────────────────────────────────────
 
 EXTRACT_CLAIMS_PROMPT = """\
@@ -55,10 +69,12 @@ Respond with ONLY a JSON object:
 If there are no verifiable claims, return {{"claims": []}}.
 """
 
-VERIFY_SINGLE_PROMPT = """\
-Verify this specific factual claim. Be conservative — when uncertain, say so.
+# Verification prompts put the per-claim text last: everything before it is
+# identical across a request's claims, so providers can reuse the cached
+# prefix (explicit cache breakpoint on Anthropic, automatic elsewhere).
 
-Claim: "{claim}"
+VERIFY_SINGLE_PROMPT_PREFIX = """\
+Verify the specific factual claim given at the end. Be conservative — when uncertain, say so.
 
 Known facts from cache (may be relevant):
 {known_facts}
@@ -77,7 +93,7 @@ Your verification process:
 
 Respond with ONLY a JSON object:
 {{
-  "claim": "{claim}",
+  "claim": "<the claim, verbatim>",
   "status": "verified|corrected|unverified|false",
   "confidence": <0.0-1.0>,
   "correction": "<corrected version if status is 'corrected', else null>",
@@ -92,6 +108,75 @@ Respond with ONLY a JSON object:
 }}
 """
 
+VERIFY_SINGLE_PROMPT_SUFFIX = """\
+
+Claim: "{claim}"
+"""
+
+VERIFY_SINGLE_PROMPT = VERIFY_SINGLE_PROMPT_PREFIX + VERIFY_SINGLE_PROMPT_SUFFIX
+
+BATCH_VERIFY_PROMPT_PREFIX = """\
+Verify each of the factual claims listed at the end independently. Be conservative — when uncertain, say so.
+
+Known facts from cache (may be relevant to any claim):
+{known_facts}
+
+For each claim:
+1. Check if the known facts already confirm or contradict it.
+2. Assess whether it matches common hallucination patterns (fabricated APIs,
+   invented statistics, non-existent tools, wrong versions or formulas,
+   fabricated quotes).
+3. Use your training knowledge to assess its plausibility.
+4. Assign a confidence score based on evidence quality.
+
+Respond with ONLY a JSON object with one entry per claim, "index" being the
+claim's number in the list:
+{{
+  "verifications": [
+    {{
+      "index": <claim number>,
+      "status": "verified|corrected|unverified|false",
+      "confidence": <0.0-1.0>,
+      "correction": "<corrected version if status is 'corrected', else null>",
+      "sources": ["<source URLs or 'training knowledge'>"],
+      "reasoning": "<brief explanation of your assessment>"
+    }}
+  ]
+}}
+"""
+
+BATCH_VERIFY_PROMPT_SUFFIX = """\
+
+Claims:
+{claims}
+"""
+
+BATCH_VERIFY_PROMPT = BATCH_VERIFY_PROMPT_PREFIX + BATCH_VERIFY_PROMPT_SUFFIX
+
+# Sent as Gemini's responseSchema, which takes the OpenAPI subset: no type
+# lists, and enums need an explicit type
+BATCH_VERIFY_SCHEMA = {
+    "type": "object",
+    "required": ["verifications"],
+    "properties": {
+        "verifications": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["index", "status", "confidence"],
+                "properties": {
+                    "index": {"type": "integer"},
+                    "status": {"type": "string", "enum": list(VERIFICATION_STATUSES)},
+                    "confidence": {"type": "number"},
+                    "correction": {"type": "string", "nullable": True},
+                    "sources": {"type": "array", "items": {"type": "string"}},
+                    "reasoning": {"type": "string"},
+                },
+            },
+        },
+    },
+}
+
 CONSISTENCY_CHECK_PROMPT = """\
 I need to verify a claim by checking its consistency from multiple angles.
 Ask the SAME underlying question in {n} different ways and answer each independently.
@@ -158,6 +243,12 @@ Respond with ONLY a JSON object:
 """
 
 
+@functools.lru_cache(maxsize=64)
+def _prompt_prefix(template: str, known_facts: str) -> str:
+    """Render a verify prompt's shared prefix; every claim of a request reuses it."""
+    return template.format(known_facts=known_facts or "(no cached facts available)")
+
+
 # ─── Verifier Agent ───────────────────────────────────────────────────────
 
 class VerifierAgent(BaseAgent):
@@ -166,7 +257,7 @@ class VerifierAgent(BaseAgent):
 
     Modes:
     1. Single claim verification (direct LLM call + cache check)
-    2. Batch verification (parallel sub-agents, one per claim)
+    2. Batch verification (one LLM call per BATCH_MAX claims, sub-agents as fallback)
     3. Consistency check (multi-angle questioning of a single claim)
     """
 
@@ -180,6 +271,8 @@ class VerifierAgent(BaseAgent):
         self._knowledge_cache_path = Path(
             os.environ.get("KNOWLEDGE_CACHE_PATH", "/data/knowledge")
         )
+        # Claims verified at once outside of batches (respects LLM rate limits)
+        self._verify_sem = asyncio.Semaphore(int(os.environ.get("VERIFIER_CONCURRENCY", "4")))
 
     # ─── BaseAgent interface ──────────────────────────────────────────
 
@@ -279,12 +372,14 @@ class VerifierAgent(BaseAgent):
             else:
                 uncached_claims.append(claim)
 
-        # Phase 2: Verify uncached claims
+        # Phase 2: Verify uncached claims (prompt inputs resolved once for all of them)
         if uncached_claims:
+            known_facts = self._format_known_facts(context)
+            system = self.system_prompt
             if len(uncached_claims) >= BATCH_THRESHOLD and self.sub_pool:
-                fresh_results = await self._batch_verify(uncached_claims, context)
+                fresh_results = await self._batch_verify(uncached_claims, known_facts, system)
             else:
-                fresh_results = await self._sequential_verify(uncached_claims, context)
+                fresh_results = await self._sequential_verify(uncached_claims, known_facts, system)
         else:
             fresh_results = []
 
@@ -295,9 +390,7 @@ class VerifierAgent(BaseAgent):
         report = await self._aggregate(message, all_verifications)
 
         # Phase 4: Update knowledge cache with high-confidence new facts
-        new_facts = report.get("new_facts_for_cache", [])
-        for fact_entry in new_facts:
-            self._store_fact(fact_entry)
+        self._store_facts(report.get("new_facts_for_cache", []))
 
         return report
 
@@ -324,36 +417,36 @@ class VerifierAgent(BaseAgent):
     # ─── Sequential Verification ──────────────────────────────────────
 
     async def _sequential_verify(
-        self, claims: list[str], context: dict
+        self, claims: list[str], known_facts: str, system: str
     ) -> list[dict]:
-        """Verify claims one by one (for small batches)."""
-        results = []
-        known_facts = self._format_known_facts(context)
-
-        for claim in claims:
-            verification = await self._verify_single(claim, known_facts)
-            results.append(verification)
+        """
+        Verify claims individually (for small batches). Claims run
+        concurrently, at most VERIFIER_CONCURRENCY at a time.
+        """
+        async def _bounded(claim: str) -> dict:
+            # Held across the consistency re-check too, so it can't oversubscribe
+            async with self._verify_sem:
+                return await self._verify_single(claim, known_facts, system)
 
-        return results
+        return list(await asyncio.gather(*(_bounded(claim) for claim in claims)))
 
-    async def _verify_single(self, claim: str, known_facts: str) -> dict:
+    async def _verify_single(self, claim: str, known_facts: str, system: str) -> dict:
         """
         Verify a single claim through the full pipeline:
         1. LLM verification with known facts context
         2. If confidence is borderline (0.4–0.7), run consistency check
         """
-        prompt = VERIFY_SINGLE_PROMPT.format(
-            claim=claim,
-            known_facts=known_facts or "(no cached facts available)",
-        )
+        prefix = _prompt_prefix(VERIFY_SINGLE_PROMPT_PREFIX, known_facts)
 
         try:
             result = await self.llm.generate_json(
-                prompt=prompt,
-                system=self.system_prompt,
+                prompt=prefix + VERIFY_SINGLE_PROMPT_SUFFIX.format(claim=claim),
+                system=system,
                 temperature=0.2,
+                cache_prefix=prefix,
             )
             verification = result["content"]
+            verification["claim"] = claim
         except Exception as e:
             logger.warning(f"Verification failed for claim: {e}")
             return {
@@ -382,31 +475,103 @@ class VerifierAgent(BaseAgent):
 
         return verification
 
-    # ─── Batch Verification (Parallel Sub-Agents) ─────────────────────
+    # ─── Batch Verification ───────────────────────────────────────────
 
     async def _batch_verify(
-        self, claims: list[str], context: dict
+        self, claims: list[str], known_facts: str, system: str
+    ) -> list[dict]:
+        """
+        Verify multiple claims with batched LLM calls (BATCH_MAX claims each,
+        run concurrently). Claims a batch fails to answer are verified by
+        sub-agents, one per claim.
+        """
+        batches = [
+            range(start, min(start + BATCH_MAX, len(claims)))
+            for start in range(0, len(claims), BATCH_MAX)
+        ]
+        logger.info(f"Batch verifying {len(claims)} claims in {len(batches)} call(s)")
+        answers = await asyncio.gather(*(
+            self._verify_batch_prompt([claims[i] for i in batch], known_facts, system)
+            for batch in batches
+        ))
+        verified: dict[int, dict] = {}
+        for batch, batch_answers in zip(batches, answers):
+            verified.update((batch[j], v) for j, v in batch_answers.items())
+
+        missing = [i for i in range(len(claims)) if i not in verified]
+        if missing:
+            logger.info(f"Batch left {len(missing)} claim(s) unanswered, using sub-agents")
+            fallback = await self._sub_agent_verify([claims[i] for i in missing], known_facts)
+            verified.update(zip(missing, fallback))
+
+        return [verified[i] for i in range(len(claims))]
+
+    async def _verify_batch_prompt(
+        self, claims: list[str], known_facts: str, system: str
+    ) -> dict[int, dict]:
+        """
+        Verify *claims* in one LLM call. Returns verifications keyed by
+        position in *claims*; claims without a well-formed answer are absent
+        (all of them if the call fails or returns malformed JSON).
+        """
+        prefix = _prompt_prefix(BATCH_VERIFY_PROMPT_PREFIX, known_facts)
+        prompt = prefix + BATCH_VERIFY_PROMPT_SUFFIX.format(
+            claims="\n".join(f"{n}. {claim}" for n, claim in enumerate(claims, 1)),
+        )
+
+        try:
+            result = await self.llm.generate_json(
+                prompt=prompt,
+                system=system,
+                temperature=0.2,
+                json_schema=BATCH_VERIFY_SCHEMA,
+                cache_prefix=prefix,
+            )
+            entries = result["content"]["verifications"]
+        except Exception as e:
+            logger.warning(f"Batched verification failed: {e}")
+            return {}
+
+        verified: dict[int, dict] = {}
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            index, confidence = entry.get("index"), entry.get("confidence")
+            if (
+                not isinstance(index, int) or not 1 <= index <= len(claims)
+                or entry.get("status") not in VERIFICATION_STATUSES
+                or not isinstance(confidence, (int, float))
+            ):
+                continue
+            verified.setdefault(index - 1, {
+                "claim": claims[index - 1],
+                "status": entry["status"],
+                "confidence": confidence,
+                "correction": entry.get("correction"),
+                "sources": entry.get("sources") or [],
+                "reasoning": entry.get("reasoning", ""),
+            })
+        return verified
+
+    async def _sub_agent_verify(
+        self, claims: list[str], known_facts: str
     ) -> list[dict]:
         """
         Verify multiple claims in parallel using sub-agents.
         Each sub-agent handles one claim independently.
         """
-        known_facts = self._format_known_facts(context)
-
+        prefix = _prompt_prefix(VERIFY_SINGLE_PROMPT_PREFIX, known_facts)
         subtasks = []
         for i, claim in enumerate(claims):
-            prompt = VERIFY_SINGLE_PROMPT.format(
-                claim=claim,
-                known_facts=known_facts or "(no cached facts available)",
-            )
             subtasks.append(SubTask(
                 id=f"verify_{i}",
-                description=prompt,
+                description=prefix + VERIFY_SINGLE_PROMPT_SUFFIX.format(claim=claim),
                 context={"claim": claim},
                 constraints={"max_sources": 3},
+                shared_prefix=prefix,
             ))
 
-        logger.info(f"Batch verifying {len(subtasks)} claims in parallel")
+        logger.info(f"Verifying {len(subtasks)} claims with sub-agents")
         sub_results = await self.sub_pool.execute_parallel(subtasks)
 
         # Parse sub-agent results
@@ -492,9 +657,11 @@ class VerifierAgent(BaseAgent):
                 "new_facts_for_cache": [],
             }
 
-        # For small batches, skip the LLM aggregation and compute directly
-        if len(verifications) <= 2:
-            return self._simple_aggregate(verifications)
+        # Small or unanimous batches are aggregated directly; the LLM
+        # cross-reference only earns its round-trip on mixed results
+        simple = self._simple_aggregate(verifications)
+        if len(verifications) <= LLM_AGGREGATE_THRESHOLD or self._is_unanimous(simple):
+            return simple
 
         # For larger batches, use LLM to cross-reference
         verifications_json = json.dumps(verifications, indent=2, default=str)
@@ -516,7 +683,15 @@ class VerifierAgent(BaseAgent):
             return result["content"]
         except Exception as e:
             logger.warning(f"Aggregation LLM failed: {e}, using simple aggregate")
-            return self._simple_aggregate(verifications)
+            return simple
+
+    @staticmethod
+    def _is_unanimous(report: dict) -> bool:
+        """No corrections, and every confidence is uniformly high or uniformly low."""
+        if report["corrections_needed"]:
+            return False
+        confidences = [v.get("confidence", 0.0) for v in report["verifications"]]
+        return min(confidences) > 0.85 or max(confidences) < 0.3
 
     def _simple_aggregate(self, verifications: list[dict]) -> dict:
         """
@@ -564,17 +739,19 @@ class VerifierAgent(BaseAgent):
 
     def _check_cache(self, claim: str) -> Optional[dict]:
         """
-        Check if a claim (or something close) is in the knowledge cache.
-        Uses the memory engine's lookup_facts if available.
+        Check if a claim (or a paraphrase of it) is in the knowledge cache.
+        Uses the memory engine's embedding lookup_facts if available; facts
+        less than CACHE_SIMILARITY_THRESHOLD similar are not a match.
         """
         if not self.memory:
             return None
 
         try:
-            # Search by text similarity in the knowledge cache
+            # Search by embedding similarity in the knowledge cache
             results = self.memory.lookup_facts(
-                query=claim[:100],
+                query=claim,
                 min_confidence=0.5,
+                min_similarity=CACHE_SIMILARITY_THRESHOLD,
                 limit=3,
             )
             if results:
@@ -590,6 +767,25 @@ class VerifierAgent(BaseAgent):
 
         return None
 
+    def _store_facts(self, fact_entries: list[dict]):
+        """Store verified facts in the knowledge cache with one bulk write."""
+        if not self.memory:
+            return
+
+        entries = [e for e in fact_entries if isinstance(e, dict) and e.get("fact")]
+        if not entries:
+            return
+        if not hasattr(self.memory, "store_facts_bulk"):
+            for entry in entries:
+                self._store_fact(entry)
+            return
+
+        try:
+            self.memory.store_facts_bulk(entries, source_agent="verifier")
+            logger.debug(f"Cached {len(entries)} fact(s)")
+        except Exception as e:
+            logger.warning(f"Failed to cache facts: {e}")
+
     def _store_fact(self, fact_entry: dict):
         """Store a verified fact in the knowledge cache."""
         if not self.memory:
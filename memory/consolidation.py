@@ -2,13 +2,37 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
+import re
 import sqlite3
 import uuid
 from datetime import datetime, timezone, timedelta
+from itertools import chain
 
 import numpy as np
 
-from memory.embeddings import cosine_similarity, deserialize_embedding, serialize_embedding
+try:
+    import hnswlib
+except ImportError:  # optional: pip install hnswlib (approximate clustering for large pools)
+    hnswlib = None
+
+from memory.embeddings import deserialize_embedding_matrix
+
+# Seed rows per similarity-matrix block in cluster_memories (block x N floats)
+_CLUSTER_BLOCK_ROWS = 1024
+# Sentence boundary: whitespace after terminal punctuation (kept on the sentence)
+_SENT_SPLIT = re.compile(r"(?<=[.!?])\s+")
+# Sentences kept in an extractive cluster summary
+SUMMARY_MAX_SENTENCES = 20
+# Character-3-gram Jaccard similarity at which a sentence counts as a repeat
+NEAR_DUP_JACCARD = 0.85
+# Above this many embeddings, clustering uses an HNSW index when hnswlib is
+# installed. The blocked matmul is faster until the pool is tens of thousands
+# of memories (index construction dominates below that).
+ANN_CLUSTER_MIN = 50_000
+# Nearest neighbours considered per memory on the HNSW path
+ANN_NEIGHBORS = 64
 
 
 def run_consolidation(db_path: str, tier: str = "full", dry_run: bool = False) -> dict:
@@ -19,6 +43,9 @@ def run_consolidation(db_path: str, tier: str = "full", dry_run: bool = False) -
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
+    # WAL stays consistent with NORMAL; only the last commit before a power
+    # loss can be lost, which a rerun of the job recreates
+    conn.execute("PRAGMA synchronous=NORMAL")
 
     try:
         summary = {"consolidated": 0, "clusters": 0, "pruned": 0}
@@ -29,33 +56,40 @@ def run_consolidation(db_path: str, tier: str = "full", dry_run: bool = False) -
             summary["clusters"] = len([c for c in clusters if len(c) >= 2])
 
             if not dry_run:
+                summary_rows, link_rows, delete_rows = [], [], []
                 for cluster in clusters:
                     if len(cluster) < 2:
                         continue
                     merged = summarize_cluster(cluster)
                     summary_id = f"mem_{uuid.uuid4().hex[:12]}"
                     best = max(cluster, key=lambda m: m["importance"])
-                    conn.execute(
-                        "INSERT INTO memories (id, content, embedding, tier, importance, tags, source_agent, metadata) "
-                        "VALUES (?, ?, ?, 'long_term', ?, ?, ?, ?)",
-                        (
-                            summary_id,
-                            merged,
-                            best["embedding"],
-                            best["importance"],
-                            best["tags"],
-                            best["source_agent"],
-                            str({"consolidated_from": [m["id"] for m in cluster]}),
-                        ),
-                    )
+                    summary_rows.append((
+                        summary_id,
+                        merged,
+                        best["embedding"],
+                        best["importance"],
+                        best["tags"],
+                        best["source_agent"],
+                        json.dumps({"consolidated_from": [m["id"] for m in cluster]}),
+                    ))
                     for mem in cluster:
-                        conn.execute(
-                            "INSERT OR IGNORE INTO memory_links (memory_id_a, memory_id_b, relation_type, strength) "
-                            "VALUES (?, ?, 'consolidated_into', 1.0)",
-                            (mem["id"], summary_id),
-                        )
-                        conn.execute("DELETE FROM memories WHERE id = ?", (mem["id"],))
+                        link_rows.append((mem["id"], summary_id))
+                        delete_rows.append((mem["id"],))
                     summary["consolidated"] += len(cluster)
+
+                # One statement per table for the whole run, all in the
+                # transaction committed below
+                conn.executemany(
+                    "INSERT INTO memories (id, content, embedding, tier, importance, tags, source_agent, metadata) "
+                    "VALUES (?, ?, ?, 'long_term', ?, ?, ?, ?)",
+                    summary_rows,
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO memory_links (memory_id_a, memory_id_b, relation_type, strength) "
+                    "VALUES (?, ?, 'consolidated_into', 1.0)",
+                    link_rows,
+                )
+                conn.executemany("DELETE FROM memories WHERE id = ?", delete_rows)
             else:
                 # dry-run: just count
                 for cluster in clusters:
@@ -80,43 +114,94 @@ def run_consolidation(db_path: str, tier: str = "full", dry_run: bool = False) -
         conn.close()
 
 
+async def run_consolidation_async(db_path: str, tier: str = "full", dry_run: bool = False) -> dict:
+    """run_consolidation in a worker thread, for callers on an event loop.
+
+    The clustering matmuls and SQLite calls release the GIL, so a thread
+    keeps the loop responsive without a process pool's start-up and pickling.
+    """
+    return await asyncio.to_thread(run_consolidation, db_path, tier, dry_run)
+
+
 def find_old_memories(db: sqlite3.Connection, days: int = 7) -> list[dict]:
-    """Find short-term memories older than `days`."""
+    """Find short-term memories older than `days` that have an embedding."""
     cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    # Matches the partial index idx_mem_tier_created
     rows = db.execute(
         "SELECT id, content, embedding, importance, tags, source_agent FROM memories "
-        "WHERE tier = 'short_term' AND created_at < ?",
+        "WHERE tier = 'short_term' AND created_at < ? AND embedding IS NOT NULL",
         (cutoff,),
     ).fetchall()
     return [dict(r) for r in rows]
 
 
 def cluster_memories(memories: list[dict], threshold: float = 0.7) -> list[list[dict]]:
-    """Group memories by embedding similarity (simple greedy clustering)."""
-    if not memories:
-        return []
+    """Group memories by embedding similarity (simple greedy clustering).
 
-    used = set()
-    clusters: list[list[dict]] = []
+    Each unclustered memory, in order, seeds a cluster of every remaining
+    memory at least ``threshold`` cosine-similar to it. Similarities come from
+    one normalized matrix product per block of seed rows; memories without
+    an embedding are left out.
 
-    for i, mem in enumerate(memories):
-        if i in used or mem["embedding"] is None:
-            continue
-        cluster = [mem]
-        used.add(i)
-        emb_i = deserialize_embedding(mem["embedding"])
-        for j in range(i + 1, len(memories)):
-            if j in used or memories[j]["embedding"] is None:
+    Pools larger than ANN_CLUSTER_MIN use an HNSW index when hnswlib is
+    installed: each seed then only considers its ANN_NEIGHBORS approximate
+    nearest neighbours, so very broad clusters may be split.
+    """
+    valid = [m for m in memories if m["embedding"] is not None]
+    if len(valid) < 2:
+        return [[m] for m in valid]
+
+    # Every blob is decoded exactly once, straight into the stacked matrix
+    emb = deserialize_embedding_matrix([m["embedding"] for m in valid])
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True).clip(min=1e-12)
+
+    n = len(valid)
+    if hnswlib is not None and n > ANN_CLUSTER_MIN:
+        return _cluster_ann(valid, emb, threshold)
+
+    used = np.zeros(n, dtype=bool)
+    clusters: list[list[dict]] = []
+    # Rows of the similarity matrix are computed a block at a time so large
+    # backlogs don't materialize the full N x N matrix
+    for start in range(0, n, _CLUSTER_BLOCK_ROWS):
+        sim = emb[start:start + _CLUSTER_BLOCK_ROWS] @ emb.T
+        for i in range(start, min(start + _CLUSTER_BLOCK_ROWS, n)):
+            if used[i]:
                 continue
-            emb_j = deserialize_embedding(memories[j]["embedding"])
-            if cosine_similarity(emb_i, emb_j) >= threshold:
-                cluster.append(memories[j])
-                used.add(j)
-        clusters.append(cluster)
+            match = sim[i - start] >= threshold
+            match[i] = True
+            match &= ~used
+            members = np.flatnonzero(match)
+            used[members] = True
+            clusters.append([valid[j] for j in members])
 
     return clusters
 
 
+def _cluster_ann(valid: list[dict], emb: np.ndarray, threshold: float) -> list[list[dict]]:
+    """Greedy clustering over HNSW nearest neighbours of normalized *emb*."""
+    n, dim = emb.shape
+    k = min(ANN_NEIGHBORS, n)
+    index = hnswlib.Index(space="cosine", dim=dim)
+    index.init_index(max_elements=n, ef_construction=200, M=16)
+    index.set_ef(max(k, 64))
+    index.add_items(emb)
+    # One batched query for every row; hnswlib reports cosine distance (1 - sim)
+    labels, distances = index.knn_query(emb, k=k)
+    labels = labels.astype(np.intp)
+
+    used = np.zeros(n, dtype=bool)
+    clusters: list[list[dict]] = []
+    for i in range(n):
+        if used[i]:
+            continue
+        near = labels[i][distances[i] <= 1.0 - threshold]
+        members = np.union1d([i], near[~used[near]])
+        used[members] = True
+        clusters.append([valid[j] for j in members])
+    return clusters
+
+
 def summarize_cluster(cluster: list[dict]) -> str:
     """Summarize a cluster of related memories into one consolidated memory.
 
@@ -129,24 +214,40 @@ def summarize_cluster(cluster: list[dict]) -> str:
     if len(cluster) == 1:
         return cluster[0]["content"]
 
-    contents = [m["content"] for m in cluster]
-
-    # Simple extractive summary: take unique sentences, deduplicate near-identical ones
+    # Simple extractive summary: take unique sentences, dropping exact repeats
+    # (case-insensitive) and near-duplicates of a sentence already taken
     sentences = []
     seen: set[str] = set()
-    for content in contents:
-        for sentence in content.split(". "):
-            sentence = sentence.strip()
-            if sentence and sentence.lower() not in seen:
-                seen.add(sentence.lower())
-                sentences.append(sentence)
-
-    # Cap at reasonable length
-    summary = ". ".join(sentences[:20])
-    if not summary.endswith("."):
-        summary += "."
-
-    return summary
+    kept_shingles: list[set[str]] = []
+    for sentence in chain.from_iterable(_SENT_SPLIT.split(m["content"]) for m in cluster):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if sentence[-1] not in ".!?":
+            sentence += "."
+        key = sentence[:-1].casefold()
+        if key in seen:
+            continue
+        seen.add(key)
+        shingles = _shingles(key)
+        if any(_jaccard(shingles, kept) >= NEAR_DUP_JACCARD for kept in kept_shingles):
+            continue
+        kept_shingles.append(shingles)
+        sentences.append(sentence)
+        # Cap at reasonable length
+        if len(sentences) == SUMMARY_MAX_SENTENCES:
+            break
+
+    return " ".join(sentences)
+
+
+def _shingles(text: str, n: int = 3) -> set[str]:
+    """Character n-grams of *text* (the whole text if shorter than *n*)."""
+    return {text[i:i + n] for i in range(max(len(text) - n + 1, 1))}
+
+
+def _jaccard(a: set[str], b: set[str]) -> float:
+    return len(a & b) / len(a | b)
 
 
 def prune_low_importance(db: sqlite3.Connection, threshold: float = 0.3) -> int:
@@ -8,7 +8,7 @@ from enum import Enum
 
 import numpy as np
 
-from memory.embeddings import cosine_similarity
+from memory.embeddings import cosine_similarity_batch
 
 
 class MatchType(Enum):
@@ -31,11 +31,13 @@ def check_duplicate(
     """Check a new embedding against existing ones. Returns best match info."""
     best_sim = 0.0
     best_id: str | None = None
-    for mem_id, existing_emb in existing:
-        sim = cosine_similarity(embedding, existing_emb)
-        if sim > best_sim:
-            best_sim = sim
-            best_id = mem_id
+    if existing:
+        ids, embeddings = zip(*existing)
+        sims = cosine_similarity_batch(embedding, np.stack(embeddings))
+        best = int(np.argmax(sims))
+        if sims[best] > best_sim:
+            best_sim = float(sims[best])
+            best_id = ids[best]
 
     if best_sim > 0.92:
         return DedupResult(MatchType.EXACT_DUP, best_id, best_sim)
@@ -8,9 +8,10 @@ from __future__ import annotations
 
 import os
 import json
+import threading
 import numpy as np
 from pathlib import Path
-from typing import Protocol
+from typing import Protocol, Sequence
 
 
 class Embedder(Protocol):
@@ -24,6 +25,18 @@ _model_cache: dict[str, object] = {}
 # Default model cache directory
 _MODELS_DIR = Path(os.environ.get("EMBEDDING_MODELS_DIR", Path.home() / ".cache" / "embedding-models"))
 
+# ONNX Runtime intra-op threads for local embedding inference: the CPUs this
+# process may run on (cpu_count() ignores affinity masks and cgroup pinning),
+# else 0 to let ORT pick
+_ORT_THREADS = int(os.environ.get(
+    "EMBEDDING_THREADS",
+    len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else 0,
+))
+
+# Run the local model with INT8-quantized weights (outputs stay float32, but
+# vectors shift slightly, so switch before building a memory store, not mid-way)
+_QUANTIZE = os.environ.get("CORTEX_EMBED_QUANT", "") == "1"
+
 
 class ONNXEmbedder:
     """Local embeddings using ONNX Runtime + tokenizers (no PyTorch needed).
@@ -34,6 +47,9 @@ class ONNXEmbedder:
     MODEL_REPO = "sentence-transformers/all-MiniLM-L6-v2"
     ONNX_FILE = "onnx/model.onnx"
     DIM = 384
+    SEQ_LEN = 128
+    # Texts per inference call; larger batches are encoded in chunks of this size
+    IO_BATCH = 32
 
     def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
         self.model_name = model_name
@@ -41,6 +57,16 @@ class ONNXEmbedder:
             _model_cache[model_name] = self._load_model()
         self._session, self._tokenizer = _model_cache[model_name]
 
+        # Preallocated IO buffers bound to the session on every call, so
+        # inference allocates no input/output arrays. token_type_ids stays zero.
+        shape = (self.IO_BATCH, self.SEQ_LEN)
+        self._input_ids = np.zeros(shape, dtype=np.int64)
+        self._attention_mask = np.zeros(shape, dtype=np.int64)
+        self._token_type_ids = np.zeros(shape, dtype=np.int64)
+        self._hidden = np.empty(shape + (self.DIM,), dtype=np.float32)
+        self._output_name = self._session.get_outputs()[0].name
+        self._io_lock = threading.Lock()
+
     def _download_model(self, model_dir: Path) -> None:
         """Download ONNX model and tokenizer from HuggingFace."""
         import urllib.request
@@ -71,46 +97,119 @@ class ONNXEmbedder:
         if not (model_dir / "model.onnx").exists():
             self._download_model(model_dir)
 
-        session = ort.InferenceSession(
-            str(model_dir / "model.onnx"),
-            providers=["CPUExecutionProvider"],
-        )
+        model_path = model_dir / "model.onnx"
+        if _QUANTIZE:
+            model_path = self._quantize_model(model_path)
+
+        session = self._create_session(model_path)
         tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
-        tokenizer.enable_padding(length=128)
-        tokenizer.enable_truncation(max_length=128)
+        tokenizer.enable_padding(length=self.SEQ_LEN)
+        tokenizer.enable_truncation(max_length=self.SEQ_LEN)
 
         return session, tokenizer
 
-    def _mean_pooling(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
-        """Mean pooling with attention mask."""
-        mask_expanded = np.expand_dims(attention_mask, -1).astype(np.float32)
-        summed = np.sum(token_embeddings * mask_expanded, axis=1)
-        counts = np.clip(mask_expanded.sum(axis=1), a_min=1e-9, a_max=None)
-        return summed / counts
+    @staticmethod
+    def _quantize_model(model_path: Path) -> Path:
+        """Return an INT8-weight copy of *model_path*, creating it once.
+
+        Dynamic quantization converts MatMul/Gemm weights to int8 and keeps
+        activations in float32.
+        """
+        quantized = model_path.with_suffix(".int8.onnx")
+        if not quantized.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            tmp = quantized.with_suffix(".tmp")
+            quantize_dynamic(
+                str(model_path), str(tmp),
+                weight_type=QuantType.QInt8, op_types_to_quantize=["MatMul", "Gemm"],
+            )
+            tmp.replace(quantized)
+        return quantized
+
+    def _create_session(self, model_path: Path):
+        """Create the inference session, reusing the graph-optimized model if cached.
+
+        The first load runs all graph fusions and saves the result next to
+        the model in ORT's flatbuffer format (model.opt.ort,
+        model.int8.opt.ort). Later loads, e.g. each consolidation cron run,
+        open that file directly: no protobuf parsing and no optimization
+        passes. The saved graph may be hardware specific, so a copy that
+        fails to load is discarded and rebuilt.
+        """
+        import onnxruntime as ort
+
+        def options(level, **config):
+            opts = ort.SessionOptions()
+            opts.intra_op_num_threads = _ORT_THREADS
+            opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+            opts.enable_mem_pattern = True
+            opts.graph_optimization_level = level
+            for key, value in config.items():
+                opts.add_session_config_entry(f"session.{key}", value)
+            return opts
+
+        optimized = model_path.with_suffix(".opt.ort")
+        if optimized.exists():
+            try:
+                return ort.InferenceSession(
+                    str(optimized),
+                    sess_options=options(ort.GraphOptimizationLevel.ORT_DISABLE_ALL, load_model_format="ORT"),
+                    providers=["CPUExecutionProvider"],
+                )
+            except Exception:
+                optimized.unlink(missing_ok=True)
+
+        opts = options(ort.GraphOptimizationLevel.ORT_ENABLE_ALL, save_model_format="ORT")
+        opts.optimized_model_filepath = str(optimized)
+        return ort.InferenceSession(str(model_path), sess_options=opts, providers=["CPUExecutionProvider"])
+
+    def _mean_pooling(self, token_embeddings: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Mean pooling with a float32 attention mask.
+
+        The masked sum is one batched (1 x seq) @ (seq x dim) matmul, so no
+        (batch, seq, dim) temporary is materialized.
+        """
+        pooled = np.matmul(mask[:, None, :], token_embeddings)[:, 0, :]
+        pooled /= np.maximum(mask.sum(axis=1, keepdims=True), 1e-9)
+        return pooled
 
     def _normalize(self, embeddings: np.ndarray) -> np.ndarray:
-        """L2 normalize."""
-        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-        norms = np.clip(norms, a_min=1e-9, a_max=None)
-        return embeddings / norms
+        """L2 normalize in place."""
+        norms = np.sqrt(np.einsum("ij,ij->i", embeddings, embeddings))
+        np.maximum(norms, 1e-9, out=norms)
+        return np.divide(embeddings, norms[:, None], out=embeddings)
 
     def _encode(self, texts: list[str]) -> np.ndarray:
         """Encode texts to normalized embeddings."""
         encoded = self._tokenizer.encode_batch(texts)
-        input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
-        attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
-        token_type_ids = np.zeros_like(input_ids, dtype=np.int64)
-
-        outputs = self._session.run(
-            None,
-            {
-                "input_ids": input_ids,
-                "attention_mask": attention_mask,
-                "token_type_ids": token_type_ids,
-            },
-        )
-
-        embeddings = self._mean_pooling(outputs[0], attention_mask)
+        if len(encoded) <= self.IO_BATCH:
+            return self._encode_chunk(encoded)
+        return np.concatenate([
+            self._encode_chunk(encoded[i:i + self.IO_BATCH])
+            for i in range(0, len(encoded), self.IO_BATCH)
+        ])
+
+    def _encode_chunk(self, encoded: list) -> np.ndarray:
+        """Run up to IO_BATCH tokenized texts through the preallocated buffers."""
+        n = len(encoded)
+        with self._io_lock:
+            input_ids, attention_mask = self._input_ids[:n], self._attention_mask[:n]
+            input_ids[:] = [e.ids for e in encoded]
+            attention_mask[:] = [e.attention_mask for e in encoded]
+            hidden = self._hidden[:n]
+
+            io = self._session.io_binding()
+            io.bind_cpu_input("input_ids", input_ids)
+            io.bind_cpu_input("attention_mask", attention_mask)
+            io.bind_cpu_input("token_type_ids", self._token_type_ids[:n])
+            io.bind_output(
+                self._output_name, "cpu", 0, np.float32, list(hidden.shape), hidden.ctypes.data,
+            )
+            self._session.run_with_iobinding(io)
+
+            # Pooling writes a fresh (n, DIM) array, so the buffers can be reused
+            embeddings = self._mean_pooling(hidden, attention_mask.astype(np.float32))
         return self._normalize(embeddings)
 
     def embed(self, text: str) -> np.ndarray:
@@ -206,11 +305,40 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     return float(np.dot(a, b) / (norm_a * norm_b))
 
 
+def cosine_similarity_batch(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Cosine similarity of *query* against every row of an (N, D) *matrix*.
+
+    Both must already be L2-normalized, as every Embedder here returns them,
+    so this is a single matrix-vector product instead of N scalar calls.
+    """
+    return matrix @ query.astype(matrix.dtype, copy=False)
+
+
 def serialize_embedding(embedding: np.ndarray) -> bytes:
-    """Serialize a numpy embedding to bytes for SQLite storage."""
-    return embedding.astype(np.float32).tobytes()
+    """Serialize a numpy embedding to raw float32 bytes for SQLite storage."""
+    return embedding.astype(np.float32, copy=False).tobytes()
 
 
-def deserialize_embedding(data: bytes, dim: int = 384) -> np.ndarray:
-    """Deserialize bytes back to a numpy embedding."""
-    return np.frombuffer(data, dtype=np.float32).copy()
+def deserialize_embedding(data: bytes, dim: int = 384, copy: bool = True) -> np.ndarray:
+    """Deserialize bytes back to a numpy embedding.
+
+    With ``copy=False`` the result is a read-only view of *data*, for callers
+    that only read it.
+    """
+    emb = np.frombuffer(data, dtype=np.float32)
+    return emb.copy() if copy else emb
+
+
+def deserialize_embedding_matrix(blobs: Sequence[bytes], dim: int | None = None) -> np.ndarray:
+    """Deserialize equal-length embedding blobs into one writable (N, D) float32 array.
+
+    The result is allocated once and each blob is copied straight into its
+    row, so the embeddings end up contiguous. ``dim`` defaults to the size of
+    the first blob.
+    """
+    if dim is None:
+        dim = len(blobs[0]) // 4 if blobs else 0
+    out = np.empty((len(blobs), dim), dtype=np.float32)
+    for i, blob in enumerate(blobs):
+        out[i] = np.frombuffer(blob, dtype=np.float32)
+    return out
@@ -17,7 +17,9 @@ from memory.embeddings import get_embedder, serialize_embedding, deserialize_emb
 from memory.scoring import compute_importance_score
 from memory.dedup import check_duplicate, handle_duplicate
 from memory.chunker import split_turn, stamp_metadata, Chunk
-from memory.knowledge_cache import lookup_facts as kc_lookup_facts, store_fact as kc_store_fact
+from memory.knowledge_cache import (
+    lookup_facts as kc_lookup_facts, store_fact as kc_store_fact, store_facts as kc_store_facts,
+)
 from memory.retrieval import retrieve_memories, follow_links, apply_context_budget
 
 logger = logging.getLogger(__name__)
@@ -84,8 +86,48 @@ class MemoryEngine:
             metadata=metadata,
         )
 
-    def lookup_facts(self, query: str, limit: int = 5, min_confidence: float = 0.0) -> list[dict]:
-        """Look up facts from the knowledge cache by semantic similarity."""
+    def store_facts_bulk(
+        self,
+        entries: list[dict],
+        source_agent: str = "brain",
+        # Accept and ignore extra kwargs for caller convenience
+        **kwargs,
+    ) -> list[str]:
+        """Store several facts with one batched embed and a single commit.
+
+        Each entry needs ``fact``; ``confidence`` (default 0.8) and
+        ``metadata`` are optional, as in store_fact().
+        """
+        if not entries:
+            return []
+        texts = [e["fact"] for e in entries]
+        try:
+            embeddings = self.embedder.embed_batch(texts)
+        except Exception as e:
+            logger.warning(f"Embedding failed for facts, storing without: {e}")
+            dim = self.embedder.dim if hasattr(self.embedder, 'dim') else 384
+            embeddings = [np.zeros(dim)] * len(texts)
+        return kc_store_facts(
+            [
+                (e["fact"], emb, e.get("confidence", 0.8), e.get("metadata"))
+                for e, emb in zip(entries, embeddings)
+            ],
+            source_agent=source_agent,
+            db=self.db,
+        )
+
+    def lookup_facts(
+        self,
+        query: str,
+        limit: int = 5,
+        min_confidence: float = 0.0,
+        min_similarity: float | None = None,
+    ) -> list[dict]:
+        """Look up facts from the knowledge cache by semantic similarity.
+
+        ``min_similarity`` drops facts whose cosine similarity to the query
+        is below it, so callers can ask for near-paraphrases only.
+        """
         try:
             query_embedding = self.embedder.embed(query)
         except Exception as e:
@@ -94,6 +136,8 @@ class MemoryEngine:
         results = kc_lookup_facts(query_embedding, self.db, limit=limit)
         if min_confidence > 0:
             results = [r for r in results if r.get("confidence", 0) >= min_confidence]
+        if min_similarity is not None:
+            results = [r for r in results if r["similarity"] >= min_similarity]
         return results
 
     # ─── Ingest ───────────────────────────────────────────────────────
@@ -265,7 +309,7 @@ class MemoryEngine:
         result: list[tuple[str, np.ndarray]] = []
         for row in rows:
             try:
-                emb = deserialize_embedding(row["embedding"])
+                emb = deserialize_embedding(row["embedding"], copy=False)
                 result.append((row["id"], emb))
             except Exception:
                 continue
@@ -8,10 +8,8 @@ Manages the lifecycle of knowledge cache facts:
 
 from __future__ import annotations
 
-import json
 import logging
 import sqlite3
-from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 log = logging.getLogger(__name__)
@@ -28,96 +26,70 @@ def _ensure_columns(conn: sqlite3.Connection) -> None:
     conn.commit()
 
 
+# Graduation rules as SQL over one knowledge_cache row. Mirrors the rules as
+# stated in the module docstring: confidence defaults to 0.8, ages count whole
+# days (unparseable verified_at = 0 days old, unparseable or missing
+# last_accessed_at = 999 days idle), and the first matching rule wins.
+_CONFIDENCE = "COALESCE(NULLIF(confidence, 0), 0.8)"
+_AGE_DAYS = "(julianday('now') - julianday(verified_at))"
+_IDLE_DAYS = "COALESCE(julianday('now') - julianday(last_accessed_at), 999)"
+_NOT_CONTRADICTED = (
+    "COALESCE(CASE WHEN json_valid(metadata) THEN json_extract(metadata, '$.contradicted') END, 0) = 0"
+)
+_ACTION = f"""CASE
+    WHEN COALESCE(access_count, 0) >= 10 AND {_AGE_DAYS} >= 91 AND {_NOT_CONTRADICTED}
+        THEN 'promoted_permanent'
+    WHEN COALESCE(access_count, 0) >= 3 AND {_AGE_DAYS} >= 31 AND {_NOT_CONTRADICTED}
+        AND {_CONFIDENCE} < 0.95
+        THEN 'promoted_established'
+    WHEN {_IDLE_DAYS} >= 181
+        THEN 'decayed'
+END"""
+_NEW_CONFIDENCE = f"""CASE {_ACTION}
+    WHEN 'promoted_permanent' THEN 1.0
+    WHEN 'promoted_established' THEN 0.95
+    WHEN 'decayed' THEN ROUND(MAX(0.0, {_CONFIDENCE} - 0.1), 2)
+    ELSE {_CONFIDENCE}
+END"""
+# Permanent facts are exempt; everything else changes if a rule fires or it
+# sits below 0.5 (flagged for re-verification). The exemption is spelled on the
+# raw column (NULL and 0 count as 0.8) so idx_kc_confidence skips permanent rows.
+_GRADUATION_WHERE = (
+    f"(confidence < 1.0 OR confidence IS NULL) AND ({_ACTION} IS NOT NULL OR {_NEW_CONFIDENCE} < 0.5)"
+)
+
+
 def run_graduation(db_path: str | Path) -> dict:
     """Run graduation rules on all knowledge cache facts.
 
+    The rules run inside SQLite: one aggregate query for the summary, one
+    UPDATE for the changes.
+
     Returns summary: {promoted: N, decayed: N, flagged_for_reverify: N}
     """
     conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
     _ensure_columns(conn)
 
-    now = datetime.now(timezone.utc)
-    promoted = 0
-    decayed = 0
-    flagged_for_reverify = 0
-
-    rows = conn.execute(
-        "SELECT id, fact, confidence, metadata, access_count, last_accessed_at, verified_at "
-        "FROM knowledge_cache"
-    ).fetchall()
-
-    for row in rows:
-        fact_id = row["id"]
-        confidence = row["confidence"] or 0.8
-        access_count = row["access_count"] or 0
-        metadata = json.loads(row["metadata"]) if row["metadata"] else {}
-        verified_at = row["verified_at"]
-        last_accessed_at = row["last_accessed_at"]
-
-        # Calculate age from verified_at or fall back to now
-        if verified_at:
-            try:
-                age = now - datetime.fromisoformat(verified_at)
-            except (ValueError, TypeError):
-                age = timedelta(days=0)
-        else:
-            age = timedelta(days=0)
-
-        # Calculate time since last access
-        if last_accessed_at:
-            try:
-                since_access = now - datetime.fromisoformat(last_accessed_at)
-            except (ValueError, TypeError):
-                since_access = timedelta(days=999)
-        else:
-            since_access = timedelta(days=999)
-
-        has_contradictions = metadata.get("contradicted", False)
-        new_confidence = confidence
-        action = None
-
-        # Skip permanent facts
-        if confidence >= 1.0:
-            continue
-
-        # Promotion: permanent (confidence 1.0)
-        if (access_count >= 10 and age.days > 90 and not has_contradictions):
-            new_confidence = 1.0
-            action = "promoted_permanent"
-            promoted += 1
-        # Promotion: well-established (confidence 0.95)
-        elif (access_count >= 3 and age.days > 30 and not has_contradictions
-              and confidence < 0.95):
-            new_confidence = 0.95
-            action = "promoted_established"
-            promoted += 1
-        # Decay: not accessed in 180 days
-        elif since_access.days > 180 and confidence < 1.0:
-            new_confidence = round(max(0.0, confidence - 0.1), 2)
-            action = "decayed"
-            decayed += 1
-
-        # Flag for re-verification if confidence dropped below 0.5
-        if new_confidence < 0.5:
-            metadata["needs_reverify"] = True
-            flagged_for_reverify += 1
-            action = "flagged_reverify"
-
-        # Update if changed
-        if new_confidence != confidence or action:
-            meta_str = json.dumps(metadata)
-            conn.execute(
-                "UPDATE knowledge_cache SET confidence = ?, metadata = ? WHERE id = ?",
-                (new_confidence, meta_str, fact_id),
-            )
-            log.info(
-                "Graduation: fact %s — %s (confidence %.2f → %.2f, access_count=%d, age=%dd)",
-                fact_id, action, confidence, new_confidence, access_count, age.days,
-            )
-
-    conn.commit()
-    conn.close()
+    try:
+        promoted, decayed, flagged_for_reverify = conn.execute(
+            f"SELECT COALESCE(SUM(action LIKE 'promoted%'), 0), "
+            f"COALESCE(SUM(action = 'decayed'), 0), COALESCE(SUM(new_confidence < 0.5), 0) "
+            f"FROM (SELECT {_ACTION} AS action, {_NEW_CONFIDENCE} AS new_confidence "
+            f"FROM knowledge_cache WHERE {_GRADUATION_WHERE})"
+        ).fetchone()
+        conn.execute(
+            f"UPDATE knowledge_cache SET "
+            f"metadata = CASE WHEN {_NEW_CONFIDENCE} < 0.5 THEN json_set("
+            f"CASE WHEN json_valid(metadata) THEN metadata ELSE '{{}}' END, "
+            f"'$.needs_reverify', json('true')) ELSE metadata END, "
+            f"confidence = {_NEW_CONFIDENCE} "
+            f"WHERE {_GRADUATION_WHERE}"
+        )
+        conn.commit()
+    finally:
+        conn.close()
 
     summary = {
         "promoted": promoted,
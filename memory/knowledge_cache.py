@@ -2,13 +2,14 @@
 
 from __future__ import annotations
 
+import json
 import sqlite3
 import uuid
 from datetime import datetime, timezone
 
 import numpy as np
 
-from memory.embeddings import cosine_similarity, deserialize_embedding, serialize_embedding
+from memory.embeddings import cosine_similarity_batch, deserialize_embedding_matrix, serialize_embedding
 
 
 def store_fact(
@@ -26,12 +27,33 @@ def store_fact(
         "INSERT INTO knowledge_cache (id, fact, embedding, source, verified_by, verified_at, confidence, metadata) "
         "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
         (fact_id, fact, serialize_embedding(embedding), source_agent, source_agent, now, confidence,
-         str(metadata or {})),
+         json.dumps(metadata or {})),
     )
     db.commit()
     return fact_id
 
 
+def store_facts(
+    facts: list[tuple[str, np.ndarray, float, dict | None]],
+    source_agent: str,
+    db: sqlite3.Connection,
+) -> list[str]:
+    """Store ``(fact, embedding, confidence, metadata)`` rows in one transaction. Returns fact ids."""
+    now = datetime.now(timezone.utc).isoformat()
+    fact_ids = [f"fact_{uuid.uuid4().hex[:12]}" for _ in facts]
+    db.executemany(
+        "INSERT INTO knowledge_cache (id, fact, embedding, source, verified_by, verified_at, confidence, metadata) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (fact_id, fact, serialize_embedding(embedding), source_agent, source_agent, now, confidence,
+             json.dumps(metadata or {}))
+            for fact_id, (fact, embedding, confidence, metadata) in zip(fact_ids, facts)
+        ],
+    )
+    db.commit()
+    return fact_ids
+
+
 def lookup_facts(
     query_embedding: np.ndarray,
     db: sqlite3.Connection,
@@ -48,19 +70,24 @@ def lookup_facts(
         "ORDER BY verified_at DESC LIMIT 500"
     ).fetchall()
 
-    scored: list[tuple[float, dict]] = []
-    for row in rows:
-        emb = deserialize_embedding(row["embedding"])
-        sim = cosine_similarity(query_embedding, emb)
-        scored.append((sim, {
-            "id": row["id"],
-            "fact": row["fact"],
-            "confidence": row["confidence"],
-            "similarity": sim,
-        }))
+    # Blobs from a different embedding dimension can't be compared; skip them
+    rows = [row for row in rows if len(row["embedding"]) == query_embedding.shape[0] * 4]
+    if not rows:
+        return []
+    sims = cosine_similarity_batch(
+        query_embedding, deserialize_embedding_matrix([row["embedding"] for row in rows]),
+    )
 
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [item for _, item in scored[:limit]]
+    top = np.argsort(-sims, kind="stable")[:limit]
+    return [
+        {
+            "id": rows[i]["id"],
+            "fact": rows[i]["fact"],
+            "confidence": rows[i]["confidence"],
+            "similarity": float(sims[i]),
+        }
+        for i in top
+    ]
 
 
 def update_confidence(fact_id: str, new_confidence: float, db: sqlite3.Connection) -> None:
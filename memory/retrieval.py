@@ -10,7 +10,7 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
-from memory.embeddings import cosine_similarity, deserialize_embedding
+from memory.embeddings import cosine_similarity_batch, deserialize_embedding_matrix
 from memory.scoring import compute_recency_score, compute_composite_score
 
 
@@ -33,16 +33,23 @@ def retrieve_memories(
 
     rows = db.execute(query, params).fetchall()
 
-    scored: list[tuple[float, dict]] = []
+    embedding_bytes = query_embedding.shape[0] * 4
+    comparable = []
     for row in rows:
         if row["embedding"] is None:
             continue
-        try:
-            emb = deserialize_embedding(row["embedding"])
-            semantic_sim = cosine_similarity(query_embedding, emb)
-        except Exception as e:
-            logger.warning(f"Failed to deserialize/compare embedding for {row['id']}: {e}")
+        if len(row["embedding"]) != embedding_bytes:
+            logger.warning(f"Embedding size mismatch for {row['id']}: {len(row['embedding'])} bytes")
             continue
+        comparable.append(row)
+    if not comparable:
+        return []
+    sims = cosine_similarity_batch(
+        query_embedding, deserialize_embedding_matrix([row["embedding"] for row in comparable]),
+    )
+
+    scored: list[tuple[float, dict]] = []
+    for row, semantic_sim in zip(comparable, sims.tolist()):
         recency = compute_recency_score(row["created_at"])
         importance = row["importance"]
         score = compute_composite_score(semantic_sim, recency, importance, strategy)
@@ -15,7 +15,7 @@ CREATE TABLE IF NOT EXISTS memories (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     access_count INTEGER DEFAULT 0,
     source_agent TEXT,
-    metadata JSON
+    metadata JSON CHECK (metadata IS NULL OR json_valid(metadata))
 );
 
 CREATE TABLE IF NOT EXISTS knowledge_cache (
@@ -26,7 +26,7 @@ CREATE TABLE IF NOT EXISTS knowledge_cache (
     verified_by TEXT,
     verified_at TIMESTAMP,
     confidence REAL DEFAULT 1.0,
-    metadata JSON,
+    metadata JSON CHECK (metadata IS NULL OR json_valid(metadata)),
     last_accessed_at TIMESTAMP,
     access_count INTEGER DEFAULT 0
 );
@@ -44,6 +44,9 @@ CREATE INDEX IF NOT EXISTS idx_memories_tier ON memories(tier);
 CREATE INDEX IF NOT EXISTS idx_memories_importance ON memories(importance);
 CREATE INDEX IF NOT EXISTS idx_memories_created ON memories(created_at);
 CREATE INDEX IF NOT EXISTS idx_memories_tags ON memories(tags);
+-- Consolidation: old embedded short-term memories, and the low-importance prune
+CREATE INDEX IF NOT EXISTS idx_mem_tier_created ON memories(tier, created_at) WHERE embedding IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_mem_tier_importance ON memories(tier, importance) WHERE tier = 'short_term';
 CREATE INDEX IF NOT EXISTS idx_links_a ON memory_links(memory_id_a);
 CREATE INDEX IF NOT EXISTS idx_links_b ON memory_links(memory_id_b);
 CREATE INDEX IF NOT EXISTS idx_kc_verified_at ON knowledge_cache(verified_at);
@@ -36,7 +36,7 @@ def main():
         # Score and rank
         results = []
         for row in rows:
-            emb = deserialize_embedding(row["embedding"])
+            emb = deserialize_embedding(row["embedding"], copy=False)
             sim = cosine_similarity(query_emb, emb)
             if sim >= args.threshold:
                 importance_display = round((row["importance"] or 0.5) * 10)
@@ -77,7 +77,7 @@ def main():
 
         for row in rows:
             if row["embedding"]:
-                existing_emb = deserialize_embedding(row["embedding"])
+                existing_emb = deserialize_embedding(row["embedding"], copy=False)
                 sim = cosine_similarity(embedding, existing_emb)
                 if sim > 0.9:
                     print(f"Skipped (duplicate, {sim:.2f} similar to existing): {row['content'][:80]}")
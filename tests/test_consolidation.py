@@ -1,19 +1,23 @@
 #!/usr/bin/env python3
 """Tests for memory consolidation engine and runner."""
 
+import asyncio
+import json
 import os
 import sys
 import tempfile
 import sqlite3
 import uuid
 from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
 
 import numpy as np
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from memory.schemas import init_db
-from memory.consolidation import run_consolidation
+from memory import consolidation
+from memory.consolidation import cluster_memories, run_consolidation, run_consolidation_async, summarize_cluster
 from memory.consolidation_runner import main as runner_main
 from memory.embeddings import serialize_embedding
 
@@ -98,11 +102,13 @@ try:
     remaining = conn.execute("SELECT COUNT(*) FROM memories WHERE tier='short_term'").fetchone()[0]
     long_term = conn.execute("SELECT COUNT(*) FROM memories WHERE tier='long_term'").fetchone()[0]
     links = conn.execute("SELECT COUNT(*) FROM memory_links WHERE relation_type='consolidated_into'").fetchone()[0]
+    meta = conn.execute("SELECT metadata FROM memories WHERE tier='long_term'").fetchone()[0]
     conn.close()
 
     report("Originals deleted", remaining == 0)
     report("1 long-term memory created", long_term == 1)
     report("3 consolidation links created", links == 3)
+    report("Metadata is JSON", sorted(json.loads(meta)["consolidated_from"]) == sorted([id1, id2, id3]))
 finally:
     os.unlink(db_path)
 
@@ -151,6 +157,63 @@ try:
 finally:
     os.unlink(db_path)
 
+# ═══════════════════════════════════════════════════════════════
+# TEST 5: Greedy clustering
+# ═══════════════════════════════════════════════════════════════
+print("\n" + "=" * 60)
+print("TEST 5: Greedy clustering")
+print("=" * 60)
+
+a, b = np.eye(384, dtype=np.float32)[:2]
+mems = [
+    {"id": i, "embedding": None if emb is None else serialize_embedding(emb)}
+    for i, emb in enumerate([a, b, a * 3, None, 0.9 * a + 0.1 * b, b])
+]
+clusters = cluster_memories(mems)
+report("Similar memories grouped in order", [[m["id"] for m in c] for c in clusters] == [[0, 2, 4], [1, 5]])
+report("Single embedding is its own cluster", len(cluster_memories(mems[:1])) == 1)
+report("No embeddings, no clusters", cluster_memories([mems[3]]) == [])
+
+if consolidation.hnswlib is not None:
+    with patch.object(consolidation, "ANN_CLUSTER_MIN", 2):
+        ann_clusters = cluster_memories(mems)
+    report("HNSW path matches exact clustering",
+           [[m["id"] for m in c] for c in ann_clusters] == [[0, 2, 4], [1, 5]])
+
+# ═══════════════════════════════════════════════════════════════
+# TEST 6: Extractive summary drops near-duplicate sentences
+# ═══════════════════════════════════════════════════════════════
+print("\n" + "=" * 60)
+print("TEST 6: Summary near-duplicate removal")
+print("=" * 60)
+
+merged = summarize_cluster([
+    {"content": "The API uses OAuth tokens. Cache is Redis"},
+    {"content": "the api uses OAuth tokens. The API uses OAuth token. Deploys are weekly"},
+])
+report("Near-duplicates dropped", merged == "The API uses OAuth tokens. Cache is Redis. Deploys are weekly.", merged)
+merged = summarize_cluster([{"content": "Is it cached? Yes!\nTTL is one day"}, {"content": "is it cached? Keys expire"}])
+report("Splits on ?, ! and newlines", merged == "Is it cached? Yes! TTL is one day. Keys expire.", merged)
+long_cluster = [{"content": ". ".join(f"Distinct fact number {i} about topic {i * 7}" for i in range(30))}] * 2
+report("Summary capped at 20 sentences", summarize_cluster(long_cluster).count(". ") == 19)
+
+# ═══════════════════════════════════════════════════════════════
+# TEST 7: Async wrapper
+# ═══════════════════════════════════════════════════════════════
+print("\n" + "=" * 60)
+print("TEST 7: Async consolidation")
+print("=" * 60)
+
+db_path = make_db()
+try:
+    shared_emb = np.ones(384, dtype=np.float32) / np.sqrt(384)
+    insert_old_memory(db_path, "Async one", embedding=shared_emb)
+    insert_old_memory(db_path, "Async two", embedding=shared_emb)
+    summary = asyncio.run(run_consolidation_async(db_path, tier="full"))
+    report("Async variant consolidates", summary["consolidated"] == 2 and summary["clusters"] == 1)
+finally:
+    os.unlink(db_path)
+
 # ═══════════════════════════════════════════════════════════════
 # SUMMARY
 # ═══════════════════════════════════════════════════════════════
@@ -0,0 +1,147 @@
+"""Tests for embedding post-processing and (de)serialization."""
+
+import ctypes
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from memory import embeddings
+from memory.embeddings import (
+    ONNXEmbedder, cosine_similarity, cosine_similarity_batch, deserialize_embedding,
+    deserialize_embedding_matrix, serialize_embedding,
+)
+
+
+class TestPooling(unittest.TestCase):
+    def setUp(self):
+        # Pooling and normalization need no model; skip loading one
+        self.embedder = ONNXEmbedder.__new__(ONNXEmbedder)
+        rng = np.random.default_rng(0)
+        self.tokens = rng.standard_normal((4, 16, 8)).astype(np.float32)
+        self.mask = (rng.random((4, 16)) > 0.4).astype(np.int64)
+        self.mask[:, 0] = 1
+        self.mask[3] = 0  # all-padding row must not divide by zero
+
+    def test_matches_reference(self):
+        expanded = self.mask[..., None].astype(np.float32)
+        expected = (self.tokens * expanded).sum(axis=1) / np.clip(expanded.sum(axis=1), 1e-9, None)
+        expected /= np.clip(np.linalg.norm(expected, axis=1, keepdims=True), 1e-9, None)
+
+        pooled = self.embedder._mean_pooling(self.tokens, self.mask.astype(np.float32))
+        out = self.embedder._normalize(pooled)
+        np.testing.assert_allclose(out, expected, atol=1e-6)
+        self.assertEqual(out.dtype, np.float32)
+        self.assertFalse(np.isnan(out).any())
+
+    def test_normalize_in_place(self):
+        e = np.array([[3.0, 4.0], [0.0, 0.0]], dtype=np.float32)
+        out = self.embedder._normalize(e)
+        self.assertIs(out, e)
+        np.testing.assert_allclose(out, [[0.6, 0.8], [0.0, 0.0]])
+
+
+class _FakeBinding:
+    def __init__(self):
+        self.inputs, self.output = {}, None
+
+    def bind_cpu_input(self, name, array):
+        self.inputs[name] = array
+
+    def bind_output(self, name, device, device_id, dtype, shape, ptr):
+        self.output = (shape, ptr)
+
+
+class _FakeSession:
+    """Writes hidden states (token id, 1, 1, ...) through the bound output pointer."""
+
+    def __init__(self):
+        self.runs = []
+
+    def get_outputs(self):
+        return [SimpleNamespace(name="last_hidden_state")]
+
+    def io_binding(self):
+        return _FakeBinding()
+
+    def run_with_iobinding(self, io):
+        shape, ptr = io.output
+        self.runs.append({k: v.copy() for k, v in io.inputs.items()})
+        out = np.ctypeslib.as_array(ctypes.cast(ptr, ctypes.POINTER(ctypes.c_float)), shape=shape)
+        out[:] = 1.0
+        out[..., 0] = io.inputs["input_ids"]
+
+
+class _FakeTokenizer:
+    def encode_batch(self, texts):
+        # ids = [len, 1, 0, ...]; only the first two positions are unmasked
+        return [
+            SimpleNamespace(ids=[len(t), 1] + [0] * (ONNXEmbedder.SEQ_LEN - 2),
+                            attention_mask=[1, 1] + [0] * (ONNXEmbedder.SEQ_LEN - 2))
+            for t in texts
+        ]
+
+
+def _expected(text):
+    v = np.ones(ONNXEmbedder.DIM, dtype=np.float32)
+    v[0] = (len(text) + 1) / 2
+    return v / np.linalg.norm(v)
+
+
+class TestIOBinding(unittest.TestCase):
+    def setUp(self):
+        self.session = _FakeSession()
+        embeddings._model_cache["fake"] = (self.session, _FakeTokenizer())
+        self.addCleanup(embeddings._model_cache.pop, "fake")
+        self.embedder = ONNXEmbedder("fake")
+
+    def test_outputs_written_into_preallocated_buffer(self):
+        vecs = self.embedder.embed_batch(["a", "bbb"])
+        self.assertEqual(len(self.session.runs), 1)
+        self.assertEqual(self.session.runs[0]["input_ids"].shape, (2, ONNXEmbedder.SEQ_LEN))
+        self.assertFalse(self.session.runs[0]["token_type_ids"].any())
+        np.testing.assert_allclose(vecs[0], _expected("a"), rtol=1e-6)
+        np.testing.assert_allclose(vecs[1], _expected("bbb"), rtol=1e-6)
+
+    def test_large_batches_chunked_and_results_survive_buffer_reuse(self):
+        texts = ["x" * i for i in range(ONNXEmbedder.IO_BATCH + 5)]
+        first = self.embedder.embed("first")
+        vecs = self.embedder.embed_batch(texts)
+        self.assertEqual([len(r["input_ids"]) for r in self.session.runs], [1, ONNXEmbedder.IO_BATCH, 5])
+        np.testing.assert_allclose(first, _expected("first"), rtol=1e-6)
+        for text, v in zip(texts, vecs, strict=True):
+            np.testing.assert_allclose(v, _expected(text), rtol=1e-6)
+
+
+class TestCosineBatch(unittest.TestCase):
+    def test_matches_scalar_for_normalized_rows(self):
+        rng = np.random.default_rng(1)
+        matrix = rng.standard_normal((50, 384)).astype(np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        query = matrix[7] * 0.5 + matrix[3] * 0.5
+        query /= np.linalg.norm(query)
+        sims = cosine_similarity_batch(query, matrix)
+        self.assertEqual(sims.shape, (50,))
+        np.testing.assert_allclose(sims, [cosine_similarity(query, row) for row in matrix], atol=1e-6)
+
+
+class TestSerialization(unittest.TestCase):
+    def test_matrix_is_contiguous_writable_copy(self):
+        rows = np.arange(12, dtype=np.float32).reshape(3, 4)
+        matrix = deserialize_embedding_matrix([serialize_embedding(r) for r in rows])
+        np.testing.assert_array_equal(matrix, rows)
+        self.assertTrue(matrix.flags.c_contiguous and matrix.flags.writeable)
+        self.assertEqual(deserialize_embedding_matrix([]).shape, (0, 0))
+        with self.assertRaises(ValueError):
+            deserialize_embedding_matrix([serialize_embedding(rows[0]), serialize_embedding(rows[1, :2])])
+
+    def test_scalar_copy_flag(self):
+        blob = serialize_embedding(np.ones(4, dtype=np.float32))
+        self.assertTrue(deserialize_embedding(blob).flags.writeable)
+        view = deserialize_embedding(blob, copy=False)
+        self.assertFalse(view.flags.writeable)
+        np.testing.assert_array_equal(view, np.ones(4))
+
+
+if __name__ == "__main__":
+    unittest.main()
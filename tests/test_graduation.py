@@ -90,6 +90,24 @@ class TestGraduation:
         meta = json.loads(_get_fact(db_path, "f1")["metadata"])
         assert meta["needs_reverify"] is True
 
+    def test_flag_keeps_existing_metadata(self, db_path):
+        """Flagging adds needs_reverify without dropping other metadata keys."""
+        _insert_fact(db_path, "f1", confidence=0.3, access_count=0, age_days=5,
+                     last_accessed_days_ago=1)
+        summary = run_graduation(db_path)
+        assert summary == {"promoted": 0, "decayed": 0, "flagged_for_reverify": 1}
+        assert json.loads(_get_fact(db_path, "f1")["metadata"]) == {
+            "contradicted": False, "needs_reverify": True,
+        }
+
+    def test_untouched_facts_not_rewritten(self, db_path):
+        """Facts no rule applies to keep their stored values."""
+        _insert_fact(db_path, "f1", confidence=0.8, access_count=1, age_days=5,
+                     last_accessed_days_ago=1)
+        before = _get_fact(db_path, "f1")
+        assert run_graduation(db_path) == {"promoted": 0, "decayed": 0, "flagged_for_reverify": 0}
+        assert _get_fact(db_path, "f1") == before
+
     def test_permanent_facts_exempt(self, db_path):
         """Permanent facts (1.0) are not touched."""
         _insert_fact(db_path, "f1", confidence=1.0, access_count=0,
@@ -133,3 +151,14 @@ class TestKnowledgeRefresh:
         summary = run_refresh(db_path)
         assert summary["skipped"] == 1
         assert summary["flagged"] == 0
+
+    def test_already_flagged_skipped_and_metadata_kept(self, db_path):
+        """A flagged fact is not re-flagged; flagging keeps existing keys."""
+        _insert_fact(db_path, "f1", confidence=0.8, age_days=120, last_accessed_days_ago=5)
+        assert run_refresh(db_path)["flagged"] == 1
+        assert json.loads(_get_fact(db_path, "f1")["metadata"]) == {
+            "contradicted": False, "needs_reverify": True,
+        }
+        summary = run_refresh(db_path)
+        assert summary["flagged"] == 0
+        assert summary["skipped"] == 1
@@ -239,6 +239,17 @@ with tempfile.TemporaryDirectory() as tmpdir:
     )
     report("Store fact returns ID", fact_id is not None and fact_id.startswith("fact_"))
 
+    bulk_ids = engine.store_facts_bulk(
+        [{"fact": "CPython is written in C", "confidence": 0.9}, {"fact": "PyPy has a JIT"}],
+        source_agent="researcher",
+    )
+    report("Bulk store returns one ID per fact", len(bulk_ids) == 2 and all(i.startswith("fact_") for i in bulk_ids))
+    bulk_rows = engine.db.execute(
+        "SELECT confidence, verified_by FROM knowledge_cache WHERE id IN (?, ?) ORDER BY confidence",
+        bulk_ids,
+    ).fetchall()
+    report("Bulk store keeps confidence and source", [tuple(r) for r in bulk_rows] == [(0.8, "researcher"), (0.9, "researcher")])
+
     query_emb = engine.embedder.embed("Who created Python?")
     facts = lookup_facts(query_emb, engine.db, limit=3)
     report("Lookup returns facts", len(facts) > 0, f"{len(facts)} facts")
@@ -327,6 +338,43 @@ with tempfile.TemporaryDirectory() as tmpdir:
     pending = bus.receive(AgentRole.BUILDER, limit=5)
     report("No more pending messages", len(pending) == 0)
 
+    # Batched intercept polling resolves each row to its task's latest state
+    bus.send(AgentMessage(from_agent=AgentRole.GUARDIAN, to_agent=AgentRole.BRAIN, action="scan"))
+    since = bus.get_tasks_since(0, limit=20)
+    report("get_tasks_since skips guardian rows", len(since) == 1, f"got {len(since)}")
+    report("get_tasks_since returns latest state",
+           bool(since) and since[0][1].status == TaskStatus.COMPLETED.value)
+
+    # An undecodable row is skipped without stalling the scan cursor
+    cursor = since[-1][0] if since else 0
+    bus._db.execute(
+        "INSERT INTO message_queue (task_id, from_agent, to_agent, action, status, created_at) "
+        "VALUES ('bad-row', 'ghost', 'brain', 'noop', 'pending', '')"
+    )
+    bus.send(AgentMessage(from_agent=AgentRole.BRAIN, to_agent=AgentRole.BUILDER, action="after"))
+    since = bus.get_tasks_since(cursor, limit=20)
+    report("get_tasks_since returns undecodable rows as None",
+           [m is None for _, m in since] == [True, False],
+           f"got {[m is None for _, m in since]}")
+    report("get_tasks_since still advances past undecodable rows",
+           bool(since) and since[-1][1] is not None and since[-1][1].action == "after")
+
+    # Change notification: idle wait times out, a local write wakes it
+    import asyncio
+
+    async def _wait_then_send():
+        token = bus.change_token()
+        idle = await bus.wait_for_change(token, timeout=0.05)
+        waiter = asyncio.ensure_future(bus.wait_for_change(token, timeout=5.0))
+        await asyncio.sleep(0)
+        bus.send(AgentMessage(from_agent=AgentRole.BRAIN, to_agent=AgentRole.BUILDER, action="ping"))
+        woke = await asyncio.wait_for(waiter, timeout=1.0)
+        return idle == token, woke != token
+
+    idle_same, woke_changed = asyncio.run(_wait_then_send())
+    report("wait_for_change times out when idle", idle_same)
+    report("wait_for_change wakes on write", woke_changed)
+
     bus.close()
 
 # ═══════════════════════════════════════════════════════════════════════════════
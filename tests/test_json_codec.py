@@ -0,0 +1,50 @@
+"""Tests for the orjson/stdlib JSON codec shim."""
+
+import json
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from agents.common import json_codec
+
+
+class TestJsonCodec(unittest.TestCase):
+    def test_roundtrip(self):
+        obj = {"a": 1, "b": [1, 2, {"c": "é"}], "d": None}
+        self.assertEqual(json_codec.loads(json_codec.dumps(obj)), obj)
+        self.assertEqual(json_codec.loads(json_codec.dumps_bytes(obj)), obj)
+
+    def test_unknown_types_stringified(self):
+        ts = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        out = json_codec.loads(json_codec.dumps({"obj": object.__new__(object), "n": 1}))
+        self.assertIn("object", out["obj"])
+        self.assertIn("2026-01-01", json_codec.dumps({"ts": ts}))
+
+    def test_decode_error_is_stdlib_type(self):
+        with self.assertRaises(json.JSONDecodeError):
+            json_codec.loads("not json")
+
+    def test_stdlib_fallback(self):
+        with patch.object(json_codec, "orjson", None):
+            self.assertEqual(json_codec.loads(json_codec.dumps({"x": [1]})), {"x": [1]})
+            self.assertTrue(json_codec.dumps({"x": 1}, indent=True).startswith("{\n"))
+
+    def test_sort_keys_is_canonical(self):
+        a = json_codec.dumps_bytes({"b": 1, "a": {"d": 2, "c": 3}}, sort_keys=True)
+        b = json_codec.dumps_bytes({"a": {"c": 3, "d": 2}, "b": 1}, sort_keys=True)
+        self.assertEqual(a, b)
+        with patch.object(json_codec, "orjson", None):
+            self.assertEqual(json_codec.dumps_bytes({"b": 1, "a": 2}, sort_keys=True), b'{"a": 2, "b": 1}')
+
+    def test_sort_keys_tolerates_mixed_key_types(self):
+        for backend in (json_codec.orjson, None):
+            with patch.object(json_codec, "orjson", backend):
+                out = json_codec.loads(json_codec.dumps_bytes({1: "a", "b": 2}, indent=True, sort_keys=True))
+                self.assertEqual(out, {"1": "a", "b": 2})
+
+    def test_big_int_falls_back(self):
+        self.assertEqual(json_codec.loads(json_codec.dumps({"n": 2 ** 70})), {"n": 2 ** 70})
+
+
+if __name__ == "__main__":
+    unittest.main()
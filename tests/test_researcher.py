@@ -0,0 +1,546 @@
+"""Tests for the Researcher investigation pipeline."""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+import zlib
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from agents.common.llm_client import LLMClient
+from agents.common.sub_agent import SubAgentPool, SubTask
+from agents.researcher import researcher as researcher_mod
+from agents.researcher.researcher import ResearcherAgent, ThreadResult
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _make_researcher(generate):
+    """Create a ResearcherAgent whose sub-agent LLM calls go to *generate*."""
+    r = ResearcherAgent.__new__(ResearcherAgent)
+    r.llm = MagicMock()
+    r.memory = None
+    r.instant_model = "instant"
+    r.thinking_model = "thinking"
+    llm = MagicMock()
+    llm.generate = generate
+    r.sub_pool = SubAgentPool(llm=llm, system_prompt="sub-agent")
+    return r
+
+
+def _threads(n):
+    return [
+        {"id": f"t{i}", "focus": f"focus {i}", "search_queries": [f"q{i}"],
+         "expected_source_types": ["official_docs"], "is_risk_thread": i == n - 1}
+        for i in range(n)
+    ]
+
+
+def _findings(tid):
+    return [{"finding": f"finding for {tid}", "confidence": 0.9, "source_type": "official_docs"}]
+
+
+class TestInvestigateBatched(unittest.TestCase):
+    def test_threads_share_batched_calls(self):
+        prompts = []
+
+        async def generate(**kwargs):
+            prompts.append(kwargs["prompt"])
+            ids = [line.split('"')[3] for line in kwargs["prompt"].splitlines()
+                   if line.strip().startswith('"thread_id": "t')]
+            return {
+                "content": json.dumps({"results": [
+                    {"thread_id": tid, "findings": _findings(tid)} for tid in ids
+                ]}),
+                "usage": {"total_tokens": 300},
+            }
+
+        r = _make_researcher(generate)
+        results = _run(r._investigate_parallel("what is X?", _threads(5)))
+
+        self.assertEqual(len(prompts), 2)
+        self.assertEqual([t.thread_id for t in results], ["t0", "t1", "t2", "t3", "t4"])
+        self.assertTrue(all(t.success for t in results))
+        self.assertEqual(results[4].findings, _findings("t4"))
+        self.assertTrue(results[4].is_risk_thread)
+        self.assertEqual(results[0].tokens_used, 100)
+
+    def test_missing_thread_rerun_individually(self):
+        prompts = []
+
+        async def generate(**kwargs):
+            prompts.append(kwargs["prompt"])
+            if "several threads" in kwargs["prompt"]:
+                return {"content": json.dumps({"results": [
+                    {"thread_id": "t0", "findings": _findings("t0")},
+                ]})}
+            return {"content": json.dumps({"findings": _findings("solo")})}
+
+        r = _make_researcher(generate)
+        results = _run(r._investigate_parallel("what is X?", _threads(3)))
+
+        self.assertEqual(len(prompts), 3)
+        self.assertEqual(results[0].findings, _findings("t0"))
+        self.assertEqual(results[1].findings, _findings("solo"))
+        self.assertEqual(results[2].findings, _findings("solo"))
+
+    def test_facts_prefiltered_per_thread(self):
+        facts = (
+            [{"fact": f"f{i}", "confidence": 0.75 + i / 100} for i in range(8)]
+            + [{"fact": "low", "confidence": 0.5}, {"fact": "", "confidence": 0.99},
+               {"fact": "odd", "confidence": "high"}, "not a dict"]
+        )
+
+        async def generate(**kwargs):
+            return {"content": json.dumps({"results": [
+                {"thread_id": f"t{i}", "facts_worth_caching": facts} for i in range(3)
+            ]})}
+
+        r = _make_researcher(generate)
+        results = _run(r._investigate_parallel("what is X?", _threads(3)))
+
+        self.assertEqual(
+            [f["fact"] for f in results[0].facts_worth_caching],
+            ["f7", "f6", "f5", "f4", "f3"],
+        )
+
+    def test_failed_thread_reported(self):
+        async def generate(**kwargs):
+            return {"error": True, "message": "rate limited"}
+
+        r = _make_researcher(generate)
+        results = _run(r._investigate_parallel("what is X?", _threads(3)))
+
+        self.assertFalse(any(t.success for t in results))
+        self.assertIn("rate limited", results[0].knowledge_gaps[0])
+
+
+class TestParseSubOutput(unittest.TestCase):
+    def test_salvages_wrapped_json(self):
+        parse = ResearcherAgent._parse_sub_output
+        self.assertEqual(parse('{"findings": [1]}'), {"findings": [1]})
+        self.assertEqual(parse('Sure! ```json\n{"findings": [{"a": {"b": 1}}]}\n``` Done.'),
+                         {"findings": [{"a": {"b": 1}}]})
+        self.assertIn("error", parse("no json here"))
+        self.assertIn("error", parse("{broken"))
+        self.assertIn("error", parse("[1, 2]"))
+
+
+class TestSharedPrefix(unittest.TestCase):
+    def test_investigation_prompts_carry_prefix_hint(self):
+        calls = []
+
+        async def generate(**kwargs):
+            calls.append(kwargs)
+            return {"content": "{}"}
+
+        r = _make_researcher(generate)
+        _run(r._investigate_parallel("what is X?", _threads(5)))
+
+        prefixes = {c["cache_prefix"] for c in calls}
+        self.assertEqual(len(prefixes), 2)  # batched calls, then the individual re-runs
+        for c in calls:
+            self.assertTrue(c["prompt"].startswith(c["cache_prefix"]))
+            self.assertIn("what is X?", c["cache_prefix"])
+
+    def test_split_render_matches_full_template(self):
+        from agents.researcher import researcher as mod
+
+        fields = {
+            "focus": "f {x}", "search_queries": '["q"]',
+            "expected_source_types": '["official_docs"]', "thread_id": "t0",
+        }
+        query = "what is {X}?" * 40
+        split = (
+            mod.INVESTIGATE_PROMPT_PREFIX.format(original_query=query[:300])
+            + mod.INVESTIGATE_PROMPT_SUFFIX.format(**fields)
+        )
+        self.assertEqual(split, mod.INVESTIGATE_PROMPT.format(original_query=query[:300], **fields))
+        self.assertTrue(mod.INVESTIGATE_PROMPT_SUFFIX.startswith("Your investigation focus:"))
+
+    def test_pool_groups_by_prefix_and_keeps_order(self):
+        started = []
+
+        async def generate(**kwargs):
+            started.append(kwargs["prompt"])
+            return {"content": kwargs["prompt"]}
+
+        llm = MagicMock()
+        llm.generate = generate
+        pool = SubAgentPool(llm=llm, max_concurrency=1)
+        tasks = [
+            SubTask(id=str(i), description=f"{p}-{i}", shared_prefix=p)
+            for i, p in enumerate("abab")
+        ]
+        results = _run(pool.execute_parallel(tasks))
+
+        self.assertEqual(started, ["a-0", "a-2", "b-1", "b-3"])
+        self.assertEqual([res.output for res in results], ["a-0", "b-1", "a-2", "b-3"])
+
+    def test_pool_cap_spans_overlapping_calls(self):
+        inflight = peak = 0
+
+        async def generate(**kwargs):
+            nonlocal inflight, peak
+            inflight += 1
+            peak = max(peak, inflight)
+            await asyncio.sleep(0.01)
+            inflight -= 1
+            return {"content": "ok"}
+
+        llm = MagicMock()
+        llm.generate = generate
+        pool = SubAgentPool(llm=llm, max_concurrency=2)
+
+        async def overlap():
+            return await asyncio.gather(*(
+                pool.execute_parallel([SubTask(description=str(i)) for i in range(3)])
+                for _ in range(2)
+            ))
+
+        batches = _run(overlap())
+        self.assertTrue(all(res.success for batch in batches for res in batch))
+        self.assertEqual(peak, 2)
+
+    def test_json_schema_enables_provider_json_mode(self):
+        client = LLMClient()
+        client._call_with_resilience = AsyncMock(side_effect=lambda *a, **kw: {"content": "{}"})
+        client._track_usage = MagicMock()
+        schema = {"type": "object"}
+
+        _run(client.generate_json(prompt="p", model="kimi-k2.5-instant", json_schema=schema))
+        self.assertIs(client._call_with_resilience.call_args.kwargs["json_schema"], schema)
+        _run(client.generate_json(prompt="p", model="claude-sonnet-4-5", json_schema=schema))
+        self.assertNotIn("json_schema", client._call_with_resilience.call_args.kwargs)
+
+    def test_anthropic_cache_breakpoint(self):
+        client = LLMClient(default_model="claude-sonnet-4-5")
+        client._call_with_resilience = AsyncMock(return_value={"content": "ok"})
+        client._track_usage = MagicMock()
+
+        _run(client.generate(prompt="shared head|tail", cache_prefix="shared head|"))
+        messages = client._call_with_resilience.call_args.args[4]
+        blocks = messages[0]["content"]
+        self.assertEqual(blocks[0], {
+            "type": "text", "text": "shared head|", "cache_control": {"type": "ephemeral"},
+        })
+        self.assertEqual(blocks[1], {"type": "text", "text": "tail"})
+
+        _run(client.generate(prompt="shared head|tail", cache_prefix="shared head|", model="deepseek-chat"))
+        self.assertEqual(client._call_with_resilience.call_args.args[5][0]["content"], "shared head|tail")
+
+
+class TestDedupThreads(unittest.TestCase):
+    def test_near_duplicate_focus_dropped(self):
+        r = _make_researcher(None)
+        threads = [
+            {"id": "a", "focus": "Performance benchmarks of PostgreSQL 16", "search_queries": ["postgres 16 benchmarks"]},
+            {"id": "b", "focus": "performance benchmarks of PostgreSQL-16!", "search_queries": ["Postgres 16 benchmarks"]},
+            {"id": "c", "focus": "Licensing and hosting costs", "search_queries": ["postgres hosting cost"]},
+            {"id": "d", "focus": "Performance benchmarks of PostgreSQL 16", "search_queries": ["postgres 16 benchmarks"],
+             "is_risk_thread": True},
+        ]
+        self.assertEqual([t["id"] for t in r._dedup_threads(threads)], ["a", "c", "d"])
+
+    def test_decompose_pads_after_dedup(self):
+        r = _make_researcher(None)
+        dup = {"id": "a", "focus": "Rust async runtimes", "search_queries": ["tokio"]}
+        r.llm.generate_json = AsyncMock(return_value={"content": {"threads": [dup, dict(dup, id="b"), dict(dup, id="c")]}})
+        threads = _run(r._decompose("rust async", {}))
+        self.assertEqual(len(threads), 3)
+        self.assertEqual(threads[0]["id"], "a")
+        self.assertNotIn("b", [t["id"] for t in threads])
+
+
+class TestEstimateThreadCount(unittest.TestCase):
+    def test_heuristic(self):
+        r = _make_researcher(None)
+        self.assertEqual(r._estimate_thread_count("Postgres vs MySQL"), 5)
+        self.assertEqual(r._estimate_thread_count("Which is BETTER: a or b?"), 5)
+        self.assertEqual(r._estimate_thread_count("canvas rendering tips"), 3)
+        self.assertEqual(r._estimate_thread_count(" ".join(["word"] * 30)), 4)
+        self.assertEqual(r._estimate_thread_count(" ".join(["word"] * 60)), 6)
+
+    def test_slow_sub_agents_get_fewer_threads(self):
+        r = _make_researcher(None)
+        long_query = " ".join(["word"] * 60)
+        r.sub_pool._recent_durations.extend([1000.0] * 19 + [12000.0])
+        self.assertEqual(r.sub_pool.get_metrics()["p95_ms"], 1000.0)
+        self.assertEqual(r._estimate_thread_count(long_query), 6)
+
+        r.sub_pool._recent_durations.extend([11000.0] * 20)
+        self.assertEqual(r._estimate_thread_count(long_query), 4)
+        r.sub_pool._recent_durations.extend([30000.0] * 40)
+        self.assertEqual(r._estimate_thread_count(long_query), 3)
+
+
+class TestFallbackThreads(unittest.TestCase):
+    def test_copies_are_independent(self):
+        r = _make_researcher(None)
+        query = "x" * 300
+        first = r._fallback_threads(query)
+        first[0]["search_queries"].append("mutated")
+        first[1]["focus"] = "mutated"
+        second = r._fallback_threads(query)
+        self.assertEqual(second[0]["search_queries"], ["x" * 100])
+        self.assertEqual(second[1]["focus"], "Background context and related information for: " + "x" * 100)
+        self.assertEqual(second[0]["focus"], "Core answer to: " + "x" * 200)
+
+    def test_pad_threads(self):
+        r = _make_researcher(None)
+        padded = r._pad_threads("q", [{"id": "main", "focus": "given"}])
+        self.assertEqual([t["id"] for t in padded], ["main", "context", "risks"])
+        self.assertEqual(padded[0]["focus"], "given")
+
+
+class TestCacheFacts(unittest.TestCase):
+    FACTS = [
+        {"fact": "A", "confidence": 0.9},
+        {"fact": "B", "confidence": 0.5},
+        {"fact": "", "confidence": 0.99},
+        {"fact": "C", "confidence": 0.75},
+    ]
+
+    def test_single_bulk_write(self):
+        r = _make_researcher(None)
+        r.memory = MagicMock(spec=["store_fact", "store_facts_bulk"])
+        self.assertEqual(r._cache_facts(self.FACTS), 2)
+        r.memory.store_facts_bulk.assert_called_once()
+        entries = r.memory.store_facts_bulk.call_args.args[0]
+        self.assertEqual([e["fact"] for e in entries], ["A", "C"])
+        r.memory.store_fact.assert_not_called()
+
+    def test_per_fact_fallback(self):
+        r = _make_researcher(None)
+        r.memory = MagicMock(spec=["store_fact"])
+        self.assertEqual(r._cache_facts(self.FACTS), 2)
+        self.assertEqual(r.memory.store_fact.call_count, 2)
+        for call in r.memory.store_fact.call_args_list:
+            self.assertEqual(call.kwargs["source_agent"], "researcher")
+
+
+class TestHandleResearch(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def _researcher(self, threads=None):
+        r = _make_researcher(None)
+        r._knowledge_cache_path = Path(self._tmp.name)
+        r.memory = MagicMock(spec=["store_fact", "store_facts_bulk"])
+        r._decompose = AsyncMock(return_value=threads or _threads(3))
+        r._investigate_parallel = AsyncMock(return_value=[ThreadResult(
+            "t0", "f", success=True,
+            facts_worth_caching=[{"fact": "A", "confidence": 0.9}, {"fact": "a.", "confidence": 0.9}],
+        )])
+        r._synthesize = AsyncMock(return_value={"summary": "s", "facts_for_cache": []})
+        return r
+
+    def test_thread_and_synthesis_facts_cached_in_one_write(self):
+        r = self._researcher()
+        r._synthesize = AsyncMock(return_value={"facts_for_cache": [
+            {"fact": "A", "confidence": 0.9}, {"fact": "New", "confidence": 0.8},
+        ]})
+        report = _run(r._handle_research("q", "q", {}))
+
+        r.memory.store_facts_bulk.assert_called_once()
+        self.assertEqual([e["fact"] for e in r.memory.store_facts_bulk.call_args.args[0]], ["A", "New"])
+        self.assertEqual(report["research_metadata"]["facts_cached"], 2)
+
+    def test_repeat_query_served_from_report_cache(self):
+        r = self._researcher()
+        first = _run(r._handle_research("q", "q", {"a": 1, "b": [2]}))
+        again = _run(r._handle_research("q", "q", {"b": [2], "a": 1}))
+
+        self.assertEqual(r._synthesize.await_count, 1)
+        self.assertNotIn("cache_hit", first["research_metadata"])
+        self.assertTrue(again["research_metadata"]["cache_hit"])
+        self.assertEqual(again["summary"], "s")
+
+        _run(r._handle_research("q", "q", {"a": 2}))
+        self.assertEqual(r._synthesize.await_count, 2)
+
+    def test_report_cache_expiry_and_failed_runs(self):
+        r = self._researcher(threads=[dict(t, is_risk_thread=True) for t in _threads(3)])
+        _run(r._handle_research("q", "q", {}))
+        path = r._report_cache_file(r._report_cache_key("q", {}))
+        entry = json.loads(zlib.decompress(path.read_bytes()))
+        self.assertLess(entry["expires"] - time.time(), researcher_mod.REPORT_CACHE_RISK_TTL_S + 1)
+
+        path.write_bytes(b"corrupt")
+        self.assertIsNone(r._load_cached_report(r._report_cache_key("q", {})))
+        self.assertFalse(path.exists())
+
+        far = time.time() + 3600
+        for bogus in ([1, 2], {"expires": "later", "report": {}}, {"expires": far, "report": ["x"]},
+                      {"expires": far}):
+            path.write_bytes(zlib.compress(json.dumps(bogus).encode()))
+            self.assertIsNone(r._load_cached_report(r._report_cache_key("q", {})))
+            self.assertFalse(path.exists())
+
+        r._investigate_parallel = AsyncMock(return_value=[ThreadResult("t0", "f")])
+        _run(r._handle_research("q", "q", {}))
+        self.assertFalse(path.exists())
+
+    def test_report_cache_hit_survives_concurrent_eviction(self):
+        r = self._researcher()
+        r._store_cached_report("k", {"n": 1}, 60)
+        with patch.object(researcher_mod.os, "utime", side_effect=FileNotFoundError):
+            self.assertEqual(r._load_cached_report("k"), {"n": 1})
+
+    def test_report_cache_evicts_least_recently_used(self):
+        r = self._researcher()
+        with patch.object(researcher_mod, "REPORT_CACHE_MAX_FILES", 2):
+            for i, key in enumerate(["k0", "k1", "k2"]):
+                r._store_cached_report(key, {"n": i}, 60)
+                os.utime(r._report_cache_file(key), (i, i))
+            self.assertIsNotNone(r._load_cached_report("k1"))
+            r._store_cached_report("k3", {"n": 3}, 60)
+        self.assertEqual(
+            sorted(p.name.split(".")[0] for p in (Path(self._tmp.name) / "reports").iterdir()),
+            ["k1", "k3"],
+        )
+
+
+class TestScoreSources(unittest.TestCase):
+    def test_dedup_ignores_case_and_punctuation(self):
+        r = _make_researcher(None)
+        threads = [
+            ThreadResult("a", "a", findings=[{"finding": "Python 3.12 is faster.", "source_type": "official_docs"}]),
+            ThreadResult("b", "b", findings=[
+                {"finding": "python 312 is faster", "source_type": "forum_social"},
+                {"finding": "PyPy is faster still", "source_type": "mystery", "confidence": 0.9},
+            ]),
+        ]
+        scored = r._score_sources(threads)
+
+        self.assertEqual(len(scored[0].findings), 1)
+        self.assertEqual([f["finding"] for f in scored[1].findings], ["PyPy is faster still"])
+        self.assertEqual(scored[1].findings[0]["source_quality"], 0.3)
+        self.assertEqual(scored[1].findings[0]["adjusted_confidence"], 0.66)
+        self.assertEqual(scored[0].findings[0]["adjusted_confidence"], 0.7)
+        self.assertIsInstance(scored[0].findings[0]["adjusted_confidence"], float)
+
+    def test_unlisted_source_types_not_inserted(self):
+        from agents.researcher.researcher import SOURCE_QUALITY
+
+        r = _make_researcher(None)
+        r._score_sources([ThreadResult("a", "a", findings=[{"finding": "x", "source_type": "blog_spam"}])])
+        self.assertNotIn("blog_spam", SOURCE_QUALITY)
+        self.assertEqual(SOURCE_QUALITY["blog_spam"], 0.3)
+
+    def test_no_findings(self):
+        r = _make_researcher(None)
+        scored = r._score_sources([ThreadResult("a", "a")])
+        self.assertEqual(scored[0].findings, [])
+
+
+class TestSynthesize(unittest.TestCase):
+    def _thread(self, focus, confidence, size=1):
+        return ThreadResult(
+            focus, focus, success=True,
+            findings=[{"finding": "x" * size, "adjusted_confidence": confidence}],
+        )
+
+    def _prompt(self, threads):
+        r = _make_researcher(None)
+        r._system_prompt_text = "researcher"
+        r.llm.generate_json = AsyncMock(return_value={"content": {}})
+        _run(r._synthesize("q", threads))
+        return r.llm.generate_json.call_args.kwargs["prompt"]
+
+    def test_strongest_threads_first(self):
+        prompt = self._prompt([self._thread("weak", 0.2), self._thread("strong", 0.9)])
+        self.assertLess(prompt.index("Thread: strong"), prompt.index("Thread: weak"))
+        self.assertNotIn("(truncated)", prompt)
+
+    def test_budget_drops_weakest(self):
+        threads = [self._thread(f"t{i}", i / 10, size=5000) for i in range(4)]
+        prompt = self._prompt(threads)
+        self.assertIn("Thread: t3", prompt)
+        self.assertNotIn("Thread: t0", prompt)
+        self.assertIn("... (truncated)", prompt)
+        body = prompt.split("Investigation results:\n", 1)[1].split("\n... (truncated)", 1)[0]
+        self.assertEqual(len(body), 12000)
+
+    def test_merges_thread_extras_once(self):
+        r = _make_researcher(None)
+        r._system_prompt_text = "researcher"
+        r.llm.generate_json = AsyncMock(return_value={"content": {
+            "summary": "s",
+            "facts_for_cache": [{"fact": "A is fast.", "confidence": 0.9}],
+            "risks_and_caveats": ["r1"],
+        }})
+        threads = [
+            ThreadResult("a", "a", success=True,
+                         facts_worth_caching=[{"fact": "a is fast"}, {"fact": "B"}],
+                         risks_found=["r1", "r2"], knowledge_gaps=["g1"]),
+            ThreadResult("b", "b", success=True,
+                         facts_worth_caching=[{"fact": "b"}], risks_found=["R2!"], knowledge_gaps=["g1"]),
+        ]
+        report = _run(r._synthesize("q", threads))
+
+        self.assertEqual([f["fact"] for f in report["facts_for_cache"]], ["A is fast.", "B"])
+        self.assertEqual(report["risks_and_caveats"], ["r1", "r2"])
+        self.assertEqual(report["knowledge_gaps"], ["g1"])
+
+    def test_fallback_keeps_first_seen_order(self):
+        r = _make_researcher(None)
+        threads = [
+            ThreadResult("a", "a", risks_found=["r3", "r1"], knowledge_gaps=["g2", "g1"]),
+            ThreadResult("b", "b", risks_found=["r1", "r2"], knowledge_gaps=["g1", "g0"]),
+        ]
+        report = r._fallback_synthesis("q", threads)
+        self.assertEqual(report["risks_and_caveats"], ["r3", "r1", "r2"])
+        self.assertEqual(report["knowledge_gaps"], ["g2", "g1", "g0"])
+
+    def test_fallback_reports_top_ten_findings(self):
+        r = _make_researcher(None)
+        confidences = [0.1, 0.9, 0.5, 0.9, 0.3] * 3
+        threads = [ThreadResult("a", "a", findings=[
+            {"finding": f"f{i}", "confidence": c} for i, c in enumerate(confidences)
+        ])]
+        report = r._fallback_synthesis("q", threads)
+
+        expected = sorted(range(len(confidences)), key=lambda i: -confidences[i])[:10]
+        self.assertEqual([f["finding"] for f in report["key_findings"]], [f"f{i}" for i in expected])
+        self.assertEqual(report["summary"], " ".join(f"f{i}" for i in expected[:5]))
+        self.assertEqual(report["overall_confidence"], round(sum(confidences) / len(confidences), 3))
+
+
+@unittest.skipUnless(researcher_mod.fastjsonschema, "fastjsonschema not installed")
+class TestOutputValidation(unittest.TestCase):
+    def test_malformed_thread_output_fails_thread(self):
+        async def generate(**kwargs):
+            return {"content": json.dumps({"results": [
+                {"thread_id": "t0", "findings": _findings("t0")},
+                {"thread_id": "t1", "findings": [{"finding": "x", "confidence": "high"}]},
+                {"thread_id": "t2", "risks_found": "not a list"},
+            ]})}
+
+        r = _make_researcher(generate)
+        results = _run(r._investigate_parallel("what is X?", _threads(3)))
+
+        self.assertEqual([t.success for t in results], [True, False, False])
+        self.assertIn("malformed output", results[1].knowledge_gaps[0])
+
+    def test_malformed_synthesis_falls_back(self):
+        r = _make_researcher(None)
+        r._system_prompt_text = "researcher"
+        r.llm.generate_json = AsyncMock(return_value={"content": {"key_findings": "none"}})
+        report = _run(r._synthesize("q", [ThreadResult("a", "a", risks_found=["r"])]))
+        self.assertIn("Fallback synthesis", report["source_quality_summary"])
+
+    def test_malformed_decomposition_yields_no_threads(self):
+        r = _make_researcher(None)
+        r.llm.generate_json = AsyncMock(return_value={"content": {"threads": [{"focus": "no id"}]}})
+        self.assertEqual(_run(r._decompose("q", {})), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
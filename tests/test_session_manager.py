@@ -0,0 +1,543 @@
+"""Tests for AgentSessionManager delegation."""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from agents import session_manager
+from agents.common import json_codec
+from agents.session_manager import AgentConfig, AgentSessionManager, DelegationTask
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _SessionTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.workspace = Path(self._tmp.name)
+        soul = self.workspace / "agents" / "builder" / "SOUL.md"
+        soul.parent.mkdir(parents=True)
+        soul.write_text("You are the builder.")
+        (self.workspace / "TEAM.md").write_text("Team notes.")
+        self.manager = AgentSessionManager(workspace=self.workspace)
+
+
+class TestAgentConfig(_SessionTestCase):
+    def test_parsed_once_until_changed(self):
+        config_path = self.workspace / "agents" / "builder" / "config.yaml"
+        config_path.write_text("model: m1\ntools: [read]\n")
+
+        with patch.object(session_manager.yaml, "safe_load", wraps=session_manager.yaml.safe_load) as load:
+            first = AgentConfig.from_config_file("builder", self.workspace)
+            first.tools.append("exec")
+            second = AgentSessionManager(workspace=self.workspace)._get_config("builder")
+            self.assertEqual(load.call_count, 1)
+            self.assertEqual((second.model, second.tools), ("m1", ["read"]))
+
+            config_path.write_text("model: m2\n")
+            os.utime(config_path, ns=(1, 1))
+            third = AgentConfig.from_config_file("builder", self.workspace)
+            self.assertEqual(load.call_count, 2)
+        self.assertEqual((third.model, third.tools), ("m2", ["exec", "read", "write", "edit"]))
+
+    def test_known_agents_resolved_at_construction(self):
+        config_path = self.workspace / "agents" / "guardian" / "config.yaml"
+        config_path.parent.mkdir(parents=True)
+        config_path.write_text("model: g1\n")
+        manager = AgentSessionManager(workspace=self.workspace)
+
+        self.assertEqual(set(manager._agent_configs), set(session_manager.AGENT_TOOL_SETS))
+        self.assertEqual(manager._agent_configs["guardian"].model, "g1")
+        with patch.object(AgentConfig, "from_config_file") as load:
+            manager._get_config("guardian")
+            load.assert_not_called()
+            manager._get_config("custom")
+            load.assert_called_once()
+
+    @unittest.skipUnless(hasattr(os, "posix_fadvise"), "posix_fadvise not available")
+    def test_prompt_files_prefetched_at_construction(self):
+        with patch.object(session_manager.os, "posix_fadvise") as fadvise:
+            AgentSessionManager(workspace=self.workspace)
+        # Only builder's SOUL.md and TEAM.md exist in the test workspace
+        self.assertEqual(fadvise.call_count, 2)
+        self.assertEqual(fadvise.call_args.args[1:], (0, 0, os.POSIX_FADV_WILLNEED))
+
+    def test_defaults_without_config_file(self):
+        config = AgentConfig.from_config_file("researcher", self.workspace)
+        self.assertEqual(config.soul_path, "agents/researcher/SOUL.md")
+        self.assertEqual(config.tools, ["web_search", "web_fetch", "read"])
+        config.tools.clear()
+        self.assertEqual(session_manager.AGENT_TOOL_SETS["researcher"], ["web_search", "web_fetch", "read"])
+
+
+class TestSystemPrompt(_SessionTestCase):
+    def test_prompt_layout(self):
+        prompt = self.manager._build_system_prompt("builder", {"k": 1})
+        self.assertEqual(
+            prompt,
+            "You are the builder.\n\n\n## Team Context\nTeam notes.\n\n"
+            '\n## Task Context\n```json\n{\n  "k": 1\n}\n```',
+        )
+        self.assertEqual(
+            self.manager._build_system_prompt("verifier"),
+            "You are the verifier agent. Complete the assigned task.\n\n\n## Team Context\nTeam notes.",
+        )
+
+    def test_context_json_backend_independent(self):
+        context = {"when": datetime(2026, 1, 1), "name": "café", "n": [1, 2]}
+
+        def body(block):
+            return json.loads(block.split("```json\n", 1)[1].rsplit("\n```", 1)[0])
+
+        fast = body(self.manager._context_block(context))
+        with patch.object(json_codec, "orjson", None):
+            slow = body(self.manager._context_block(context))
+        self.assertEqual(fast["name"], "café")
+        self.assertEqual(fast["n"], slow["n"])
+        self.assertTrue(fast["when"].startswith("2026-01-01"))
+
+    def test_context_with_mixed_key_types_renders_without_orjson(self):
+        with patch.object(json_codec, "orjson", None):
+            block = self.manager._context_block({1: "a", "b": 2})
+        self.assertIn('"1": "a"', block)
+
+    def test_context_block_canonical_and_cached(self):
+        a = self.manager._context_block({"b": 1, "a": {"y": 2, "x": 3}})
+        b = self.manager._context_block({"a": {"x": 3, "y": 2}, "b": 1})
+        self.assertIs(a, b)
+        self.assertLess(a.index('"a"'), a.index('"b"'))
+
+    def test_prefix_reread_only_on_change(self):
+        self.manager._build_system_prompt("builder")
+        with patch.object(Path, "read_text", autospec=True, side_effect=Path.read_text) as read:
+            self.manager._build_system_prompt("builder", {"k": 1})
+            self.manager._build_system_prompt("builder")
+            self.assertEqual(read.call_count, 0)
+
+            soul = self.workspace / "agents" / "builder" / "SOUL.md"
+            soul.write_text("You are the new builder.")
+            os.utime(soul, ns=(1, 1))
+            prompt = self.manager._build_system_prompt("builder")
+            self.assertEqual(read.call_count, 1)
+        self.assertTrue(prompt.startswith("You are the new builder."))
+
+        (self.workspace / "TEAM.md").unlink()
+        self.assertEqual(self.manager._build_system_prompt("builder"), "You are the new builder.")
+
+
+class TestSessionKeys(_SessionTestCase):
+    def test_keys_unique_within_and_across_managers(self):
+        other = AgentSessionManager(workspace=self.workspace)
+        keys = [m._new_session_key("builder") for m in (self.manager, other) for _ in range(3)]
+        self.assertEqual(len(set(keys)), 6)
+        self.assertTrue(all(k.startswith("builder_") for k in keys))
+        self.assertEqual(keys[1], keys[0][:-1] + "1")
+
+    def test_no_randomness_per_delegation(self):
+        sdk = SimpleNamespace(sessions_spawn=AsyncMock(return_value="ok"))
+        with patch.object(session_manager, "openclaw_sdk", sdk), \
+                patch.object(session_manager.uuid, "uuid4") as uuid4:
+            results = _run(self.manager.delegate_parallel([DelegationTask("builder", "t")] * 3))
+        uuid4.assert_not_called()
+        self.assertEqual(len({r.session_key for r in results}), 3)
+
+
+class TestSessionTracking(_SessionTestCase):
+    def test_in_flight_sessions_tracked_until_done(self):
+        seen = []
+
+        async def run_session(spawn_args, timeout, on_chunk=None):
+            seen.append(self.manager.get_active_sessions())
+            if spawn_args["message"] == "fail":
+                raise RuntimeError("boom")
+            return "ok"
+
+        with patch.object(self.manager, "_run_session", run_session):
+            ok = _run(self.manager.delegate("builder", "t"))
+            failed = _run(self.manager.delegate("builder", "fail"))
+
+        self.assertEqual(seen[0], {ok.session_key: "builder"})
+        self.assertEqual(self.manager.get_active_sessions(), {})
+        self.assertEqual(
+            self.manager.get_completed_sessions(),
+            [(ok.session_key, "builder"), (failed.session_key, "builder")],
+        )
+
+    def test_completed_history_bounded(self):
+        with patch.object(session_manager, "COMPLETED_SESSIONS_KEPT", 2):
+            manager = AgentSessionManager(workspace=self.workspace)
+        for i in range(3):
+            manager._session_started(f"s{i}", "builder")
+            manager._session_ended(f"s{i}")
+        self.assertEqual([k for k, _ in manager.get_completed_sessions()], ["s1", "s2"])
+
+    def test_warm_sessions_active_while_pooled(self):
+        manager = AgentSessionManager(workspace=self.workspace, warm_sessions=1)
+        sdk = SimpleNamespace(
+            sessions_spawn=AsyncMock(return_value=""),
+            sessions_send=AsyncMock(side_effect=[{"result": "ok"}, RuntimeError("boom")]),
+        )
+        with patch.object(session_manager, "openclaw_sdk", sdk):
+            ok = _run(manager.delegate("builder", "a"))
+            self.assertEqual(manager.get_active_sessions(), {ok.session_key: "builder"})
+            _run(manager.delegate("builder", "b"))
+        self.assertEqual(manager.get_active_sessions(), {})
+
+
+class TestSdkSessions(_SessionTestCase):
+    def test_sdk_used_when_installed(self):
+        sdk = SimpleNamespace(sessions_spawn=AsyncMock(return_value={"result": " done \n"}))
+        with patch.object(session_manager, "openclaw_sdk", sdk), \
+                patch("asyncio.create_subprocess_exec") as spawn:
+            result = _run(self.manager.delegate("builder", "build it", {"k": 1}))
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.result, "done")
+        spawn.assert_not_called()
+        kwargs = sdk.sessions_spawn.call_args.kwargs
+        self.assertEqual(kwargs["message"], "build it")
+        self.assertEqual(kwargs["tools"], ["exec", "read", "write", "edit"])
+        self.assertIn("You are the builder.", kwargs["system"])
+        self.assertEqual(kwargs["label"], result.session_key)
+
+    def test_sdk_result_attribute_and_timeout(self):
+        async def slow(**kwargs):
+            await asyncio.sleep(1)
+
+        sdk = SimpleNamespace(sessions_spawn=AsyncMock(return_value=SimpleNamespace(result="ok")))
+        with patch.object(session_manager, "openclaw_sdk", sdk):
+            self.assertEqual(_run(self.manager.delegate("builder", "t")).result, "ok")
+            sdk.sessions_spawn = slow
+            result = _run(self.manager.delegate("builder", "t", timeout=0.01))
+
+        self.assertFalse(result.success)
+        self.assertIn("Timeout", result.error)
+
+    def test_stateless_agent_uses_chat(self):
+        config_path = self.workspace / "agents" / "builder" / "config.yaml"
+        config_path.write_text("model: local-small\nstateless: true\n")
+        manager = AgentSessionManager(workspace=self.workspace, warm_sessions=2)
+        sdk = SimpleNamespace(
+            chat=AsyncMock(return_value={"result": "answer"}),
+            sessions_spawn=AsyncMock(), sessions_send=AsyncMock(),
+        )
+        with patch.object(session_manager, "openclaw_sdk", sdk):
+            result = _run(manager.delegate("builder", "q", {"k": 1}))
+
+        self.assertEqual(result.result, "answer")
+        sdk.sessions_spawn.assert_not_called()
+        sdk.sessions_send.assert_not_called()
+        kwargs = sdk.chat.call_args.kwargs
+        self.assertEqual((kwargs["model"], kwargs["message"]), ("local-small", "q"))
+        self.assertIn('"k": 1', kwargs["system"])
+        self.assertEqual(manager.get_active_sessions(), {})
+
+    def test_stateless_without_chat_spawns_session(self):
+        config_path = self.workspace / "agents" / "builder" / "config.yaml"
+        config_path.write_text("stateless: true\n")
+        sdk = SimpleNamespace(sessions_spawn=AsyncMock(return_value="spawned"))
+        with patch.object(session_manager, "openclaw_sdk", sdk):
+            self.assertEqual(_run(self.manager.delegate("builder", "q")).result, "spawned")
+
+    def test_cli_fallback_without_sdk(self):
+        with patch.object(session_manager, "openclaw_sdk", None), \
+                patch.object(self.manager, "_run_session_cli", AsyncMock(return_value="cli")) as cli:
+            results = _run(self.manager.delegate_parallel([DelegationTask("builder", "t")]))
+
+        self.assertEqual(results[0].result, "cli")
+        cli.assert_awaited_once()
+
+
+class TestCliExec(_SessionTestCase):
+    def test_exec_returns_stdout_and_raises_on_failure(self):
+        self.assertEqual(_run(self.manager._exec_openclaw(["echo", " hi "], timeout=10)), "hi")
+        with self.assertRaises(RuntimeError):
+            _run(self.manager._exec_openclaw(["sh", "-c", "echo bad >&2; exit 3"], timeout=10))
+
+    def test_worker_thread_loops_can_spawn_after_manager_built(self):
+        # The manager must not swap asyncio's process-wide child watcher
+        result = {}
+
+        def worker():
+            try:
+                result["out"] = asyncio.run(self.manager._exec_openclaw(["echo", "ok"], timeout=10))
+            except Exception as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        self.assertEqual(result, {"out": "ok"})
+
+    def test_error_keeps_stderr_tail(self):
+        script = "head -c 100000 /dev/zero | tr '\\0' x >&2; echo ' the real error' >&2; exit 1"
+        with self.assertRaises(RuntimeError) as ctx:
+            _run(self.manager._exec_openclaw(["sh", "-c", script], timeout=10))
+        message = str(ctx.exception)
+        self.assertTrue(message.endswith("x the real error"))
+        self.assertLessEqual(len(message), len("Session failed: ") + session_manager.STDERR_TAIL_BYTES)
+
+    def test_output_streamed_to_callback(self):
+        chunks = []
+        script = "printf 'first \\342\\202'; sleep 0.05; printf '\\254 second\\n'"
+        out = _run(self.manager._exec_openclaw(["sh", "-c", script], timeout=10, on_chunk=chunks.append))
+        self.assertEqual(out, "first € second")
+        self.assertEqual(chunks, ["first ", "€ second\n"])
+
+    def test_timeout_kills_child(self):
+        pidfile = self.workspace / "pid"
+        with self.assertRaises(asyncio.TimeoutError):
+            _run(self.manager._exec_openclaw(["sh", "-c", f"echo $$ > {pidfile}; exec sleep 5"], timeout=0.2))
+        _run(asyncio.sleep(0.1))
+        with self.assertRaises(ProcessLookupError):
+            os.kill(int(pidfile.read_text()), 0)
+
+    def test_delegate_forwards_chunks(self):
+        chunks = []
+        sdk = SimpleNamespace(sessions_spawn=AsyncMock(return_value={"result": "whole"}))
+        with patch.object(session_manager, "openclaw_sdk", sdk):
+            _run(self.manager.delegate("builder", "t", on_chunk=chunks.append))
+        self.assertEqual(chunks, ["whole"])
+
+    def test_system_prompt_fed_over_stdin(self):
+        out = _run(self.manager._exec_openclaw(["cat"], timeout=10, input="prompt ü".encode()))
+        self.assertEqual(out, "prompt ü")
+
+    def test_spawn_argv_built_on_agent_prefix(self):
+        config = self.manager._get_config("builder")
+        self.assertIs(config.argv_prefix, config.argv_prefix)
+        exec_mock = AsyncMock(return_value="ok")
+        with patch.object(session_manager, "openclaw_sdk", None), \
+                patch.object(self.manager, "_exec_openclaw", exec_mock):
+            _run(self.manager.delegate("builder", "do it"))
+        cmd = exec_mock.call_args.args[0]
+        self.assertEqual(tuple(cmd[:len(config.argv_prefix)]), config.argv_prefix)
+        self.assertEqual(cmd[:3], ["openclaw", "sessions", "spawn"])
+        self.assertEqual(cmd[cmd.index("--message") + 1], "do it")
+
+
+class TestParallelFanOut(_SessionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.inflight = self.peak = 0
+
+        async def run_session(spawn_args, timeout, on_chunk=None):
+            self.inflight += 1
+            self.peak = max(self.peak, self.inflight)
+            await asyncio.sleep(0.05 if spawn_args["message"] == "slow" else 0.01)
+            self.inflight -= 1
+            return spawn_args["message"]
+
+        patcher = patch.object(self.manager, "_run_session", run_session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager._batch_supported = False
+
+    def test_concurrency_capped(self):
+        tasks = [DelegationTask("builder", str(i)) for i in range(5)]
+        results = _run(self.manager.delegate_parallel(tasks, max_concurrent=2))
+        self.assertEqual([r.result for r in results], [str(i) for i in range(5)])
+        self.assertEqual(self.peak, 2)
+
+    def test_global_cap_spans_delegate_and_fan_out(self):
+        async def go():
+            return await asyncio.gather(
+                self.manager.delegate("builder", "single"),
+                self.manager.delegate_parallel([DelegationTask("builder", str(i)) for i in range(4)]),
+            )
+
+        with patch.object(session_manager, "MAX_CONCURRENT_DELEGATES", 3):
+            single, fanned = _run(go())
+        self.assertTrue(single.success)
+        self.assertEqual([r.result for r in fanned], ["0", "1", "2", "3"])
+        self.assertEqual(self.peak, 3)
+
+    def test_prompt_built_once_per_agent_and_context(self):
+        shared = {"plan": [1, 2]}
+        tasks = [
+            DelegationTask("builder", "a", shared), DelegationTask("builder", "b", shared),
+            DelegationTask("builder", "c", {"plan": [1, 2]}), DelegationTask("verifier", "d", shared),
+        ]
+        with patch.object(self.manager, "_build_system_prompt",
+                          wraps=self.manager._build_system_prompt) as build:
+            results = _run(self.manager.delegate_parallel(tasks))
+        self.assertEqual(build.call_count, 3)
+        self.assertTrue(all(r.success for r in results))
+
+    def test_cold_prompt_reads_overlap(self):
+        real_read = Path.read_text
+
+        def slow_read(path, *args, **kwargs):
+            time.sleep(0.05)
+            return real_read(path, *args, **kwargs)
+
+        tasks = [DelegationTask(name, "t") for name in ("builder", "verifier", "researcher")]
+        with patch.object(Path, "read_text", autospec=True, side_effect=slow_read):
+            start = time.monotonic()
+            prompts = _run(self.manager._fan_out_prompts(tasks))
+            elapsed = time.monotonic() - start
+        self.assertTrue(prompts[0].startswith("You are the builder."))
+        self.assertLess(elapsed, 0.15)  # four serial reads would take 0.2s
+
+    def test_stream_yields_in_completion_order(self):
+        async def collect():
+            tasks = [DelegationTask("builder", "slow"), DelegationTask("verifier", "fast")]
+            return [(i, r.result) async for i, r in self.manager.delegate_parallel_stream(tasks)]
+
+        self.assertEqual(_run(collect()), [(1, "fast"), (0, "slow")])
+
+
+class TestBatchSpawn(_SessionTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = patch.object(session_manager, "openclaw_sdk", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tasks = [DelegationTask("builder", "a", {"k": 1}), DelegationTask("researcher", "b")]
+
+    def test_one_cli_call_for_all_tasks(self):
+        calls = []
+
+        async def exec_openclaw(cmd, timeout, input=None, on_chunk=None):
+            calls.append(cmd)
+            manifest = json.loads(input)
+            self.assertEqual([m["message"] for m in manifest], ["a", "b"])
+            self.assertIn('"k": 1', manifest[0]["system"])
+            return "\n".join([
+                json.dumps({"label": manifest[0]["label"], "result": " built "}),
+                json.dumps({"label": manifest[1]["label"], "error": "no sources"}),
+            ])
+
+        with patch.object(self.manager, "_exec_openclaw", exec_openclaw):
+            results = _run(self.manager.delegate_parallel(self.tasks))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0][:3], ["openclaw", "sessions", "spawn_batch"])
+        self.assertEqual(calls[0][-2:], ["--manifest", "-"])
+        self.assertEqual((results[0].success, results[0].result), (True, "built"))
+        self.assertEqual((results[1].success, results[1].error), (False, "no sources"))
+
+    def test_falls_back_when_batch_unsupported(self):
+        async def exec_openclaw(cmd, timeout, input=None, on_chunk=None):
+            if cmd[2] == "spawn_batch":
+                raise RuntimeError("Session failed: unknown command")
+            self.assertEqual(cmd[-1], "--system-stdin")
+            self.assertIn(b"## Team Context", input)
+            return f"reply to {cmd[cmd.index('--message') + 1]}"
+
+        with patch.object(self.manager, "_exec_openclaw", AsyncMock(side_effect=exec_openclaw)) as ex:
+            results = _run(self.manager.delegate_parallel(self.tasks))
+            self.assertEqual([r.result for r in results], ["reply to a", "reply to b"])
+            self.assertEqual(ex.await_count, 3)
+
+            _run(self.manager.delegate_parallel(self.tasks))
+            self.assertEqual(ex.await_count, 5)
+
+    def test_missing_cli_falls_back(self):
+        async def exec_openclaw(cmd, timeout, input=None, on_chunk=None):
+            if cmd[2] == "spawn_batch":
+                raise FileNotFoundError("openclaw")
+            return "ok"
+
+        with patch.object(self.manager, "_exec_openclaw", exec_openclaw):
+            results = _run(self.manager.delegate_parallel(self.tasks))
+        self.assertEqual([r.result for r in results], ["ok", "ok"])
+        self.assertFalse(self.manager._batch_supported)
+
+    def test_partial_failure_keeps_results_and_never_reruns(self):
+        async def exec_openclaw(cmd, timeout, input=None, on_chunk=None):
+            manifest = json.loads(input)
+            stdout = "\n".join([
+                "progress: starting",
+                json.dumps({"label": manifest[0]["label"], "result": "built"}),
+            ])
+            raise session_manager._CLIFailure("Session failed: researcher crashed", stdout)
+
+        with patch.object(self.manager, "_exec_openclaw", AsyncMock(side_effect=exec_openclaw)) as ex:
+            results = _run(self.manager.delegate_parallel(self.tasks))
+        self.assertEqual(ex.await_count, 1)
+        self.assertTrue(self.manager._batch_supported)
+        self.assertEqual((results[0].success, results[0].result), (True, "built"))
+        self.assertEqual((results[1].success, results[1].error), (False, "Session failed: researcher crashed"))
+
+    def test_unexpected_error_becomes_per_task_errors(self):
+        ex = AsyncMock(side_effect=ValueError("bad manifest"))
+        with patch.object(self.manager, "_exec_openclaw", ex):
+            results = _run(self.manager.delegate_parallel(self.tasks))
+        self.assertEqual(ex.await_count, 1)
+        self.assertTrue(self.manager._batch_supported)
+        self.assertTrue(all(not r.success and "bad manifest" in r.error for r in results))
+
+    def test_non_json_lines_skipped(self):
+        async def exec_openclaw(cmd, timeout, input=None, on_chunk=None):
+            manifest = json.loads(input)
+            return "\n".join(
+                ["not json {"] + [json.dumps({"label": m["label"], "result": "done"}) for m in manifest]
+            )
+
+        with patch.object(self.manager, "_exec_openclaw", exec_openclaw):
+            results = _run(self.manager.delegate_parallel(self.tasks))
+        self.assertEqual([r.result for r in results], ["done", "done"])
+
+
+class TestWarmSessions(_SessionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manager = AgentSessionManager(workspace=self.workspace, warm_sessions=1)
+        self.sdk = SimpleNamespace(
+            sessions_spawn=AsyncMock(return_value={"result": ""}),
+            sessions_send=AsyncMock(return_value={"result": "reply"}),
+        )
+        patcher = patch.object(session_manager, "openclaw_sdk", self.sdk)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_session_reused_across_tasks(self):
+        first = _run(self.manager.delegate("builder", "one", {"k": 1}))
+        second = _run(self.manager.delegate("builder", "two"))
+
+        self.assertEqual(first.result, "reply")
+        self.assertEqual(first.session_key, second.session_key)
+        self.sdk.sessions_spawn.assert_awaited_once()
+        spawn = self.sdk.sessions_spawn.call_args.kwargs
+        self.assertNotIn("Task Context", spawn["system"])
+        self.assertEqual(spawn["message"], "")
+        messages = [c.kwargs["message"] for c in self.sdk.sessions_send.call_args_list]
+        self.assertTrue(messages[0].startswith("one\n\n"))
+        self.assertIn('"k": 1', messages[0])
+        self.assertEqual(messages[1], "two")
+
+    def test_failed_session_not_reused(self):
+        self.sdk.sessions_send.side_effect = [RuntimeError("boom"), {"result": "ok"}]
+        failed = _run(self.manager.delegate("builder", "one"))
+        retried = _run(self.manager.delegate("builder", "two"))
+
+        self.assertFalse(failed.success)
+        self.assertEqual(retried.result, "ok")
+        self.assertNotEqual(failed.session_key, retried.session_key)
+        self.assertEqual(self.sdk.sessions_spawn.await_count, 2)
+
+    def test_overlapping_tasks_get_own_sessions(self):
+        async def both():
+            return await asyncio.gather(
+                self.manager.delegate("builder", "a"), self.manager.delegate("builder", "b"),
+            )
+
+        a, b = _run(both())
+        self.assertNotEqual(a.session_key, b.session_key)
+        self.assertEqual(self.manager._pools["builder"].qsize(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,223 @@
+"""Tests for the Verifier claim-verification pipeline."""
+
+import asyncio
+import os
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+
+from agents.common.llm_client import LLMClient
+from agents.common.sub_agent import SubResult
+from agents.verifier import verifier as verifier_mod
+from agents.verifier.verifier import VerifierAgent
+from memory.engine import MemoryEngine
+from memory.schemas import init_db
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _make_verifier(generate_json):
+    """Create a VerifierAgent whose LLM JSON calls go to *generate_json*."""
+    v = VerifierAgent.__new__(VerifierAgent)
+    v.llm = MagicMock()
+    v.llm.generate_json = generate_json
+    v.memory = None
+    v._system_prompt_text = "verifier"
+    v._verify_sem = asyncio.Semaphore(4)
+    v.sub_pool = MagicMock()
+    v.sub_pool.execute_parallel = AsyncMock(side_effect=lambda tasks: [
+        SubResult(task_id=t.id, success=True, output={"status": "unverified", "confidence": 0.3})
+        for t in tasks
+    ])
+    return v
+
+
+def _answers(*indices, status="verified", confidence=0.9):
+    return {"content": {"verifications": [
+        {"index": i, "status": status, "confidence": confidence, "sources": ["docs"], "reasoning": "ok"}
+        for i in indices
+    ]}}
+
+
+class TestBatchVerify(unittest.TestCase):
+    def test_one_call_for_all_claims(self):
+        generate_json = AsyncMock(return_value=_answers(1, 2, 3))
+        v = _make_verifier(generate_json)
+        results = _run(v._batch_verify(["a", "b", "c"], "- fact one", "verifier"))
+        self.assertEqual(generate_json.await_count, 1)
+        prompt = generate_json.call_args.kwargs["prompt"]
+        self.assertIn("1. a\n2. b\n3. c", prompt)
+        self.assertEqual(prompt.count("fact one"), 1)
+        self.assertEqual([r["claim"] for r in results], ["a", "b", "c"])
+        self.assertTrue(all(r["status"] == "verified" for r in results))
+        v.sub_pool.execute_parallel.assert_not_awaited()
+
+    def test_missing_answers_go_to_sub_agents(self):
+        v = _make_verifier(AsyncMock(return_value=_answers(2, 7)))
+        results = _run(v._batch_verify(["a", "b", "c"], "", "verifier"))
+        self.assertEqual([r["status"] for r in results], ["unverified", "verified", "unverified"])
+        fallback = v.sub_pool.execute_parallel.call_args.args[0]
+        self.assertEqual([t.context["claim"] for t in fallback], ["a", "c"])
+
+    def test_malformed_output_falls_back_entirely(self):
+        v = _make_verifier(AsyncMock(return_value={"content": {"oops": []}}))
+        results = _run(v._batch_verify(["a", "b", "c"], "", "verifier"))
+        self.assertEqual(len(v.sub_pool.execute_parallel.call_args.args[0]), 3)
+        self.assertEqual([r["claim"] for r in results], ["a", "b", "c"])
+
+    def test_large_batches_split(self):
+        async def generate_json(**kwargs):
+            n = kwargs["prompt"].count(". claim ")
+            return _answers(*range(1, n + 1))
+
+        v = _make_verifier(AsyncMock(side_effect=generate_json))
+        claims = [f"claim {i}" for i in range(verifier_mod.BATCH_MAX + 5)]
+        results = _run(v._batch_verify(claims, "", "verifier"))
+        self.assertEqual(v.llm.generate_json.await_count, 2)
+        self.assertEqual([r["claim"] for r in results], claims)
+
+    def test_schema_sent_to_gemini_uses_openapi_subset(self):
+        client = LLMClient()
+        resp = MagicMock()
+        resp.json.return_value = {"candidates": [{"content": {"parts": [{"text": "{}"}]}}]}
+        client._http.post = AsyncMock(return_value=resp)
+        with patch.dict(os.environ, {"GOOGLE_API_KEY": "key"}):
+            _run(client._call_google("gemini-2.5-pro", "sys", [{"role": "user", "content": "p"}],
+                                     0.1, 100, json_schema=verifier_mod.BATCH_VERIFY_SCHEMA))
+
+        config = client._http.post.call_args.kwargs["json"]["generationConfig"]
+        self.assertEqual(config["responseMimeType"], "application/json")
+        item = config["responseSchema"]["properties"]["verifications"]["items"]["properties"]
+        self.assertEqual(item["correction"], {"type": "string", "nullable": True})
+        self.assertEqual(item["status"]["type"], "string")
+        self.assertEqual(set(item["status"]["enum"]), set(verifier_mod.VERIFICATION_STATUSES))
+        self.assertTrue(all(isinstance(prop["type"], str) for prop in item.values()))
+
+
+class TestSequentialVerify(unittest.TestCase):
+    def test_claims_verified_concurrently_within_cap(self):
+        inflight = peak = 0
+
+        async def generate_json(**kwargs):
+            nonlocal inflight, peak
+            inflight += 1
+            peak = max(peak, inflight)
+            await asyncio.sleep(0.01)
+            inflight -= 1
+            return {"content": {"status": "verified", "confidence": 0.95, "reasoning": ""}}
+
+        v = _make_verifier(generate_json)
+        v._verify_sem = asyncio.Semaphore(2)
+        results = _run(v._sequential_verify(["a", "b", "c"], "", "verifier"))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(peak, 2)
+
+    def test_claims_share_cacheable_prefix(self):
+        generate_json = AsyncMock(side_effect=lambda **kw: {"content": {"status": "verified", "confidence": 0.95}})
+        v = _make_verifier(generate_json)
+        results = _run(v._sequential_verify(["first claim", "second claim"], "- f", "verifier"))
+        self.assertEqual([r["claim"] for r in results], ["first claim", "second claim"])
+        calls = [c.kwargs for c in generate_json.call_args_list]
+        self.assertEqual(calls[0]["cache_prefix"], calls[1]["cache_prefix"])
+        for call, claim in zip(calls, ["first claim", "second claim"]):
+            self.assertTrue(call["prompt"].startswith(call["cache_prefix"]))
+            self.assertNotIn(claim, call["cache_prefix"])
+            self.assertTrue(call["prompt"].rstrip().endswith(f'"{claim}"'))
+
+
+class TestHandleVerify(unittest.TestCase):
+    def test_prompt_inputs_resolved_once_for_all_claims(self):
+        generate_json = AsyncMock(side_effect=lambda **kw: {"content": {"status": "verified", "confidence": 0.95}})
+        v = _make_verifier(generate_json)
+        v._format_known_facts = MagicMock(wraps=v._format_known_facts)
+        report = _run(v._handle_verify(
+            {"message": "a. b"}, {"claims_to_verify": ["a", "b"], "known_facts": ["f"]},
+        ))
+        self.assertEqual([r["claim"] for r in report["verifications"]], ["a", "b"])
+        v._format_known_facts.assert_called_once()
+        for call in generate_json.call_args_list:
+            self.assertEqual(call.kwargs["system"], "verifier")
+            self.assertIn("- f", call.kwargs["cache_prefix"])
+
+
+class TestAggregate(unittest.TestCase):
+    def _verifications(self, *confidences, status="verified"):
+        return [
+            {"claim": f"c{i}", "status": status, "confidence": c, "sources": []}
+            for i, c in enumerate(confidences)
+        ]
+
+    def test_small_and_unanimous_batches_skip_llm(self):
+        v = _make_verifier(AsyncMock(return_value={"content": {"verifications": []}}))
+        for verifications in (
+            self._verifications(0.5, 0.6, 0.1),
+            self._verifications(0.9, 0.95, 0.9, 0.99, 0.87, 0.92),
+            self._verifications(0.1, 0.2, 0.0, 0.25, 0.1, 0.05, status="unverified"),
+        ):
+            report = _run(v._aggregate("req", verifications))
+            self.assertEqual(report["verifications"], verifications)
+        v.llm.generate_json.assert_not_awaited()
+
+    def test_mixed_batch_cross_referenced_by_llm(self):
+        v = _make_verifier(AsyncMock(return_value={"content": {"verifications": [], "by": "llm"}}))
+        report = _run(v._aggregate("req", self._verifications(0.9, 0.2, 0.9, 0.95, 0.5, 0.9)))
+        self.assertEqual(report["by"], "llm")
+
+    def test_llm_failure_falls_back_to_simple(self):
+        v = _make_verifier(AsyncMock(side_effect=RuntimeError("down")))
+        verifications = self._verifications(0.9, 0.2, 0.9, 0.95, 0.5, 0.9)
+        self.assertEqual(_run(v._aggregate("req", verifications))["verifications"], verifications)
+
+
+class _AxisEmbedder:
+    """Embeds text onto fixed directions so tests control similarity."""
+
+    VECTORS = {
+        "Python 3.12 removed distutils": [1.0, 0.0, 0.0],
+        "distutils was removed in Python 3.12": [0.98, 0.2, 0.0],
+        "Python 3.12 added a JIT": [0.8, 0.6, 0.0],
+    }
+
+    def embed(self, text):
+        return np.array(self.VECTORS.get(text, [0.0, 0.0, 1.0]), dtype=np.float32)
+
+    def embed_batch(self, texts):
+        return [self.embed(t) for t in texts]
+
+
+class TestCacheLookup(unittest.TestCase):
+    def setUp(self):
+        self.memory = MemoryEngine.__new__(MemoryEngine)
+        self.memory.db = init_db(":memory:")
+        self.memory.embedder = _AxisEmbedder()
+        self.memory.store_fact("Python 3.12 removed distutils", confidence=0.95)
+        self.verifier = _make_verifier(AsyncMock())
+        self.verifier.memory = self.memory
+
+    def test_paraphrase_hits(self):
+        hit = self.verifier._check_cache("distutils was removed in Python 3.12")
+        self.assertEqual(hit["fact"], "Python 3.12 removed distutils")
+
+    def test_new_facts_stored_in_one_bulk_write(self):
+        self.memory.store_facts_bulk = MagicMock(wraps=self.memory.store_facts_bulk)
+        self.verifier._store_facts([
+            {"fact": "distutils was removed in Python 3.12", "confidence": 0.9},
+            {"fact": "", "confidence": 0.9},
+            {"fact": "Python 3.12 added a JIT", "confidence": 0.95},
+        ])
+        self.memory.store_facts_bulk.assert_called_once()
+        count = self.memory.db.execute(
+            "SELECT COUNT(*) FROM knowledge_cache WHERE source = 'verifier'"
+        ).fetchone()[0]
+        self.assertEqual(count, 2)
+
+    def test_related_but_different_claim_misses(self):
+        self.assertIsNone(self.verifier._check_cache("Python 3.12 added a JIT"))
+        self.assertEqual(len(self.memory.lookup_facts("Python 3.12 added a JIT")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()